@@ -0,0 +1,176 @@
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Dict
+
+from app.services import metrics
+
+# Work admitted per expensive stage at once, and requests allowed to wait for a slot;
+# anything beyond that is rejected with 503 instead of queuing behind the backlog
+ADMISSION_LIMITS = {
+    "llm": (int(os.getenv("ADMISSION_LLM_CONCURRENCY", "8")), int(os.getenv("ADMISSION_LLM_QUEUE", "16"))),
+    "scrape": (int(os.getenv("ADMISSION_SCRAPE_CONCURRENCY", "8")), int(os.getenv("ADMISSION_SCRAPE_QUEUE", "16"))),
+    "pdf": (int(os.getenv("ADMISSION_PDF_CONCURRENCY", str(os.cpu_count() or 2))), int(os.getenv("ADMISSION_PDF_QUEUE", "16"))),
+}
+# Longest a queued request waits for a slot before it is rejected
+ADMISSION_MAX_WAIT_SECONDS = float(os.getenv("ADMISSION_MAX_WAIT_SECONDS", "10"))
+# Requests to expensive endpoints in flight at once; further ones are shed before their body is read
+ADMISSION_MAX_REQUESTS = int(os.getenv("ADMISSION_MAX_REQUESTS", "64"))
+ADMISSION_PATHS = (
+    "/analyze/", "/edit-latex-resume/", "/analyze-and-edit/", "/compare-jobs/", "/tailor-latex-resume/",
+)
+# Answer scoring requests with the local fallback scorer instead of rejecting them when the LLM stage is full
+ADMISSION_DEGRADE = os.getenv("ADMISSION_DEGRADE", "0") == "1"
+
+MAX_RETRY_AFTER_SECONDS = 60
+_EWMA_ALPHA = 0.2
+
+
+class Overloaded(Exception):
+    """A stage is at capacity; carries the seconds after which a retry is likely to be admitted"""
+
+    def __init__(self, stage: str, retry_after: int):
+        super().__init__(f"Server busy ({stage}); retry in {retry_after}s")
+        self.stage = stage
+        self.retry_after = retry_after
+
+
+class StageLimiter:
+    """
+    Bounded concurrency with a bounded FIFO queue for one stage. Slots are handed
+    directly to the next waiter on release, and the smoothed time work holds a slot
+    estimates when a rejected client should retry
+    """
+
+    def __init__(self, stage: str, concurrency: int, max_queue: int, max_wait: float = ADMISSION_MAX_WAIT_SECONDS):
+        self.stage = stage
+        self.concurrency = max(1, concurrency)
+        self.max_queue = max(0, max_queue)
+        self.max_wait = max_wait
+        self.in_flight = 0
+        self.hold_seconds = None
+        self._waiters = deque()
+
+    def queued(self) -> int:
+        return sum(1 for waiter in self._waiters if not waiter.done())
+
+    def retry_after(self) -> int:
+        """Seconds until the queue ahead of a new request has likely drained"""
+        hold = self.hold_seconds if self.hold_seconds is not None else self.max_wait
+        estimate = hold * (self.queued() + 1) / self.concurrency
+        return max(1, min(MAX_RETRY_AFTER_SECONDS, math.ceil(estimate)))
+
+    def _reject(self, reason: str):
+        metrics.increment(f"admission.{self.stage}.{reason}")
+        raise Overloaded(self.stage, self.retry_after())
+
+    async def acquire(self):
+        if self.in_flight < self.concurrency and not self.queued():
+            self.in_flight += 1
+            return
+        if self.queued() >= self.max_queue:
+            self._reject("rejected")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        metrics.increment(f"admission.{self.stage}.queued")
+        try:
+            await asyncio.wait_for(waiter, self.max_wait)
+        except asyncio.TimeoutError:
+            self._reject("timed_out")
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()  # the slot was handed over as the request went away
+            raise
+
+    def release(self):
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)  # the slot passes to the waiter; in_flight is unchanged
+                return
+        self.in_flight -= 1
+
+    def observe(self, seconds: float):
+        if self.hold_seconds is None:
+            self.hold_seconds = seconds
+        else:
+            self.hold_seconds += _EWMA_ALPHA * (seconds - self.hold_seconds)
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "queued": self.queued(),
+            "concurrency": self.concurrency,
+            "max_queue": self.max_queue,
+            "avg_hold_ms": round(self.hold_seconds * 1000, 1) if self.hold_seconds is not None else None,
+        }
+
+
+limiters: Dict[str, StageLimiter] = {
+    stage: StageLimiter(stage, concurrency, max_queue) for stage, (concurrency, max_queue) in ADMISSION_LIMITS.items()
+}
+
+
+@asynccontextmanager
+async def admit(stage: str):
+    """Hold one of the stage's slots for the block, or raise Overloaded if none frees up in time"""
+    limiter = limiters[stage]
+    await limiter.acquire()
+    started = time.monotonic()
+    try:
+        yield
+    finally:
+        limiter.observe(time.monotonic() - started)
+        limiter.release()
+
+
+def admission_stats() -> dict:
+    return {stage: limiter.stats() for stage, limiter in limiters.items()}
+
+
+class LoadSheddingMiddleware:
+    """
+    Reject requests to the expensive endpoints with 503 and Retry-After, before their
+    uploads are read, once ADMISSION_MAX_REQUESTS of them are already in flight. The
+    per-stage limits then bound the work those admitted requests start
+    """
+
+    def __init__(self, app, max_requests: int = ADMISSION_MAX_REQUESTS, paths=ADMISSION_PATHS):
+        self.app = app
+        self.max_requests = max_requests
+        self.paths = paths
+        self.in_flight = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get("method") != "POST" or scope.get("path") not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        if self.in_flight >= self.max_requests:
+            metrics.increment("admission.shed")
+            await _send_overloaded(send, limiters["llm"].retry_after())
+            return
+
+        self.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
+
+
+async def _send_overloaded(send, retry_after: int):
+    body = b'{"detail":"Server is busy, please retry later."}'
+    await send({
+        "type": "http.response.start",
+        "status": 503,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(retry_after).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
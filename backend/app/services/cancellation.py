@@ -0,0 +1,95 @@
+import asyncio
+import threading
+from contextvars import ContextVar
+from typing import Optional
+
+from app.services import metrics
+
+_current_token: ContextVar[Optional[threading.Event]] = ContextVar("cancel_token", default=None)
+
+
+class RequestCancelled(BaseException):
+    """
+    The client of the current request went away. Like asyncio.CancelledError it is not an
+    Exception, so the pipeline's broad error handlers and fallbacks do not swallow it
+    """
+
+
+def cancelled() -> bool:
+    token = _current_token.get()
+    return token is not None and token.is_set()
+
+
+def check(stage: str):
+    """Checkpoint for blocking work: raise RequestCancelled, counted per stage, once the client has gone"""
+    if cancelled():
+        metrics.increment(f"cancelled.{stage}")
+        raise RequestCancelled(f"client disconnected before {stage}")
+
+
+def sleep(seconds: float, stage: str = "sleep"):
+    """time.sleep that ends early, raising RequestCancelled, if the client disconnects"""
+    token = _current_token.get()
+    if token is None:
+        threading.Event().wait(seconds)
+        return
+    if token.wait(seconds):
+        check(stage)
+
+
+class CancellationMiddleware:
+    """
+    Give every HTTP request a cancel token (visible in worker threads started with
+    asyncio.to_thread, which copies the context) and watch for the client disconnecting
+    once the request body has been read. On a disconnect before the response is complete
+    the token is set, so blocking work stops at its next checkpoint, and the handler task
+    is cancelled, releasing its semaphores and awaits immediately
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = threading.Event()
+        context_token = _current_token.set(token)
+        body_read = asyncio.Event()
+        response_done = False
+
+        async def tracked_receive():
+            message = await receive()
+            if message["type"] == "http.disconnect" or not message.get("more_body", False):
+                body_read.set()
+            return message
+
+        async def tracked_send(message):
+            nonlocal response_done
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                response_done = True
+            await send(message)
+
+        app_task = asyncio.ensure_future(self.app(scope, tracked_receive, tracked_send))
+
+        async def watch_disconnect():
+            await body_read.wait()
+            while True:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    break
+            if not response_done and not app_task.done():
+                token.set()
+                metrics.increment("requests.cancelled")
+                app_task.cancel()
+
+        watcher = asyncio.ensure_future(watch_disconnect())
+        try:
+            await app_task
+        except asyncio.CancelledError:
+            if not token.is_set():
+                raise
+        finally:
+            watcher.cancel()
+            _current_token.reset(context_token)
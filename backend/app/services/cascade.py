@@ -0,0 +1,121 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from app.services import metrics, section_cache
+from app.services.matcher import analyze_resume_and_job_groq, local_prescore
+
+# "llm" sends every request to the model; "cascade" runs the local pre-score first
+SCORING_MODE = os.getenv("SCORING_MODE", "llm")
+
+# Pre-scores below this are clear mismatches and are answered locally
+CASCADE_REJECT_BELOW = int(os.getenv("CASCADE_REJECT_BELOW", "45"))
+# Postings with fewer extractable keywords than this are too thin to judge locally
+CASCADE_MIN_KEYWORDS = int(os.getenv("CASCADE_MIN_KEYWORDS", "5"))
+CASCADE_CACHE_SIZE = int(os.getenv("CASCADE_CACHE_SIZE", "512"))
+
+_cache_lock = threading.Lock()
+_result_cache: "OrderedDict[str, dict]" = OrderedDict()
+
+
+def _cache_key(resume_text: str, job_text: str) -> str:
+    digest = hashlib.sha256()
+    digest.update(resume_text.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(job_text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _local_result(prescore: dict) -> dict:
+    missing = prescore["missing_keywords"]
+    return {
+        "score": prescore["score"],
+        "summary": f"Missing: {', '.join(missing[:3])}. Low keyword overlap with the job requirements."
+        if missing else "Low keyword overlap with the job requirements.",
+        "recommendations": [
+            "Incorporate more job-specific keywords and technical skills into your resume",
+            "Ensure your experience section clearly aligns with the job requirements",
+            "Consider whether this role matches your background before tailoring further",
+        ],
+        "source": "local",
+    }
+
+
+def _store_sections(sections: "section_cache.SectionAnalysis", result: dict):
+    # Only real LLM analyses become merge bases, so estimates never build on estimates
+    if result.get("source") == "llm":
+        section_cache.store(sections, result)
+
+
+def score_resume(resume_text: str, job_text: str, mode: str = None) -> dict:
+    """
+    Score a resume against a job. In cascade mode, identical inputs are served from the
+    result cache and clear mismatches are answered by the local pre-score; only ambiguous
+    or promising matches escalate to the LLM. In both modes a resubmission that changes
+    few sections is merged into the stored analysis of its previous version. The result
+    carries a "tier" field
+    """
+    return score_without_llm(resume_text, job_text, mode) or score_with_llm(resume_text, job_text, mode)
+
+
+def score_without_llm(resume_text: str, job_text: str, mode: str = None):
+    """The result score_resume gives from its caches or the local pre-score, or None if it needs the LLM"""
+    mode = mode or SCORING_MODE
+    if mode == "cascade":
+        metrics.increment("cascade.requests")
+        key = _cache_key(resume_text, job_text)
+        with _cache_lock:
+            cached = _result_cache.get(key)
+            if cached is not None:
+                _result_cache.move_to_end(key)
+        if cached is not None:
+            metrics.increment("cascade.cache_hits")
+            return {**cached, "tier": "cache"}
+
+    merged = section_cache.lookup(section_cache.SectionAnalysis(resume_text, job_text))
+    if merged is not None:
+        if mode == "cascade":
+            metrics.increment("cascade.section_cache_hits")
+        return {**merged, "tier": "section_cache"}
+    if mode != "cascade":
+        return None
+
+    prescore = local_prescore(resume_text, job_text)
+    if prescore["keyword_count"] >= CASCADE_MIN_KEYWORDS and prescore["score"] < CASCADE_REJECT_BELOW:
+        metrics.increment("cascade.local")
+        return {**_local_result(prescore), "tier": "local"}
+    return None
+
+
+def score_with_llm(resume_text: str, job_text: str, mode: str = None) -> dict:
+    """The LLM analysis score_resume escalates to, stored as a merge base and, in cascade mode, cached"""
+    mode = mode or SCORING_MODE
+    if mode == "cascade":
+        metrics.increment("cascade.escalated")
+    result = dict(analyze_resume_and_job_groq(resume_text, job_text))
+    _store_sections(section_cache.SectionAnalysis(resume_text, job_text), result)
+    # Fallback results are not cached so the real analysis runs once the LLM is back
+    if mode == "cascade" and result.get("source") == "llm":
+        with _cache_lock:
+            _result_cache[_cache_key(resume_text, job_text)] = result
+            if len(_result_cache) > CASCADE_CACHE_SIZE:
+                _result_cache.popitem(last=False)
+    return {**result, "tier": "llm"}
+
+
+def cascade_stats() -> dict:
+    """Escalation rate and tier counts for the metrics endpoint"""
+    requests_seen = metrics.get("cascade.requests")
+    escalated = metrics.get("cascade.escalated")
+    return {
+        "mode": SCORING_MODE,
+        "reject_below": CASCADE_REJECT_BELOW,
+        "min_keywords": CASCADE_MIN_KEYWORDS,
+        "requests": requests_seen,
+        "local": metrics.get("cascade.local"),
+        "cache_hits": metrics.get("cascade.cache_hits"),
+        "section_cache_hits": metrics.get("cascade.section_cache_hits"),
+        "escalated": escalated,
+        "escalation_rate": round(escalated / requests_seen, 4) if requests_seen else 0.0,
+    }
@@ -0,0 +1,216 @@
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, TimeoutError as FutureTimeout, wait
+from typing import Any, Callable, Optional
+
+import requests
+
+from app.services import cancellation, llm_ledger, metrics, model_router, tracing
+
+GROQ_CHAT_URL = "https://api.groq.com/openai/v1/chat/completions"
+
+# Per-call timeouts in seconds; editing prompts carry the whole .tex file and run longer
+GROQ_TIMEOUT = float(os.getenv("GROQ_TIMEOUT", "30"))
+GROQ_EDIT_TIMEOUT = float(os.getenv("GROQ_EDIT_TIMEOUT", "60"))
+
+# Consecutive failures or timeouts before the circuit opens, and how long it stays open
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_SECONDS = float(os.getenv("CIRCUIT_RESET_SECONDS", "30"))
+
+# Send a second copy of a hedgeable call if the first has not answered after this many
+# seconds; 0 disables hedging
+GROQ_HEDGE_AFTER = float(os.getenv("GROQ_HEDGE_AFTER", "0"))
+
+_hedge_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="groq-hedge")
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling Groq while the circuit is open"""
+
+
+class GroqAPIError(RuntimeError):
+    """Groq answered with a non-success status"""
+
+    def __init__(self, status_code: int, text: str):
+        super().__init__(f"Groq API call failed: {status_code} - {text}")
+        self.status_code = status_code
+
+
+class CircuitBreaker:
+    """
+    Closed: calls go through and consecutive failures are counted. Open: calls are
+    refused until the reset interval passes. Half-open: exactly one probe call is let
+    through; its outcome closes the circuit or opens it again
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        self._state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self._state == "closed":
+                return True
+            if self._state == "open" and time.monotonic() - self._opened_at >= self.reset_seconds:
+                self._state = "half_open"
+                metrics.increment("groq.circuit.probes")
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self._state != "closed":
+                metrics.increment("groq.circuit.closed")
+            self._state = "closed"
+            self._failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            if self._state == "open":
+                # A call that started before the circuit opened; the window is already running
+                return
+            self._failures += 1
+            if self._state == "half_open" or self._failures >= self.failure_threshold:
+                metrics.increment("groq.circuit.opened")
+                self._state = "open"
+                self._opened_at = time.monotonic()
+
+    def reset(self):
+        with self._lock:
+            self._state = "closed"
+            self._failures = 0
+
+
+breaker = CircuitBreaker(CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_SECONDS)
+
+
+def _post(api_key: str, body: dict, timeout: float) -> requests.Response:
+    return requests.post(
+        GROQ_CHAT_URL,
+        headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
+        json=body,
+        timeout=timeout,
+    )
+
+
+def _hedged_post(api_key: str, body: dict, timeout: float) -> requests.Response:
+    """Return the first successful of up to two identical calls, the second sent after GROQ_HEDGE_AFTER"""
+    first = _hedge_executor.submit(_post, api_key, body, timeout)
+    try:
+        return first.result(timeout=GROQ_HEDGE_AFTER)
+    except FutureTimeout:
+        pass
+
+    metrics.increment("groq.hedged")
+    second = _hedge_executor.submit(_post, api_key, body, timeout)
+    done, _ = wait([first, second], return_when=FIRST_COMPLETED)
+    winner = done.pop()
+    if winner.exception() is None and winner.result().ok:
+        return winner.result()
+    # The first to finish failed; the other call is the last chance
+    other = second if winner is first else first
+    return other.result()
+
+
+def chat_completion(
+    api_key: str,
+    body: dict,
+    timeout: float = GROQ_TIMEOUT,
+    hedge: bool = False,
+    stage: str = "chat",
+    parse: Optional[Callable[[str], Any]] = None,
+) -> Any:
+    """
+    Send a chat completion through the shared circuit breaker and return the message
+    content, or parse(content) if a parser is given. Without a "model" in body, the
+    model router picks one for the stage, and a failed call is retried once on the
+    stage's next model. Raises CircuitOpenError without any network call while the
+    circuit is open. Timeouts, connection errors, 429 and 5xx responses count as
+    failures. Every call is recorded in the LLM ledger under stage: refused or
+    unparseable calls as "fallback", failed ones as "error"
+    """
+    if body.get("model"):
+        models = [body["model"]]
+    else:
+        models = model_router.router.route(stage)[:max(1, model_router.ROUTER_MAX_ATTEMPTS)]
+
+    for attempt, model in enumerate(models, start=1):
+        # Nobody is waiting for the answer if the client has gone; keep the quota
+        cancellation.check("llm_call")
+        try:
+            return _complete_once(api_key, {**body, "model": model}, timeout, hedge, stage, parse)
+        except (requests.RequestException, GroqAPIError) as e:
+            # Bad credentials fail the same way on every model
+            if attempt == len(models) or getattr(e, "status_code", None) in (401, 403):
+                raise
+            metrics.increment("groq.model_failover")
+
+
+def _complete_once(api_key: str, body: dict, timeout: float, hedge: bool, stage: str, parse) -> Any:
+    """One call to one model, reported to the breaker, the router and the ledger"""
+    entry = llm_ledger.LedgerEntry(stage, body)
+    if not breaker.allow_request():
+        metrics.increment("groq.short_circuited")
+        entry.finish("fallback", "circuit open")
+        raise CircuitOpenError("Groq circuit is open; serving fallback")
+
+    started = time.perf_counter()
+    try:
+        with tracing.span("llm_call"):
+            if hedge and GROQ_HEDGE_AFTER > 0:
+                response = _hedged_post(api_key, body, timeout)
+            else:
+                response = _post(api_key, body, timeout)
+    except Exception as e:
+        breaker.record_failure()
+        entry.latency_ms = round((time.perf_counter() - started) * 1000, 1)
+        model_router.router.observe(body["model"], entry.latency_ms, ok=False)
+        entry.finish("error", f"{type(e).__name__}: {str(e)}")
+        raise
+    entry.latency_ms = round((time.perf_counter() - started) * 1000, 1)
+    overloaded = response.status_code == 429 or response.status_code >= 500
+    model_router.router.observe(body["model"], entry.latency_ms, ok=not overloaded)
+
+    if overloaded:
+        breaker.record_failure()
+        entry.finish("error", f"HTTP {response.status_code}")
+        raise GroqAPIError(response.status_code, response.text)
+    # Any other answer means Groq is reachable, even if this request was rejected
+    breaker.record_success()
+    if not response.ok:
+        entry.finish("error", f"HTTP {response.status_code}")
+        raise GroqAPIError(response.status_code, response.text)
+
+    try:
+        payload = response.json()
+        entry.usage = payload.get("usage") or {}
+        content = payload["choices"][0]["message"]["content"]
+        result = parse(content) if parse else content
+    except Exception as e:
+        entry.finish("fallback", f"{type(e).__name__}: {str(e)}")
+        raise
+    entry.finish("parsed")
+    return result
+
+
+def circuit_stats() -> dict:
+    """Breaker state and counters for the metrics endpoint"""
+    return {
+        "state": breaker.state,
+        "failure_threshold": breaker.failure_threshold,
+        "reset_seconds": breaker.reset_seconds,
+        "opened": metrics.get("groq.circuit.opened"),
+        "short_circuited": metrics.get("groq.short_circuited"),
+        "probes": metrics.get("groq.circuit.probes"),
+        "hedged": metrics.get("groq.hedged"),
+    }
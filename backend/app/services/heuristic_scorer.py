@@ -0,0 +1,220 @@
+import datetime
+import re
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.services.resume_sections import extract_skills, segment_resume_text
+
+# Same dimensions and weights the matcher prompt asks the LLM to use
+DIMENSION_WEIGHTS = {
+    "technical_skills": 0.30,
+    "experience": 0.25,
+    "domain": 0.20,
+    "education": 0.15,
+    "soft_skills": 0.10,
+}
+
+SOFT_SKILLS = {
+    "communication": ["communication", "communicate", "presentation", "written and verbal"],
+    "leadership": ["leadership", "lead a team", "led a team", "team lead"],
+    "teamwork": ["teamwork", "team player", "cross-functional"],
+    "collaboration": ["collaboration", "collaborate", "collaborated", "collaborative"],
+    "problem solving": ["problem solving", "problem-solving", "troubleshooting", "analytical"],
+    "mentoring": ["mentoring", "mentor", "mentored", "coaching"],
+    "ownership": ["ownership", "self-starter", "self-motivated", "proactive", "initiative"],
+    "stakeholder management": ["stakeholder", "stakeholders", "client-facing", "customer-facing"],
+    "adaptability": ["adaptability", "adaptable", "fast-paced", "flexible"],
+    "time management": ["time management", "prioritize", "prioritization", "deadlines"],
+}
+
+DOMAIN_TERMS = [
+    "fintech", "finance", "financial", "banking", "payments", "trading", "insurance", "healthcare",
+    "health", "medical", "clinical", "pharma", "biotech", "e-commerce", "ecommerce", "retail",
+    "marketplace", "logistics", "supply chain", "transportation", "automotive", "manufacturing",
+    "energy", "telecom", "gaming", "media", "advertising", "adtech", "marketing", "education",
+    "edtech", "government", "public sector", "nonprofit", "real estate", "travel", "hospitality",
+    "saas", "b2b", "b2c", "enterprise", "security", "cybersecurity", "cloud", "data platform",
+    "analytics", "embedded", "iot", "robotics", "aerospace", "legal", "hr tech", "crypto", "blockchain",
+]
+
+# Degree levels, highest first; a resume meets a requirement at its level or above
+DEGREE_LEVELS = [
+    (4, re.compile(r"\b(ph\.?d|doctorate|doctoral)\b")),
+    # Bare "ms" and "ba" also mean MS Office or a BA team, so they need dots or a following "in"/"degree"/"of"
+    (3, re.compile(r"\b(master'?s?|msc|m\.sc?\.?|ms (?:in|degree|of)|mba|m\.?eng|graduate degree)(?!\w)")),
+    (2, re.compile(r"\b(bachelor'?s?|b\.?sc?|b\.a\.|ba (?:in|degree|of)|b\.?eng|undergraduate degree|university degree|bs/ms)(?!\w)")),
+    (1, re.compile(r"\b(associate'?s?|diploma|college)\b")),
+]
+
+_SOFT_SKILL_NAMES = {name.lower() for name in SOFT_SKILLS} | {
+    "communication", "leadership", "teamwork", "collaboration", "problem solving", "mentoring",
+    "project management", "stakeholder management", "customer service",
+}
+_SOFT_PATTERNS = {
+    name: re.compile(r"\b(" + "|".join(re.escape(alias) for alias in aliases) + r")\b")
+    for name, aliases in SOFT_SKILLS.items()
+}
+_DOMAIN_PATTERNS = [(term, re.compile(r"\b" + re.escape(term) + r"\b")) for term in DOMAIN_TERMS]
+
+_REQUIRED_YEARS_PATTERN = re.compile(r"(\d{1,2})\s*\+?\s*(?:-\s*\d{1,2}\s*)?(?:years?|yrs?)")
+_MONTH = r"(?:[A-Za-z]{3,9}\.?\s*)?"
+_DATE_RANGE_PATTERN = re.compile(
+    _MONTH + r"((?:19|20)\d{2})\s*(?:-{1,3}|–|—|to)\s*" + _MONTH + r"((?:19|20)\d{2}|present|current|now)",
+    re.IGNORECASE,
+)
+_WORD_PATTERN = re.compile(r"[a-z][a-z+#.\-]{2,}")
+_STOP_WORDS = {
+    "and", "the", "with", "for", "our", "you", "your", "will", "are", "have", "has", "this", "that",
+    "from", "who", "what", "all", "any", "can", "not", "but", "they", "their", "them", "work", "team",
+    "role", "job", "experience", "years", "year", "skills", "strong", "ability", "including", "using",
+    "across", "within", "about", "into", "more", "other", "such", "must", "should", "would", "plus",
+    "preferred", "required", "requirements", "responsibilities", "candidate", "position", "company",
+}
+
+# Dimension scores used when the job gives nothing to compare against
+NEUTRAL_SCORE = 0.6
+
+
+def _technical_skills(job_text: str, resume_text: str) -> Tuple[float, Dict]:
+    required = [skill for skill in extract_skills(job_text) if skill.lower() not in _SOFT_SKILL_NAMES]
+    if not required:
+        return NEUTRAL_SCORE, {"required": [], "matched": [], "missing": []}
+    resume_skills = set(extract_skills(resume_text))
+    matched = [skill for skill in required if skill in resume_skills]
+    missing = [skill for skill in required if skill not in resume_skills]
+    return len(matched) / len(required), {"required": required, "matched": matched, "missing": missing}
+
+
+def _required_years(job_text: str) -> Optional[int]:
+    years = [int(match) for match in _REQUIRED_YEARS_PATTERN.findall(job_text.lower()) if 0 < int(match) <= 20]
+    return min(years) if years else None
+
+
+def _resume_years(experience_text: str, today: datetime.date) -> float:
+    """Years covered by the date ranges in the experience section, overlaps merged"""
+    spans = []
+    for start, end in _DATE_RANGE_PATTERN.findall(experience_text):
+        end_year = today.year if not end[:1].isdigit() else int(end)
+        if int(start) <= end_year:
+            spans.append((int(start), max(end_year, int(start) + 0.5)))
+
+    total = 0.0
+    current_start = current_end = None
+    for start, end in sorted(spans):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                total += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        total += current_end - current_start
+
+    stated = [int(match) for match in _REQUIRED_YEARS_PATTERN.findall(experience_text.lower()) if int(match) <= 40]
+    return max([total] + stated)
+
+
+def _experience(job_text: str, sections: Dict[str, str], today: datetime.date) -> Tuple[float, Dict]:
+    experience_text = "\n".join(sections.get(name, "") for name in ("experience", "projects", "summary"))
+    resume_years = round(_resume_years(experience_text or "\n".join(sections.values()), today), 1)
+    required = _required_years(job_text)
+
+    if required is None:
+        score = 0.8 if sections.get("experience") else 0.4
+    else:
+        score = min(1.0, resume_years / required) if resume_years else 0.2
+    return score, {"required_years": required, "resume_years": resume_years}
+
+
+def _content_words(text: str) -> Set[str]:
+    return {word.strip(".-") for word in _WORD_PATTERN.findall(text.lower())} - _STOP_WORDS
+
+
+def _domain(job_text: str, resume_text: str) -> Tuple[float, Dict]:
+    job_lower, resume_lower = job_text.lower(), resume_text.lower()
+    job_domains = [(term, pattern) for term, pattern in _DOMAIN_PATTERNS if pattern.search(job_lower)]
+    if job_domains:
+        matched = [term for term, pattern in job_domains if pattern.search(resume_lower)]
+        return len(matched) / len(job_domains), {"job_domains": [term for term, _ in job_domains], "matched": matched}
+
+    # No recognizable industry: fall back to how much of the posting's vocabulary the resume shares
+    job_words = _content_words(job_text)
+    if not job_words:
+        return NEUTRAL_SCORE, {"job_domains": [], "matched": []}
+    overlap = len(job_words & _content_words(resume_text)) / len(job_words)
+    return min(1.0, overlap * 2), {"job_domains": [], "vocabulary_overlap": round(overlap, 3)}
+
+
+def _degree_levels(text: str) -> List[int]:
+    lowered = text.lower()
+    return [level for level, pattern in DEGREE_LEVELS if pattern.search(lowered)]
+
+
+def _education(job_text: str, sections: Dict[str, str], resume_text: str) -> Tuple[float, Dict]:
+    # "Bachelor's or Master's" requires a bachelor's; the resume is credited with its highest degree
+    required = min(_degree_levels(job_text), default=0)
+    held = max(_degree_levels(sections.get("education") or resume_text), default=0)
+    if required == 0:
+        score = 1.0 if held else 0.7
+    elif held >= required:
+        score = 1.0
+    elif held == required - 1:
+        score = 0.5
+    else:
+        score = 0.2
+
+    wants_certification = "certif" in job_text.lower()
+    has_certification = bool(sections.get("certifications")) or "certif" in resume_text.lower()
+    if wants_certification and not has_certification:
+        score = max(0.0, score - 0.2)
+    return score, {"required_level": required, "resume_level": held, "certification_requested": wants_certification}
+
+
+def _soft_skills(job_text: str, resume_text: str) -> Tuple[float, Dict]:
+    job_lower, resume_lower = job_text.lower(), resume_text.lower()
+    wanted = [name for name, pattern in _SOFT_PATTERNS.items() if pattern.search(job_lower)]
+    shown = [name for name, pattern in _SOFT_PATTERNS.items() if pattern.search(resume_lower)]
+    if not wanted:
+        return (0.8 if shown else 0.5), {"requested": [], "matched": shown}
+    matched = [name for name in wanted if name in shown]
+    return len(matched) / len(wanted), {"requested": wanted, "matched": matched}
+
+
+def heuristic_score(resume_text: str, job_text: str, today: Optional[datetime.date] = None) -> Dict:
+    """
+    Score a resume against a job on the matcher prompt's five weighted dimensions.
+    Deterministic and free of shared state, so it can run in any thread. Returns the
+    0-100 score, per-dimension sub-scores with what drove them, and missing skills
+    """
+    today = today or datetime.date.today()
+    sections = segment_resume_text(resume_text)
+
+    technical, technical_detail = _technical_skills(job_text, resume_text)
+    experience, experience_detail = _experience(job_text, sections, today)
+    domain, domain_detail = _domain(job_text, resume_text)
+    education, education_detail = _education(job_text, sections, resume_text)
+    soft, soft_detail = _soft_skills(job_text, resume_text)
+
+    raw = {
+        "technical_skills": (technical, technical_detail),
+        "experience": (experience, experience_detail),
+        "domain": (domain, domain_detail),
+        "education": (education, education_detail),
+        "soft_skills": (soft, soft_detail),
+    }
+    dimensions = {
+        name: {"score": round(value * 100), "weight": DIMENSION_WEIGHTS[name], "detail": detail}
+        for name, (value, detail) in raw.items()
+    }
+    total = sum(DIMENSION_WEIGHTS[name] * value for name, (value, _) in raw.items())
+
+    return {
+        "score": max(0, min(100, round(total * 100))),
+        "dimensions": dimensions,
+        "missing_keywords": technical_detail["missing"][:5],
+    }
+
+
+def weakest_dimensions(dimensions: Dict, count: int = 3) -> List[str]:
+    """Dimensions that cost the most weighted points, largest loss first"""
+    losses = {name: (100 - info["score"]) * info["weight"] for name, info in dimensions.items()}
+    return [name for name in sorted(losses, key=losses.get, reverse=True)[:count] if losses[name] > 0]
@@ -0,0 +1,150 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+JOB_CORPUS_PATH = os.getenv("JOB_CORPUS_PATH", os.path.join(_BACKEND_DIR, "data", "job_corpus.db"))
+
+_schema_lock = threading.Lock()
+_schema_ready = set()
+
+_SPACE_PATTERN = re.compile(r"[ \t\u00a0]+")
+
+
+def connect(path: Optional[str] = None) -> sqlite3.Connection:
+    """Open the job corpus, creating the schema on first use"""
+    path = path or JOB_CORPUS_PATH
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=10)
+    conn.row_factory = sqlite3.Row
+
+    with _schema_lock:
+        if path not in _schema_ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    source TEXT NOT NULL,
+                    host TEXT,
+                    title TEXT,
+                    content_hash TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    fetched_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS job_profiles (
+                    content_hash TEXT PRIMARY KEY,
+                    profile TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+                """
+            )
+            conn.commit()
+            _schema_ready.add(path)
+    return conn
+
+
+def job_id_for_source(source: str) -> str:
+    """Stable id for a posting URL or saved file, so re-ingesting it updates the same row"""
+    return hashlib.sha256(source.strip().encode("utf-8")).hexdigest()[:32]
+
+
+def normalize_job_text(text: str) -> str:
+    """Collapse runs of spaces and drop blank lines, as the API would see pasted text"""
+    lines = (_SPACE_PATTERN.sub(" ", line).strip() for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def content_hash(text: str) -> str:
+    """Hash of a posting's normalized text; ingested and pasted copies of a posting share it"""
+    return hashlib.sha256(normalize_job_text(text).encode("utf-8")).hexdigest()
+
+
+def save_job(source: str, text: str, title: str = "", path: Optional[str] = None) -> Dict:
+    """Store a posting's normalized text and metadata and return the stored record"""
+    text = normalize_job_text(text)
+    record = {
+        "job_id": job_id_for_source(source),
+        "source": source,
+        "host": urlparse(source).netloc,
+        "title": title,
+        "content_hash": content_hash(text),
+        "text": text,
+        "fetched_at": time.time(),
+    }
+
+    conn = connect(path)
+    try:
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO jobs (job_id, source, host, title, content_hash, text, fetched_at)
+            VALUES (:job_id, :source, :host, :title, :content_hash, :text, :fetched_at)
+            """,
+            record,
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    return record
+
+
+def get_job(job_id: str, path: Optional[str] = None) -> Optional[Dict]:
+    """Load a stored posting, or None if the id is unknown"""
+    conn = connect(path)
+    try:
+        row = conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+    finally:
+        conn.close()
+    return dict(row) if row else None
+
+
+def get_job_by_url(url: str, path: Optional[str] = None) -> Optional[Dict]:
+    """A pre-ingested posting for this URL, so the API can skip scraping it"""
+    return get_job(job_id_for_source(url), path)
+
+
+def list_jobs(host: Optional[str] = None, path: Optional[str] = None) -> List[Dict]:
+    """Ids and metadata of stored postings, newest first, optionally for one host"""
+    conn = connect(path)
+    try:
+        query = "SELECT job_id, source, host, title, fetched_at, length(text) AS length FROM jobs"
+        params: tuple = ()
+        if host:
+            query += " WHERE host = ?"
+            params = (host,)
+        rows = conn.execute(query + " ORDER BY fetched_at DESC", params).fetchall()
+    finally:
+        conn.close()
+    return [dict(row) for row in rows]
+
+
+def get_job_profile(job_hash: str, path: Optional[str] = None) -> Optional[Dict]:
+    """The extracted requirements stored for a posting's content hash, or None"""
+    conn = connect(path)
+    try:
+        row = conn.execute("SELECT profile FROM job_profiles WHERE content_hash = ?", (job_hash,)).fetchone()
+    finally:
+        conn.close()
+    return json.loads(row["profile"]) if row else None
+
+
+def save_job_profile(job_hash: str, profile: Dict, path: Optional[str] = None):
+    conn = connect(path)
+    try:
+        conn.execute(
+            "INSERT OR REPLACE INTO job_profiles (content_hash, profile, created_at) VALUES (?, ?, ?)",
+            (job_hash, json.dumps(profile), time.time()),
+        )
+        conn.commit()
+    finally:
+        conn.close()
@@ -0,0 +1,168 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from app.services import groq_client, job_corpus, metrics
+from app.services.groq_client import CircuitOpenError
+from app.services.structured_output import JOB_PROFILE_SCHEMA, parse_json_object, validate
+
+# Send matcher prompts a compact requirements profile instead of the raw posting
+JOB_PROFILES = os.getenv("JOB_PROFILES", "1") == "1"
+# Shorter postings are sent as they are; extracting a profile would not pay for itself
+JOB_PROFILE_MIN_CHARS = int(os.getenv("JOB_PROFILE_MIN_CHARS", "1200"))
+JOB_PROFILE_CACHE_SIZE = int(os.getenv("JOB_PROFILE_CACHE_SIZE", "256"))
+# After a failed extraction the posting is sent raw, without retrying, for this long
+JOB_PROFILE_RETRY_SECONDS = float(os.getenv("JOB_PROFILE_RETRY_SECONDS", "3600"))
+
+_PROFILE_PROMPT = """Extract the hiring requirements from this job posting. Keep every requirement a candidate could be scored on and nothing else.
+
+Respond with only a JSON object:
+{{"title": "<job title>", "seniority": "<junior, mid, senior, lead, ...>", "experience": "<years and kind of experience required>", "required_skills": [<must-have skills and technologies>], "preferred_skills": [<nice-to-have skills>], "domain": "<industry or product domain>", "education": "<degree or certification requirements>", "responsibilities": [<up to 5 short phrases>]}}
+
+Job Posting:
+{job_text}
+"""
+
+_cache_lock = threading.Lock()
+_profile_cache: "OrderedDict[str, Dict]" = OrderedDict()
+# One extraction per posting even when many analyses of it start at once
+_build_locks: Dict[str, threading.Lock] = {}
+# job hash -> monotonic time until which a failed extraction is not retried
+_failed_until: "OrderedDict[str, float]" = OrderedDict()
+
+
+def render_profile(profile: Dict) -> str:
+    """The profile as compact prompt text, in place of the posting"""
+    lines = ["Requirements extracted from the job posting:"]
+    for label, field in (("Title", "title"), ("Seniority", "seniority"), ("Experience", "experience")):
+        if profile.get(field):
+            lines.append(f"{label}: {profile[field]}")
+    for label, field in (("Required skills", "required_skills"), ("Preferred skills", "preferred_skills")):
+        if profile.get(field):
+            lines.append(f"{label}: {', '.join(profile[field])}")
+    for label, field in (("Domain", "domain"), ("Education", "education")):
+        if profile.get(field):
+            lines.append(f"{label}: {profile[field]}")
+    if profile.get("responsibilities"):
+        lines.append("Responsibilities: " + "; ".join(profile["responsibilities"][:5]))
+    return "\n".join(lines)
+
+
+def _parse_profile(content: str) -> Dict:
+    profile = validate(parse_json_object(content), JOB_PROFILE_SCHEMA)
+    if not profile["required_skills"]:
+        raise ValueError("Profile lists no required skills")
+    return profile
+
+
+def _remember(job_hash: str, profile: Dict):
+    with _cache_lock:
+        _profile_cache[job_hash] = profile
+        _profile_cache.move_to_end(job_hash)
+        if len(_profile_cache) > JOB_PROFILE_CACHE_SIZE:
+            _profile_cache.popitem(last=False)
+
+
+def _cached(job_hash: str) -> Optional[Dict]:
+    with _cache_lock:
+        profile = _profile_cache.get(job_hash)
+        if profile is not None:
+            _profile_cache.move_to_end(job_hash)
+        return profile
+
+
+def _recently_failed(job_hash: str) -> bool:
+    with _cache_lock:
+        until = _failed_until.get(job_hash)
+        if until is not None and until <= time.monotonic():
+            del _failed_until[job_hash]
+            until = None
+    if until is not None:
+        metrics.increment("job_profiles.negative_hits")
+    return until is not None
+
+
+def _remember_failure(job_hash: str):
+    with _cache_lock:
+        _failed_until[job_hash] = time.monotonic() + JOB_PROFILE_RETRY_SECONDS
+        _failed_until.move_to_end(job_hash)
+        if len(_failed_until) > JOB_PROFILE_CACHE_SIZE:
+            _failed_until.popitem(last=False)
+
+
+def get_job_profile(job_text: str, api_key: str) -> Optional[Dict]:
+    """
+    The posting's requirements profile: from memory, from the job corpus database, or
+    extracted by the LLM once and stored under the posting's content hash. None if the
+    extraction fails, in which case callers use the raw posting; the failure is remembered
+    for JOB_PROFILE_RETRY_SECONDS so neither later analyses nor those waiting on the
+    extraction repeat it
+    """
+    job_hash = job_corpus.content_hash(job_text)
+    profile = _cached(job_hash)
+    if profile is not None:
+        metrics.increment("job_profiles.hits")
+        return profile
+    if _recently_failed(job_hash):
+        return None
+
+    with _cache_lock:
+        build_lock = _build_locks.setdefault(job_hash, threading.Lock())
+    with build_lock:
+        try:
+            profile = _cached(job_hash)
+            if profile is None:
+                try:
+                    profile = job_corpus.get_job_profile(job_hash)
+                except (OSError, sqlite3.Error) as e:
+                    print(f"Could not read stored job profile: {str(e)}")
+            if profile is not None:
+                metrics.increment("job_profiles.hits")
+                _remember(job_hash, profile)
+                return profile
+            if _recently_failed(job_hash):
+                return None
+
+            metrics.increment("job_profiles.extracted")
+            body = {
+                "messages": [{"role": "user", "content": _PROFILE_PROMPT.format(job_text=job_text)}],
+                "temperature": 0,
+                "max_tokens": 600,
+                "response_format": {"type": "json_object"},
+            }
+            try:
+                profile = groq_client.chat_completion(api_key, body, stage="job_profile", parse=_parse_profile)
+            except CircuitOpenError:
+                return None
+            except Exception as e:
+                print(f"Job profile extraction failed, using the raw posting: {str(e)}")
+                metrics.increment("job_profiles.failed")
+                _remember_failure(job_hash)
+                return None
+
+            _remember(job_hash, profile)
+            try:
+                job_corpus.save_job_profile(job_hash, profile)
+            except (OSError, sqlite3.Error) as e:
+                print(f"Could not store job profile: {str(e)}")
+            return profile
+        finally:
+            with _cache_lock:
+                _build_locks.pop(job_hash, None)
+
+
+def job_prompt_text(job_text: str, api_key: str) -> str:
+    """The job as matcher prompts should see it: the compact profile for long postings, else the posting"""
+    if not JOB_PROFILES or len(job_text) < JOB_PROFILE_MIN_CHARS:
+        return job_text
+    profile = get_job_profile(job_text, api_key)
+    return render_profile(profile) if profile else job_text
+
+
+def clear():
+    with _cache_lock:
+        _profile_cache.clear()
+        _failed_until.clear()
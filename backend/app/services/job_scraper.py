@@ -1,125 +1,122 @@
+import codecs
+import html
+import os
+import re
+import threading
 import requests
 from bs4 import BeautifulSoup
+from html.parser import HTMLParser
+from typing import Dict
+from urllib.parse import urlparse
 import time
 import random
 
-def scrape_job_description(url: str) -> str:
-    try:
-        # Create a session to maintain cookies
-        session = requests.Session()
-        
-        # More comprehensive headers to avoid detection
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
-            'Accept-Language': 'en-US,en;q=0.9',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-            'Sec-Fetch-Dest': 'document',
-            'Sec-Fetch-Mode': 'navigate',
-            'Sec-Fetch-Site': 'none',
-            'Sec-Fetch-User': '?1',
-            'Cache-Control': 'max-age=0',
-            'DNT': '1',
-            'Sec-Ch-Ua': '"Not_A Brand";v="8", "Chromium";v="120", "Google Chrome";v="120"',
-            'Sec-Ch-Ua-Mobile': '?0',
-            'Sec-Ch-Ua-Platform': '"Windows"'
-        }
-        
-        session.headers.update(headers)
-        
-        # Add a small random delay to appear more human-like
-        time.sleep(random.uniform(1, 3))
-        
-        # For Indeed URLs, try alternative access methods
-        original_url = url
-        if 'indeed.com' in url:
-            try:
-                # Extract job key from the URL
-                import re
-                jk_match = re.search(r'vjk=([a-f0-9]+)', url)
-                if jk_match:
-                    job_key = jk_match.group(1)
-                    # Try the direct viewjob format
-                    base_domain = 'ca.indeed.com' if 'ca.indeed.com' in original_url else 'indeed.com'
-                    viewjob_url = f"https://{base_domain}/viewjob?jk={job_key}"
-                    url = viewjob_url
-                
-                base_url = f'https://{"ca.indeed.com" if "ca.indeed.com" in original_url else "indeed.com"}'
-                session.get(base_url, timeout=10)
-                time.sleep(random.uniform(0.5, 1.5))
-            except:
-                url = original_url  # Fall back to original URL
+from app.services import cancellation, metrics, tracing
+
+# Stop reading a posting page after this many (decompressed) bytes
+MAX_HTML_BYTES = int(os.getenv("MAX_HTML_BYTES", str(2 * 1024 * 1024)))
+SCRAPE_CHUNK_SIZE = 64 * 1024
+
+# A description container with at least this much text ends the download early
+MIN_DESCRIPTION_CHARS = 200
+
+# id/class fragments (lowercase) of the job description containers used by major job boards
+_DESCRIPTION_MARKERS = ("jobdescriptiontext", "job-description", "jobdescription", "job_description", "description__text")
+
+# Elements whose content is never part of the job text
+_SKIPPED_TAGS = {"script", "style", "noscript", "template", "svg"}
+_VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+# Sessions are kept per site for this long, so its connections and cookies are reused and
+# the site's home page is visited once per window instead of before every posting
+SESSION_TTL_SECONDS = float(os.getenv("SCRAPER_SESSION_TTL", "900"))
+# Keep-alive connections kept open per site
+SESSION_POOL_CONNECTIONS = int(os.getenv("SCRAPER_POOL_CONNECTIONS", "4"))
+
+# Browser-like headers sent with every request of a site session
+_BROWSER_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+    'Sec-Fetch-Dest': 'document',
+    'Sec-Fetch-Mode': 'navigate',
+    'Sec-Fetch-Site': 'none',
+    'Sec-Fetch-User': '?1',
+    'Cache-Control': 'max-age=0',
+    'DNT': '1',
+    'Sec-Ch-Ua': '"Not_A Brand";v="8", "Chromium";v="120", "Google Chrome";v="120"',
+    'Sec-Ch-Ua-Mobile': '?0',
+    'Sec-Ch-Ua-Platform': '"Windows"'
+}
+
+
+class _SiteSession:
+    """A requests.Session for one site: its connection pool and cookies live for SESSION_TTL_SECONDS"""
+
+    def __init__(self):
+        self.session = requests.Session()
+        self.session.headers.update(_BROWSER_HEADERS)
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=SESSION_POOL_CONNECTIONS)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.created = time.monotonic()
+        self.visited_root = False
+        self.root_lock = threading.Lock()
+
+    def expired(self) -> bool:
+        return time.monotonic() - self.created >= SESSION_TTL_SECONDS
+
+
+_sessions_lock = threading.Lock()
+_sessions: Dict[str, _SiteSession] = {}
+
+
+def _site_session(root_url: str) -> _SiteSession:
+    """The live session for a site, replacing it once its window has passed"""
+    with _sessions_lock:
+        site = _sessions.get(root_url)
+        if site is None or site.expired():
+            if site is not None:
+                site.session.close()
+            site = _sessions[root_url] = _SiteSession()
+            metrics.increment("scraper.sessions_created")
         else:
-            # First, try to access the main site to establish session for other sites
-            try:
-                from urllib.parse import urlparse
-                parsed = urlparse(url)
-                base_url = f"{parsed.scheme}://{parsed.netloc}"
-                session.get(base_url, timeout=10)
-                time.sleep(random.uniform(0.5, 1.5))
-            except:
-                pass  # Continue even if base page fails
-        
-        response = session.get(url, timeout=20)
-        response.raise_for_status()
+            metrics.increment("scraper.sessions_reused")
+    return site
 
-        soup = BeautifulSoup(response.text, "html.parser")
-        
-        # Try multiple extraction strategies for different job sites
-        job_text = ""
-        
-        # Strategy 1: Indeed-specific selectors
-        if 'indeed.com' in url:
-            # Look for Indeed's job description container
-            job_desc = soup.find('div', class_=lambda x: x and 'jobsearch-jobDescriptionText' in x)
-            if not job_desc:
-                job_desc = soup.find('div', {'id': 'jobDescriptionText'})
-            if not job_desc:
-                job_desc = soup.find('div', class_=lambda x: x and any(keyword in x for keyword in ['jobDescription', 'job-description', 'description']))
-            
-            if job_desc:
-                job_text = job_desc.get_text(strip=True, separator='\n')
-        
-        # Strategy 2: Look for common job description containers
-        if len(job_text) < 200:
-            job_containers = soup.find_all(['div', 'section'], class_=lambda x: x and any(
-                keyword in x.lower() for keyword in ['job', 'description', 'detail', 'content', 'requirement', 'responsibilities']
-            ))
-            
-            if job_containers:
-                for container in job_containers:
-                    text = container.get_text(strip=True, separator='\n')
-                    if len(text) > len(job_text):
-                        job_text = text
-        
-        # Strategy 3: If still short, try broader extraction
-        if len(job_text) < 200:
-            # Look for all paragraphs, list items, and divs with substantial text
-            elements = soup.find_all(["p", "li", "div", "span"])
-            texts = []
-            for el in elements:
-                text = el.get_text(strip=True)
-                if len(text) > 20 and text not in texts:  # Avoid duplicates and very short text
-                    texts.append(text)
-            job_text = "\n".join(texts)
-        
-        # Strategy 4: If still short, get all visible text
-        if len(job_text) < 200:
-            # Remove script and style elements
-            for script in soup(["script", "style", "nav", "header", "footer"]):
-                script.decompose()
-            job_text = soup.get_text(strip=True, separator='\n')
-        
-        # Clean up the text
-        lines = [line.strip() for line in job_text.split('\n') if line.strip()]
-        job_text = '\n'.join(lines)
 
-        if len(job_text) < 100:
-            raise ValueError("Extracted text too short. Bad URL or JS-rendered page.")
+def _visit_root(site: _SiteSession, root_url: str):
+    """Visit the site's home page like a browser would, once per session window"""
+    with site.root_lock:
+        if site.visited_root:
+            return
+        # Add a small random delay to appear more human-like
+        cancellation.sleep(random.uniform(1, 3), "scrape")
+        try:
+            site.session.get(root_url, timeout=10).close()
+            cancellation.sleep(random.uniform(0.5, 1.5), "scrape")
+        except requests.exceptions.RequestException:
+            pass  # Continue even if base page fails
+        metrics.increment("scraper.root_visits")
+        site.visited_root = True
+
 
-        return job_text
+def close_sessions():
+    """Close every pooled site session"""
+    with _sessions_lock:
+        for site in _sessions.values():
+            site.session.close()
+        _sessions.clear()
+
+
+def scrape_job_description(url: str) -> str:
+    try:
+        with tracing.span("scrape_fetch"):
+            url, response = _open_job_page(url)
+        return _stream_job_text(response, url)
 
     except requests.exceptions.RequestException as e:
         if "403" in str(e) or "Forbidden" in str(e):
@@ -127,4 +124,225 @@ def scrape_job_description(url: str) -> str:
         else:
             raise RuntimeError(f"Failed to scrape job URL: {str(e)}")
     except Exception as e:
-        raise RuntimeError(f"Failed to scrape job URL: {str(e)}")
\ No newline at end of file
+        raise RuntimeError(f"Failed to scrape job URL: {str(e)}")
+
+
+def fetch_job_page(url: str):
+    """Download a job posting page, up to MAX_HTML_BYTES; returns the URL actually fetched and its HTML"""
+    url, response = _open_job_page(url)
+    with response:
+        decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+        parts = []
+        size = 0
+        for chunk in response.iter_content(SCRAPE_CHUNK_SIZE):
+            size += len(chunk)
+            parts.append(decoder.decode(chunk))
+            if size >= MAX_HTML_BYTES:
+                break
+        parts.append(decoder.decode(b"", final=True))
+    return url, "".join(parts)
+
+
+def _open_job_page(url: str):
+    """Open a streamed request for the posting through the site's pooled session"""
+    parsed = urlparse(url)
+    root_url = f"{parsed.scheme}://{parsed.netloc}"
+
+    # For Indeed URLs, use the direct viewjob format
+    if 'indeed.com' in url:
+        base_domain = 'ca.indeed.com' if 'ca.indeed.com' in url else 'indeed.com'
+        root_url = f"https://{base_domain}"
+        jk_match = re.search(r'vjk=([a-f0-9]+)', url)
+        if jk_match:
+            url = f"https://{base_domain}/viewjob?jk={jk_match.group(1)}"
+
+    site = _site_session(root_url)
+    _visit_root(site, root_url)
+    cancellation.check("scrape")
+
+    response = site.session.get(url, timeout=20, stream=True)
+    try:
+        response.raise_for_status()
+    except requests.exceptions.RequestException:
+        response.close()
+        raise
+    return url, response
+
+
+class _JobPageParser(HTMLParser):
+    """
+    Incremental HTML parser fed one downloaded chunk at a time. Script and style content
+    is dropped as it streams past, the rest is kept as cleaned HTML for the full
+    extraction strategies, and the text of the first job description container is
+    collected so the download can stop as soon as that container closes
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.cleaned: list = []
+        self.description_text = ""
+        self._skip_depth = 0
+        self._container_tag = None
+        self._container_depth = 0
+        self._container_parts: list = []
+
+    @property
+    def complete(self) -> bool:
+        return len(self.description_text) >= MIN_DESCRIPTION_CHARS
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIPPED_TAGS:
+            self._skip_depth += 1
+            return
+        if self._skip_depth:
+            return
+        self.cleaned.append(self.get_starttag_text() or f"<{tag}>")
+
+        if self._container_tag is not None:
+            if tag == self._container_tag:
+                self._container_depth += 1
+        elif tag in ("div", "section", "article") and not self.complete:
+            attributes = dict(attrs)
+            marker_text = f"{attributes.get('id') or ''} {attributes.get('class') or ''}".lower()
+            if any(marker in marker_text for marker in _DESCRIPTION_MARKERS):
+                self._container_tag = tag
+                self._container_depth = 1
+                self._container_parts = []
+
+    def handle_startendtag(self, tag, attrs):
+        if not self._skip_depth and tag not in _SKIPPED_TAGS:
+            self.cleaned.append(self.get_starttag_text() or f"<{tag}/>")
+
+    def handle_endtag(self, tag):
+        if tag in _SKIPPED_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+            return
+        if self._skip_depth or tag in _VOID_TAGS:
+            return
+        self.cleaned.append(f"</{tag}>")
+
+        if self._container_tag == tag:
+            self._container_depth -= 1
+            if self._container_depth == 0:
+                text = "\n".join(self._container_parts)
+                if len(text) > len(self.description_text):
+                    self.description_text = text
+                self._container_tag = None
+
+    def handle_data(self, data):
+        if self._skip_depth:
+            return
+        self.cleaned.append(html.escape(data, quote=False))
+        if self._container_tag is not None and data.strip():
+            self._container_parts.append(data.strip())
+
+
+def parse_job_stream(chunks, url: str, encoding: str = "utf-8", max_bytes: int = None) -> str:
+    """
+    Extract the job text from an iterable of raw HTML chunks, reading at most max_bytes.
+    Returns as soon as a complete description container has been parsed; otherwise the
+    cleaned (script-free) page goes through the same strategies as extract_job_text
+    """
+    max_bytes = max_bytes or MAX_HTML_BYTES
+    decoder = codecs.getincrementaldecoder(encoding or "utf-8")(errors="replace")
+    parser = _JobPageParser()
+    size = 0
+
+    for chunk in chunks:
+        size += len(chunk)
+        parser.feed(decoder.decode(chunk))
+        if parser.complete:
+            metrics.increment("scraper.early_stop")
+            lines = [line.strip() for line in parser.description_text.split("\n") if line.strip()]
+            return "\n".join(lines)
+        if size >= max_bytes:
+            metrics.increment("scraper.truncated")
+            break
+
+    parser.feed(decoder.decode(b"", final=True))
+    parser.close()
+    return extract_job_text("".join(parser.cleaned), url)
+
+
+def _stream_job_text(response, url: str) -> str:
+    """Feed the streamed response to the incremental parser, timing download and parse separately"""
+    fetch_seconds = 0.0
+
+    def timed_chunks():
+        nonlocal fetch_seconds
+        iterator = response.iter_content(SCRAPE_CHUNK_SIZE)
+        while True:
+            cancellation.check("scrape")
+            started = time.perf_counter()
+            chunk = next(iterator, None)
+            fetch_seconds += time.perf_counter() - started
+            if chunk is None:
+                return
+            yield chunk
+
+    started = time.perf_counter()
+    try:
+        return parse_job_stream(timed_chunks(), url, response.encoding)
+    finally:
+        response.close()
+        tracing.record("scrape_fetch", fetch_seconds)
+        tracing.record("scrape_parse", time.perf_counter() - started - fetch_seconds)
+
+
+def extract_job_text(html: str, url: str) -> str:
+    """Pull the job description text out of a posting page"""
+    soup = BeautifulSoup(html, "html.parser")
+    
+    # Try multiple extraction strategies for different job sites
+    job_text = ""
+    
+    # Strategy 1: Indeed-specific selectors
+    if 'indeed.com' in url:
+        # Look for Indeed's job description container
+        job_desc = soup.find('div', class_=lambda x: x and 'jobsearch-jobDescriptionText' in x)
+        if not job_desc:
+            job_desc = soup.find('div', {'id': 'jobDescriptionText'})
+        if not job_desc:
+            job_desc = soup.find('div', class_=lambda x: x and any(keyword in x for keyword in ['jobDescription', 'job-description', 'description']))
+        
+        if job_desc:
+            job_text = job_desc.get_text(strip=True, separator='\n')
+    
+    # Strategy 2: Look for common job description containers
+    if len(job_text) < 200:
+        job_containers = soup.find_all(['div', 'section'], class_=lambda x: x and any(
+            keyword in x.lower() for keyword in ['job', 'description', 'detail', 'content', 'requirement', 'responsibilities']
+        ))
+        
+        if job_containers:
+            for container in job_containers:
+                text = container.get_text(strip=True, separator='\n')
+                if len(text) > len(job_text):
+                    job_text = text
+    
+    # Strategy 3: If still short, try broader extraction
+    if len(job_text) < 200:
+        # Look for all paragraphs, list items, and divs with substantial text
+        elements = soup.find_all(["p", "li", "div", "span"])
+        texts = []
+        for el in elements:
+            text = el.get_text(strip=True)
+            if len(text) > 20 and text not in texts:  # Avoid duplicates and very short text
+                texts.append(text)
+        job_text = "\n".join(texts)
+    
+    # Strategy 4: If still short, get all visible text
+    if len(job_text) < 200:
+        # Remove script and style elements
+        for script in soup(["script", "style", "nav", "header", "footer"]):
+            script.decompose()
+        job_text = soup.get_text(strip=True, separator='\n')
+    
+    # Clean up the text
+    lines = [line.strip() for line in job_text.split('\n') if line.strip()]
+    job_text = '\n'.join(lines)
+
+    if len(job_text) < 100:
+        raise ValueError("Extracted text too short. Bad URL or JS-rendered page.")
+
+    return job_text
@@ -0,0 +1,52 @@
+import difflib
+import hashlib
+from typing import Dict, List
+
+
+def source_digest(text: str) -> str:
+    """SHA-256 of the source a patch applies to, so clients can check they hold the same base"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def make_patch(original: str, edited: str) -> List[Dict]:
+    """
+    Line-based patch from original to edited. Each op replaces original lines
+    [start, end) with "lines"; ops are ordered and refer to original line numbers
+    """
+    original_lines = original.splitlines(keepends=True)
+    edited_lines = edited.splitlines(keepends=True)
+    matcher = difflib.SequenceMatcher(None, original_lines, edited_lines, autojunk=False)
+
+    return [
+        {"start": i1, "end": i2, "lines": edited_lines[j1:j2]}
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+        if tag != "equal"
+    ]
+
+
+def apply_patch(original: str, patch: List[Dict]) -> str:
+    """Rebuild the edited text from the original and a patch made by make_patch"""
+    original_lines = original.splitlines(keepends=True)
+    result: List[str] = []
+    position = 0
+    for op in patch:
+        result.extend(original_lines[position:op["start"]])
+        result.extend(op["lines"])
+        position = op["end"]
+    result.extend(original_lines[position:])
+    return "".join(result)
+
+
+def unified_diff(original: str, edited: str, filename: str = "resume.tex") -> str:
+    """Standard unified diff, for clients that apply patches with diff tooling"""
+    lines = difflib.unified_diff(
+        original.splitlines(keepends=True),
+        edited.splitlines(keepends=True),
+        fromfile=f"a/{filename}",
+        tofile=f"b/{filename}",
+    )
+    # A side's last line without a newline is marked the way diff and patch expect
+    return "".join(
+        line if line.endswith("\n") else line + "\n\\ No newline at end of file\n"
+        for line in lines
+    )
@@ -4,11 +4,16 @@ from typing import Dict, List, Tuple
 from dotenv import load_dotenv
 import requests
 
+from app.services import groq_client, tracing
+from app.services.groq_client import GROQ_EDIT_TIMEOUT, CircuitOpenError, GroqAPIError
+from app.services.structured_output import EDIT_SCHEMA, GROQ_JSON_MODE, parse_json_object, validate
+
 load_dotenv()
 
 class LaTeXResumeEditor:
     def __init__(self):
         self.groq_api_key = os.getenv("GROQ_API_KEY")
+        self.json_mode = GROQ_JSON_MODE
     
     def edit_resume_for_job(self, latex_content: str, job_description: str, resume_text: str) -> Dict:
         """
@@ -30,6 +35,9 @@ class LaTeXResumeEditor:
                 "suggestions": suggestions,
                 "changes_made": self._summarize_changes(latex_content, edited_latex)
             }
+        except (CircuitOpenError, GroqAPIError, requests.RequestException):
+            # Groq is down, rate limited or timed out; the local edit is better than an error
+            return self._fallback_edit(latex_content, job_description, resume_text)
         except Exception as e:
             return {
                 "error": f"Failed to edit resume: {str(e)}",
@@ -38,7 +46,52 @@ class LaTeXResumeEditor:
     
     def _get_ai_suggestions(self, latex_content: str, job_description: str, resume_text: str) -> Dict:
         """Get AI-powered suggestions for resume improvements"""
-        prompt = f"""
+        with tracing.span("prompt_build"):
+            if self.json_mode:
+                prompt = self._build_json_prompt(latex_content, job_description, resume_text)
+            else:
+                prompt = self._build_text_prompt(latex_content, job_description, resume_text)
+
+        body = {
+            "messages": [{"role": "user", "content": prompt}]
+        }
+        if self.json_mode:
+            body["response_format"] = {"type": "json_object"}
+
+        return groq_client.chat_completion(
+            self.groq_api_key, body, timeout=GROQ_EDIT_TIMEOUT, stage="edit", parse=self._parse_response
+        )
+
+    def _parse_response(self, content: str) -> Dict:
+        """Parse the structured response, falling back to the text-format parser"""
+        with tracing.span("response_parse"):
+            if self.json_mode:
+                try:
+                    return self._parse_json_suggestions(content)
+                except ValueError as e:
+                    print(f"Structured edit response invalid, using text parser: {str(e)}")
+            return self._parse_ai_suggestions(content)
+
+    def _build_json_prompt(self, latex_content: str, job_description: str, resume_text: str) -> str:
+        return f"""You are an expert resume writer and LaTeX specialist. Improve this LaTeX resume for the job below.
+
+Rules: do NOT create new sections; keep the same structure, sections and one-page length; replace generic words with specific, job-relevant ones; add at most 1-2 relevant skills or keywords per existing section.
+
+Respond with only a JSON object:
+{{"skills_additions": [<1-2 skills for the existing skills section>], "experience_enhancements": [<bullet points to enhance>], "keywords_to_include": [<3-4 job keywords>], "latex_modifications": [<edits to existing sections>], "complete_latex": "<the entire improved LaTeX document>"}}
+
+LaTeX Resume Content:
+{latex_content}
+
+Plain Text Resume (for context):
+{resume_text}
+
+Job Description:
+{job_description}
+"""
+
+    def _build_text_prompt(self, latex_content: str, job_description: str, resume_text: str) -> str:
+        return f"""
 You are an expert resume writer and LaTeX specialist. Analyze this LaTeX resume and job description to suggest specific improvements.
 
 IMPORTANT REQUIREMENTS:
@@ -80,29 +133,19 @@ Focus on:
 The goal is to make the resume more relevant while keeping it the same length and structure.
 """
 
-        headers = {
-            "Authorization": f"Bearer {self.groq_api_key}",
-            "Content-Type": "application/json"
+    def _parse_json_suggestions(self, content: str) -> Dict:
+        """Parse a JSON-mode response with one json.loads and validate it against the schema"""
+        fields = validate(parse_json_object(content), EDIT_SCHEMA)
+        suggestions = {
+            "skills_additions": [item for item in fields["skills_additions"] if len(item) < 50][:5],
+            "experience_enhancements": [item for item in fields["experience_enhancements"] if len(item) < 200],
+            "keywords_to_include": [item for item in fields["keywords_to_include"] if len(item) < 50][:5],
+            "latex_modifications": [item for item in fields["latex_modifications"] if len(item) < 200],
         }
-
-        body = {
-            "model": "meta-llama/llama-4-scout-17b-16e-instruct",
-            "messages": [{"role": "user", "content": prompt}]
-        }
-
-        response = requests.post(
-            "https://api.groq.com/openai/v1/chat/completions",
-            headers=headers,
-            json=body
-        )
-
-        if not response.ok:
-            raise RuntimeError(f"Groq API call failed: {response.status_code} - {response.text}")
-
-        content = response.json()["choices"][0]["message"]["content"]
-        
-        # Parse the structured response
-        return self._parse_ai_suggestions(content)
+        complete_latex_match = re.search(r"\\documentclass.*?\\end\{document\}", fields["complete_latex"], re.DOTALL)
+        if complete_latex_match:
+            suggestions["complete_latex"] = complete_latex_match.group(0).strip()
+        return suggestions
     
     def _parse_ai_suggestions(self, content: str) -> Dict:
         """Parse AI suggestions into structured format"""
@@ -0,0 +1,171 @@
+import math
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+from app.services import tracing
+
+_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# One row per LLM call; set to an empty string to stop recording
+LLM_LEDGER_PATH = os.getenv("LLM_LEDGER_PATH", os.path.join(_BACKEND_DIR, "data", "llm_ledger.db"))
+
+# Outcomes: the answer was parsed into the result; the local fallback answered instead
+# (circuit open, or the answer could not be used); the call itself failed
+OUTCOMES = ("parsed", "fallback", "error")
+
+_schema_lock = threading.Lock()
+_schema_ready = set()
+
+
+def connect(path: Optional[str] = None) -> sqlite3.Connection:
+    """Open the ledger, creating the schema on first use"""
+    path = path or LLM_LEDGER_PATH
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=10)
+    conn.row_factory = sqlite3.Row
+
+    with _schema_lock:
+        if path not in _schema_ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS llm_calls (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    created_at REAL NOT NULL,
+                    request_id TEXT,
+                    endpoint TEXT,
+                    stage TEXT NOT NULL,
+                    model TEXT,
+                    prompt_chars INTEGER,
+                    prompt_tokens INTEGER,
+                    completion_tokens INTEGER,
+                    latency_ms REAL,
+                    outcome TEXT NOT NULL,
+                    error TEXT
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS llm_calls_created_at ON llm_calls (created_at)")
+            conn.commit()
+            _schema_ready.add(path)
+    return conn
+
+
+class LedgerEntry:
+    """
+    One LLM call being accounted for. Created before the call so the prompt size,
+    model and calling request are known; the client fills in latency and usage and
+    finish() writes the row. Write failures are printed, never raised into the call
+    """
+
+    def __init__(self, stage: str, body: dict, path: Optional[str] = None):
+        self.path = path
+        self.created_at = time.time()
+        self.request_id = tracing.current_request_id()
+        trace = tracing.current_trace()
+        self.endpoint = trace.path if trace else None
+        self.stage = stage
+        self.model = body.get("model")
+        self.prompt_chars = sum(len(str(message.get("content", ""))) for message in body.get("messages", []))
+        self.latency_ms: Optional[float] = None
+        self.usage: Dict = {}
+
+    def finish(self, outcome: str, error: Optional[str] = None):
+        if not (self.path or LLM_LEDGER_PATH):
+            return
+        row = {
+            "created_at": self.created_at,
+            "request_id": self.request_id,
+            "endpoint": self.endpoint,
+            "stage": self.stage,
+            "model": self.model,
+            "prompt_chars": self.prompt_chars,
+            "prompt_tokens": self.usage.get("prompt_tokens"),
+            "completion_tokens": self.usage.get("completion_tokens"),
+            "latency_ms": self.latency_ms,
+            "outcome": outcome,
+            "error": error[:500] if error else None,
+        }
+        try:
+            conn = connect(self.path)
+            try:
+                conn.execute(
+                    """
+                    INSERT INTO llm_calls (created_at, request_id, endpoint, stage, model, prompt_chars,
+                                           prompt_tokens, completion_tokens, latency_ms, outcome, error)
+                    VALUES (:created_at, :request_id, :endpoint, :stage, :model, :prompt_chars,
+                            :prompt_tokens, :completion_tokens, :latency_ms, :outcome, :error)
+                    """,
+                    row,
+                )
+                conn.commit()
+            finally:
+                conn.close()
+        except (OSError, sqlite3.Error) as e:
+            print(f"Could not write LLM ledger: {str(e)}")
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, math.ceil(fraction * len(sorted_values)) - 1)
+    return round(sorted_values[max(index, 0)], 1)
+
+
+def summarize(
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+    bucket_seconds: Optional[int] = None,
+    path: Optional[str] = None,
+) -> List[Dict]:
+    """
+    Aggregate recorded calls by endpoint and stage, optionally also by time bucket
+    (bucket_seconds, aligned to the epoch). Each group reports call and outcome counts,
+    token totals and averages, latency percentiles and latency per 1k prompt tokens
+    """
+    query = "SELECT * FROM llm_calls WHERE created_at >= ? AND created_at < ? ORDER BY created_at"
+    conn = connect(path)
+    try:
+        rows = conn.execute(query, (since or 0, until or math.inf)).fetchall()
+    finally:
+        conn.close()
+
+    groups: Dict[tuple, List[sqlite3.Row]] = {}
+    for row in rows:
+        bucket = int(row["created_at"] // bucket_seconds * bucket_seconds) if bucket_seconds else None
+        groups.setdefault((bucket, row["endpoint"] or "", row["stage"]), []).append(row)
+
+    summary = []
+    for (bucket, endpoint, stage), calls in groups.items():
+        answered = [call for call in calls if call["prompt_tokens"] is not None]
+        prompt_tokens = sum(call["prompt_tokens"] for call in answered)
+        completion_tokens = sum(call["completion_tokens"] or 0 for call in answered)
+        latencies = sorted(call["latency_ms"] for call in calls if call["latency_ms"] is not None)
+        answered_latency = sum(call["latency_ms"] or 0 for call in answered)
+
+        group = {"endpoint": endpoint, "stage": stage}
+        if bucket_seconds:
+            group["window_start"] = bucket
+        group.update({
+            "calls": len(calls),
+            "outcomes": {outcome: sum(call["outcome"] == outcome for call in calls) for outcome in OUTCOMES},
+            "models": sorted({call["model"] for call in calls if call["model"]}),
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "avg_prompt_tokens": round(prompt_tokens / len(answered), 1) if answered else None,
+            "avg_completion_tokens": round(completion_tokens / len(answered), 1) if answered else None,
+            "avg_prompt_chars": round(sum(call["prompt_chars"] or 0 for call in calls) / len(calls), 1),
+            "latency_ms": {
+                "avg": round(sum(latencies) / len(latencies), 1) if latencies else None,
+                "p50": _percentile(latencies, 0.5),
+                "p95": _percentile(latencies, 0.95),
+                "max": round(latencies[-1], 1) if latencies else None,
+            },
+            "ms_per_1k_prompt_tokens": round(answered_latency / prompt_tokens * 1000, 1) if prompt_tokens else None,
+        })
+        summary.append(group)
+
+    summary.sort(key=lambda group: (group.get("window_start") or 0, group["endpoint"], group["stage"]))
+    return summary
@@ -1,12 +1,69 @@
 import os
-import requests
 import re
 from dotenv import load_dotenv
 
+from app.services import groq_client, job_profiles, metrics, tracing
+from app.services.groq_client import CircuitOpenError
+from app.services.heuristic_scorer import heuristic_score, weakest_dimensions
+from app.services.structured_output import GROQ_JSON_MODE, MATCH_SCHEMA, parse_json_object, validate
+
 load_dotenv()
 
-def analyze_resume_and_job_groq(resume_text: str, job_text: str) -> dict:
-    prompt = f"""
+_JSON_PROMPT = """You are an expert HR professional and ATS specialist. Score how well the resume matches the job posting.
+
+Scale: 90-100 exceeds requirements; 80-89 meets most well; 70-79 meets core with some gaps; 60-69 relevant but notable gaps; 50-59 some relevant skills, many gaps; 40-49 lacks most required skills; 0-39 not suitable. Be realistic; most resumes are not perfect matches.
+Weights: technical skills 30%, experience level 25%, industry/domain 20%, education/certifications 15%, soft skills 10%.
+
+Respond with only a JSON object:
+{{"score": <integer 0-100>, "missing_keywords": [<up to 5 strings>], "suggestions": [<3 specific actionable strings>], "analysis": "<2-3 sentences on the scoring rationale>"}}
+
+Resume:
+{resume_text}
+
+Job Posting:
+{job_text}
+"""
+
+def analyze_resume_and_job_groq(resume_text: str, job_text: str, stage: str = "match") -> dict:
+    """
+    LLM analysis of a resume against a job, or the local fallback analysis. The stage
+    ("match", or "rescore" for edited resumes) selects the models the router may use
+    """
+    groq_api_key = os.getenv("GROQ_API_KEY")
+
+    # Development fallback: if no GROQ API key is present, return a basic heuristic-based response
+    if not groq_api_key:
+        return fallback_analysis(resume_text, job_text)
+
+    with tracing.span("job_profile"):
+        job_prompt = job_profiles.job_prompt_text(job_text, groq_api_key)
+
+    with tracing.span("prompt_build"):
+        if GROQ_JSON_MODE:
+            prompt = _JSON_PROMPT.format(resume_text=resume_text, job_text=job_prompt)
+        else:
+            prompt = _build_text_prompt(resume_text, job_prompt)
+
+    body = {
+        "messages": [{"role": "user", "content": prompt}],
+        "temperature": 0.3,  # Lower temperature for more consistent scoring
+        "max_tokens": 1500
+    }
+    if GROQ_JSON_MODE:
+        body["response_format"] = {"type": "json_object"}
+
+    try:
+        return groq_client.chat_completion(groq_api_key, body, hedge=True, stage=stage, parse=_parse_response)
+    except CircuitOpenError:
+        # Groq is known to be down; answer locally without waiting on a timeout
+        return fallback_analysis(resume_text, job_text)
+    except Exception as e:
+        print(f"Error calling Groq API: {str(e)}")
+        return fallback_analysis(resume_text, job_text)
+
+
+def _build_text_prompt(resume_text: str, job_text: str) -> str:
+    return f"""
 You are an expert HR professional and ATS (Applicant Tracking System) specialist. Analyze the following resume and job description to provide a comprehensive matching assessment.
 
 IMPORTANT: Be realistic and precise with scoring. Most resumes will not be perfect matches. Use the full scale from 0-100:
@@ -54,60 +111,58 @@ Detailed Analysis:
 [2-3 sentences explaining the scoring rationale and overall assessment]
 """
 
-    groq_api_key = os.getenv("GROQ_API_KEY")
 
-    # Development fallback: if no GROQ API key is present, return a basic heuristic-based response
-    if not groq_api_key:
-        return _fallback_analysis(resume_text, job_text)
+def _parse_response(content: str) -> dict:
+    with tracing.span("response_parse"):
+        return _parse_model_content(content)
 
-    headers = {
-        "Authorization": f"Bearer {groq_api_key}",
-        "Content-Type": "application/json"
-    }
 
-    body = {
-        "model": "llama-3.1-70b-versatile",  # Use a more capable model
-        "messages": [{"role": "user", "content": prompt}],
-        "temperature": 0.3,  # Lower temperature for more consistent scoring
-        "max_tokens": 1500
-    }
-
-    try:
-        response = requests.post(
-            "https://api.groq.com/openai/v1/chat/completions",
-            headers=headers,
-            json=body,
-            timeout=30
-        )
-
-        if not response.ok:
-            print(f"Groq API call failed: {response.status_code} - {response.text}")
-            return _fallback_analysis(resume_text, job_text)
-
-        content = response.json()["choices"][0]["message"]["content"]
-        
-        # Parse the AI response
-        return _parse_ai_response(content)
-        
-    except Exception as e:
-        print(f"Error calling Groq API: {str(e)}")
-        return _fallback_analysis(resume_text, job_text)
+def _parse_model_content(content: str) -> dict:
+    """Parse a JSON-mode response in one pass, falling back to the text-format parser"""
+    if GROQ_JSON_MODE:
+        try:
+            fields = validate(parse_json_object(content), MATCH_SCHEMA)
+            metrics.increment("matcher.parse.json")
+            return _build_match_result(fields["score"], fields["missing_keywords"], fields["suggestions"], fields["analysis"])
+        except ValueError as e:
+            print(f"Structured response invalid, using text parser: {str(e)}")
+            metrics.increment("matcher.parse.json_invalid")
+    return _parse_ai_response(content)
 
 
-def _fallback_analysis(resume_text: str, job_text: str) -> dict:
+def fallback_analysis(resume_text: str, job_text: str) -> dict:
     """
-    Provide a more sophisticated fallback analysis when AI API is unavailable
+    Local analysis when the AI API is unavailable: the prompt's five weighted dimensions
+    scored heuristically, with recommendations aimed at the weakest ones
     """
-    import random
-    import hashlib
-    
-    # Create a deterministic but varied score based on content
-    combined_text = (resume_text + job_text).lower()
-    hash_obj = hashlib.md5(combined_text.encode())
-    seed = int(hash_obj.hexdigest()[:8], 16)
-    random.seed(seed)
+    result = heuristic_score(resume_text, job_text)
+    missing_keywords = result["missing_keywords"]
+    weakest = weakest_dimensions(result["dimensions"])
+
+    recommendations = [_DIMENSION_RECOMMENDATIONS[name] for name in weakest]
+    if len(recommendations) < 3:
+        recommendations.append("Add quantifiable achievements and metrics to demonstrate impact")
     
-    # Extract keywords from job posting
+    return {
+        "score": result["score"],
+        "summary": f"Missing: {', '.join(missing_keywords[:3])}" if missing_keywords else "Good keyword coverage detected",
+        "recommendations": recommendations[:3],
+        "dimensions": result["dimensions"],
+        "source": "fallback"
+    }
+
+
+_DIMENSION_RECOMMENDATIONS = {
+    "technical_skills": "Incorporate more job-specific keywords and technical skills into your resume",
+    "experience": "Ensure your experience section clearly aligns with the job requirements, including dates and scope",
+    "domain": "Highlight work in the same industry or problem domain as the posting",
+    "education": "Make degrees and certifications mentioned in the job posting easy to find",
+    "soft_skills": "Show collaboration, communication and leadership through concrete examples",
+}
+
+
+def _extract_job_keywords(job_text: str) -> set:
+    """Technical terms, acronyms and skills mentioned in a job posting"""
     job_keywords = set()
     # Look for technical terms, skills, and important keywords
     skill_patterns = [
@@ -123,12 +178,21 @@ def _fallback_analysis(resume_text: str, job_text: str) -> dict:
     
     # Remove common words
     stop_words = {'and', 'or', 'the', 'with', 'for', 'to', 'of', 'in', 'a', 'an', 'is', 'are', 'will', 'be', 'have', 'has'}
-    job_keywords = {kw for kw in job_keywords if kw not in stop_words and len(kw) > 2}
+    return {kw for kw in job_keywords if kw not in stop_words and len(kw) > 2}
+
+
+def local_prescore(resume_text: str, job_text: str) -> dict:
+    """
+    Deterministic keyword-overlap score between 30 and 90, cheap enough to run before
+    deciding whether an LLM call is worth making. Unlike the fallback analysis, which
+    weighs five dimensions with heuristic_scorer, it only looks at keyword coverage
+    """
+    job_keywords = _extract_job_keywords(job_text)
     
     # Check which keywords appear in resume
     resume_lower = resume_text.lower()
     found_keywords = {kw for kw in job_keywords if kw in resume_lower}
-    missing_keywords = list(job_keywords - found_keywords)[:5]
+    missing_keywords = sorted(job_keywords - found_keywords)[:5]
     
     # Calculate a more realistic score based on keyword overlap and content analysis
     if job_keywords:
@@ -136,26 +200,18 @@ def _fallback_analysis(resume_text: str, job_text: str) -> dict:
     else:
         keyword_match_ratio = 0.5
     
-    # Add some randomness based on content characteristics
     base_score = 30 + (keyword_match_ratio * 50)  # Base range 30-80
     
     # Adjust based on resume length and structure (more content usually means more complete)
     length_factor = min(len(resume_text) / 3000, 1.0) * 10  # Up to 10 points for comprehensive resume
     
-    # Add some deterministic variation based on content hash
-    variation = (seed % 21) - 10  # -10 to +10 variation
-    
-    final_score = max(25, min(95, int(base_score + length_factor + variation)))
-    
+    raw_score = base_score + length_factor
     return {
-        "score": final_score,
-        "summary": f"Missing: {', '.join(missing_keywords[:3])}" if missing_keywords else "Good keyword coverage detected",
-        "recommendations": [
-            "Incorporate more job-specific keywords and technical skills into your resume",
-            "Add quantifiable achievements and metrics to demonstrate impact",
-            "Ensure your experience section clearly aligns with the job requirements",
-            "Consider adding relevant projects or certifications mentioned in the job posting"
-        ][:3]
+        "score": max(25, min(95, int(raw_score))),
+        "raw_score": raw_score,
+        "keyword_count": len(job_keywords),
+        "match_ratio": keyword_match_ratio,
+        "missing_keywords": missing_keywords,
     }
 
 
@@ -171,6 +227,8 @@ def _parse_ai_response(content: str) -> dict:
         # Fallback: try to find any percentage in the content
         percent_match = re.search(r"(\d+)%", content)
         match_score = int(percent_match.group(1)) if percent_match else 65
+        if not percent_match:
+            metrics.increment("matcher.parse.default_score")
     
     # Extract missing keywords
     missing_section = re.search(r"Missing Keywords?:\s*\n((?:\* .+\n?)*)", content, re.IGNORECASE)
@@ -190,20 +248,31 @@ def _parse_ai_response(content: str) -> dict:
     analysis_section = re.search(r"Detailed Analysis:\s*\n(.+?)(?:\n\n|\Z)", content, re.IGNORECASE | re.DOTALL)
     detailed_analysis = analysis_section.group(1).strip() if analysis_section else ""
     
-    # Create summary
-    if missing_keywords:
-        summary = f"Missing: {', '.join(missing_keywords[:3])}"
-        if detailed_analysis:
-            summary += f". {detailed_analysis}"
-    else:
-        summary = detailed_analysis or "Good overall match with room for optimization"
-    
+    metrics.increment("matcher.parse.text")
+    return _build_match_result(match_score, missing_keywords, suggestions, detailed_analysis)
+
+
+def _build_match_result(match_score: int, missing_keywords: list, suggestions: list, detailed_analysis: str) -> dict:
+    """Assemble the analysis dict returned to the endpoints from parsed fields"""
     return {
         "score": match_score,
-        "summary": summary,
+        "summary": match_summary(missing_keywords, detailed_analysis),
+        "missing_keywords": missing_keywords,
+        "analysis": detailed_analysis,
+        "source": "llm",
         "recommendations": suggestions[:5] if suggestions else [
             "Optimize keywords to better match job requirements",
             "Add specific examples and metrics to demonstrate impact",
             "Enhance technical skills section with job-relevant technologies"
         ]
-    }
\ No newline at end of file
+    }
+
+
+def match_summary(missing_keywords: list, detailed_analysis: str) -> str:
+    """One-line summary of an LLM analysis: its top gaps followed by the scoring rationale"""
+    if missing_keywords:
+        summary = f"Missing: {', '.join(missing_keywords[:3])}"
+        if detailed_analysis:
+            summary += f". {detailed_analysis}"
+        return summary
+    return detailed_analysis or "Good overall match with room for optimization"
@@ -0,0 +1,27 @@
+import threading
+from typing import Dict
+
+_lock = threading.Lock()
+_counters: Dict[str, int] = {}
+
+
+def increment(name: str, amount: int = 1):
+    """Add to a named process-wide counter"""
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+def get(name: str) -> int:
+    with _lock:
+        return _counters.get(name, 0)
+
+
+def snapshot() -> Dict[str, int]:
+    """Copy of all counters, sorted by name"""
+    with _lock:
+        return dict(sorted(_counters.items()))
+
+
+def reset():
+    with _lock:
+        _counters.clear()
@@ -0,0 +1,127 @@
+import os
+import threading
+import time
+from typing import Dict, List
+
+from app.services import metrics
+
+# Models per stage, primary first. Override with e.g. GROQ_MODELS_RESCORE="model-a,model-b".
+# "edit" is one call that returns both the suggestions and the edited document
+DEFAULT_STAGE_MODELS = {
+    "match": ["llama-3.1-70b-versatile", "llama-3.1-8b-instant"],
+    "rescore": ["llama-3.1-8b-instant", "llama-3.1-70b-versatile"],
+    "edit": ["meta-llama/llama-4-scout-17b-16e-instruct", "llama-3.3-70b-versatile"],
+    "job_profile": ["llama-3.1-70b-versatile", "llama-3.1-8b-instant"],
+}
+
+# Latency objective per stage in milliseconds; a model whose smoothed latency exceeds it
+# loses its traffic to the next model in the stage's list
+DEFAULT_LATENCY_SLO_MS = {"match": 8000, "rescore": 4000, "edit": 30000, "job_profile": 15000}
+
+# A model is also demoted when its smoothed error rate passes this
+ROUTER_MAX_ERROR_RATE = float(os.getenv("ROUTER_MAX_ERROR_RATE", "0.5"))
+# Observations needed before a model can be demoted, and the smoothing factor for new ones
+ROUTER_MIN_SAMPLES = int(os.getenv("ROUTER_MIN_SAMPLES", "5"))
+ROUTER_EWMA_ALPHA = float(os.getenv("ROUTER_EWMA_ALPHA", "0.2"))
+# A demoted model gets one request after this many seconds without traffic, so it can recover
+ROUTER_PROBE_SECONDS = float(os.getenv("ROUTER_PROBE_SECONDS", "60"))
+# Models tried for one call: the routed model, then failovers on errors
+ROUTER_MAX_ATTEMPTS = int(os.getenv("ROUTER_MAX_ATTEMPTS", "2"))
+
+
+def _stage_models(stage: str) -> List[str]:
+    configured = os.getenv(f"GROQ_MODELS_{stage.upper()}", "")
+    models = [model.strip() for model in configured.split(",") if model.strip()]
+    return models or DEFAULT_STAGE_MODELS.get(stage) or DEFAULT_STAGE_MODELS["match"]
+
+
+def _latency_slo_ms(stage: str) -> float:
+    configured = os.getenv(f"LATENCY_SLO_MS_{stage.upper()}")
+    return float(configured) if configured else DEFAULT_LATENCY_SLO_MS.get(stage, DEFAULT_LATENCY_SLO_MS["match"])
+
+
+class ModelStats:
+    """Smoothed latency and error rate of one model, fed by every call made to it"""
+
+    def __init__(self):
+        self.samples = 0
+        self.latency_ms = 0.0
+        self.error_rate = 0.0
+        self.last_used = 0.0
+
+    def observe(self, latency_ms: float, ok: bool, alpha: float):
+        if self.samples == 0:
+            self.latency_ms, self.error_rate = latency_ms, 0.0 if ok else 1.0
+        else:
+            self.latency_ms += alpha * (latency_ms - self.latency_ms)
+            self.error_rate += alpha * ((0.0 if ok else 1.0) - self.error_rate)
+        self.samples += 1
+        self.last_used = time.monotonic()
+
+
+class ModelRouter:
+    """
+    Chooses the model for each call of a stage. The stage's models are tried in their
+    configured order, skipping any whose observed latency breaks the stage's SLO or
+    whose error rate is too high; demoted models are probed again after a quiet period.
+    Stats are per model and shared by all stages, since a slow model is slow for everyone
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, ModelStats] = {}
+
+    def _healthy(self, model: str, slo_ms: float) -> bool:
+        stats = self._stats.get(model)
+        if stats is None or stats.samples < ROUTER_MIN_SAMPLES:
+            return True
+        return stats.latency_ms <= slo_ms and stats.error_rate <= ROUTER_MAX_ERROR_RATE
+
+    def route(self, stage: str) -> List[str]:
+        """The stage's models in the order to try them for this call"""
+        models = _stage_models(stage)
+        slo_ms = _latency_slo_ms(stage)
+        now = time.monotonic()
+        with self._lock:
+            healthy = [model for model in models if self._healthy(model, slo_ms)]
+            # Only a demoted model ranked above the first healthy one is worth probing
+            outranking = models[:models.index(healthy[0])] if healthy else models
+            for model in outranking:
+                stats = self._stats.get(model)
+                if stats is not None and now - stats.last_used >= ROUTER_PROBE_SECONDS:
+                    # Reserve the probe so concurrent calls keep using the healthy model
+                    stats.last_used = now
+                    metrics.increment("router.probes")
+                    return [model] + [other for other in models if other != model]
+        ordered = healthy + [model for model in models if model not in healthy]
+        if ordered[0] != models[0]:
+            metrics.increment(f"router.{stage}.rerouted")
+        return ordered
+
+    def observe(self, model: str, latency_ms: float, ok: bool):
+        with self._lock:
+            self._stats.setdefault(model, ModelStats()).observe(latency_ms, ok, ROUTER_EWMA_ALPHA)
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    def stats(self) -> Dict:
+        """Per-stage routes and SLOs with each model's observed latency and error rate"""
+        with self._lock:
+            models = {
+                model: {
+                    "samples": stats.samples,
+                    "latency_ms": round(stats.latency_ms, 1),
+                    "error_rate": round(stats.error_rate, 3),
+                }
+                for model, stats in self._stats.items()
+            }
+        stages = {
+            stage: {"models": _stage_models(stage), "latency_slo_ms": _latency_slo_ms(stage)}
+            for stage in DEFAULT_STAGE_MODELS
+        }
+        return {"stages": stages, "models": models}
+
+
+router = ModelRouter()
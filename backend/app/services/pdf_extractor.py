@@ -0,0 +1,138 @@
+import os
+import re
+from typing import Callable, Dict, List, Tuple
+
+import pdfplumber
+from PyPDF2 import PdfReader
+
+from app.services import cancellation
+from app.services.pdf_layout import LayoutLine, PyPDF2LineCollector, pdfplumber_lines, segment_layout_lines
+from app.services.resume_sections import segment_resume_text
+
+# Backends are tried in this order; the last one is trusted even if its output looks poor
+PDF_EXTRACTORS = [name.strip() for name in os.getenv("PDF_EXTRACTORS", "pypdf2,pdfplumber").split(",") if name.strip()]
+
+# Quality thresholds for accepting the output of a non-final backend
+MIN_CHARS_PER_PAGE = int(os.getenv("PDF_MIN_CHARS_PER_PAGE", "100"))
+MIN_WORD_RATIO = float(os.getenv("PDF_MIN_WORD_RATIO", "0.5"))
+MAX_GARBLED_RATIO = float(os.getenv("PDF_MAX_GARBLED_RATIO", "0.02"))
+MAX_AVG_TOKEN_LENGTH = 20  # longer tokens usually mean the backend dropped the spaces between words
+
+_WORD_PATTERN = re.compile(r"^[A-Za-z][A-Za-z'\-\.]*[A-Za-z0-9+#]?[,;:\.\)]?$")
+_CID_PATTERN = re.compile(r"\(cid:\d+\)")
+
+
+def _extract_with_pypdf2(source) -> Tuple[str, int, List[LayoutLine]]:
+    """Fast path: PyPDF2 only decodes the content streams, no layout analysis. Font size
+    and weight are collected by a visitor during the same pass"""
+    reader = PdfReader(source)
+    collector = PyPDF2LineCollector()
+    texts = []
+    for page in reader.pages:
+        cancellation.check("pdf_extract")
+        texts.append(page.extract_text(visitor_text=collector) or "")
+        collector.end_line()
+    return "\n".join(texts), len(reader.pages), collector.lines
+
+
+def _extract_with_pdfplumber(source) -> Tuple[str, int, List[LayoutLine]]:
+    """Slow path: pdfplumber runs pdfminer's full layout analysis; the same page.chars
+    that build the text give the styled lines"""
+    with pdfplumber.open(source) as pdf:
+        texts = []
+        lines: List[LayoutLine] = []
+        for page in pdf.pages:
+            cancellation.check("pdf_extract")
+            texts.append(page.extract_text() or "")
+            lines.extend(pdfplumber_lines(page))
+        return "\n".join(texts), len(pdf.pages), lines
+
+
+_BACKENDS: Dict[str, Callable] = {
+    "pypdf2": _extract_with_pypdf2,
+    "pdfplumber": _extract_with_pdfplumber,
+}
+
+
+def assess_text_quality(text: str, page_count: int) -> Dict:
+    """Score extracted text on length, proportion of real words and garbled glyphs"""
+    stripped = text.strip()
+    tokens = stripped.split()
+    chars = len(stripped)
+
+    word_ratio = sum(1 for token in tokens if _WORD_PATTERN.match(token)) / len(tokens) if tokens else 0.0
+    avg_token_length = sum(len(token) for token in tokens) / len(tokens) if tokens else 0.0
+
+    garbled = len(_CID_PATTERN.findall(stripped)) * 6
+    for ch in stripped:
+        code = ord(ch)
+        if ch == "�" or 0xE000 <= code <= 0xF8FF or (code < 32 and ch not in "\n\r\t"):
+            garbled += 1
+    garbled_ratio = garbled / chars if chars else 1.0
+
+    reason = None
+    if chars < MIN_CHARS_PER_PAGE * max(page_count, 1):
+        reason = "too little text"
+    elif garbled_ratio > MAX_GARBLED_RATIO:
+        reason = "garbled glyphs"
+    elif word_ratio < MIN_WORD_RATIO:
+        reason = "low word ratio"
+    elif avg_token_length > MAX_AVG_TOKEN_LENGTH:
+        reason = "missing word spacing"
+
+    return {
+        "ok": reason is None,
+        "reason": reason,
+        "chars": chars,
+        "word_ratio": round(word_ratio, 3),
+        "garbled_ratio": round(garbled_ratio, 4),
+    }
+
+
+def extract_pdf_text(source) -> Dict:
+    """
+    Extract text from a PDF path or binary file object, trying the fast backend first
+    and falling back to pdfplumber only when the fast output fails the quality check.
+    The result also holds the resume's sections, segmented from font size and weight
+    """
+    attempts: List[Dict] = []
+    best = None
+    backends = [name for name in PDF_EXTRACTORS if name in _BACKENDS] or ["pdfplumber"]
+
+    for index, name in enumerate(backends):
+        is_last = index == len(backends) - 1
+        if hasattr(source, "seek"):
+            source.seek(0)
+        try:
+            text, page_count, lines = _BACKENDS[name](source)
+        except Exception as e:
+            attempts.append({"backend": name, "error": str(e)})
+            if is_last and best is None:
+                raise
+            continue
+
+        quality = assess_text_quality(text, page_count)
+        attempts.append({"backend": name, **quality})
+        result = {
+            "text": text,
+            "backend": name,
+            "pages": page_count,
+            "quality": quality,
+            "attempts": attempts,
+            "lines": lines,
+        }
+        if quality["ok"] or is_last:
+            return _with_sections(result)
+        if best is None or quality["chars"] > best["quality"]["chars"]:
+            best = result
+
+    # Every backend after the poor-quality one failed outright; keep what we have
+    return _with_sections(best)
+
+
+def _with_sections(result: Dict) -> Dict:
+    """Segment the extracted resume from its layout, falling back to heading lines in the text"""
+    sections = segment_layout_lines(result.pop("lines"))
+    result["segmentation"] = "layout" if sections else "text"
+    result["sections"] = sections or segment_resume_text(result["text"])
+    return result
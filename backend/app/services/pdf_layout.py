@@ -0,0 +1,113 @@
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from app.services.resume_sections import match_section_heading
+
+# A line is styled as a heading if its font is this much larger than the body text, or bold
+HEADING_SIZE_RATIO = 1.15
+HEADING_MAX_WORDS = 5
+
+# (text, font size, bold)
+LayoutLine = Tuple[str, float, bool]
+
+
+class PyPDF2LineCollector:
+    """
+    visitor_text callback for PyPDF2's extract_text: rebuilds the lines being extracted
+    together with their font size and weight, so text and layout come from one pass
+    """
+
+    def __init__(self):
+        self.lines: List[LayoutLine] = []
+        self._fragments: List[Tuple[str, float, bool]] = []
+
+    def __call__(self, text, cm, tm, font_dict, font_size):
+        scale = abs(tm[3] * cm[3]) or 1.0
+        size = round((font_size or 0) * scale, 1)
+        base_font = str((font_dict or {}).get("/BaseFont", ""))
+        bold = "bold" in base_font.lower() or "black" in base_font.lower()
+
+        parts = text.split("\n")
+        for index, part in enumerate(parts):
+            if index:
+                self.end_line()
+            if part:
+                self._fragments.append((part, size, bold))
+
+    def end_line(self):
+        if self._fragments:
+            self.lines.append(_merge_fragments(self._fragments))
+            self._fragments = []
+
+
+def _merge_fragments(fragments) -> LayoutLine:
+    """One line from styled fragments; size and weight are those of most of its characters"""
+    text = "".join(fragment for fragment, _, _ in fragments).strip()
+    sizes = Counter()
+    bold_chars = 0
+    for fragment, size, bold in fragments:
+        sizes[size] += len(fragment)
+        bold_chars += len(fragment) if bold else 0
+    total = sum(sizes.values()) or 1
+    return text, sizes.most_common(1)[0][0], bold_chars * 2 > total
+
+
+def pdfplumber_lines(page, y_tolerance: float = 3) -> List[LayoutLine]:
+    """Group a pdfplumber page's characters into lines by baseline, keeping font size and weight"""
+    rows: List[List[dict]] = []
+    for char in sorted(page.chars, key=lambda char: (round(char["top"]), char["x0"])):
+        if rows and abs(rows[-1][0]["top"] - char["top"]) <= y_tolerance:
+            rows[-1].append(char)
+        else:
+            rows.append([char])
+
+    lines = []
+    for row in rows:
+        row.sort(key=lambda char: char["x0"])
+        fragments = []
+        previous = None
+        for char in row:
+            # pdfplumber chars carry no spaces between words; infer them from the gaps
+            if previous is not None and char["x0"] - previous["x1"] > previous["size"] * 0.2:
+                fragments.append((" ", round(char["size"], 1), False))
+            fragments.append((char["text"], round(char["size"], 1), "bold" in char["fontname"].lower()))
+            previous = char
+        line = _merge_fragments(fragments)
+        if line[0]:
+            lines.append(line)
+    return lines
+
+
+def segment_layout_lines(lines: List[LayoutLine]) -> Optional[Dict[str, str]]:
+    """
+    Split styled lines into canonical sections. Headings are short lines set larger than
+    the body text or in bold that name a known section. Styled lines with unknown names
+    start an "other" section only if they look like the known headings (same style, and
+    capitalized or enlarged), so bold job titles stay in their section. Returns None if
+    the layout shows no section headings
+    """
+    if not lines:
+        return None
+    sizes = Counter()
+    for text, size, _ in lines:
+        sizes[size] += len(text)
+    body_size = sizes.most_common(1)[0][0]
+
+    sections: Dict[str, List[str]] = {"header": []}
+    current = "header"
+    heading_styles = set()
+    for text, size, bold in lines:
+        candidate = (size >= body_size * HEADING_SIZE_RATIO or bold) and len(text.split()) <= HEADING_MAX_WORDS
+        heading = match_section_heading(text) if candidate else None
+        if heading is None and candidate and (size, bold) in heading_styles and (text.isupper() or size > body_size):
+            heading = "other"
+        if heading:
+            heading_styles.add((size, bold))
+            current = heading
+            sections.setdefault(current, [])
+            continue
+        sections[current].append(text)
+
+    if not heading_styles:
+        return None
+    return {name: "\n".join(body).strip() for name, body in sections.items() if any(body)}
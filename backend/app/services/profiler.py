@@ -0,0 +1,133 @@
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Optional
+
+from app.services import metrics, tracing
+
+_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Off by default. A request is profiled if it is picked by PROFILE_SAMPLE_RATE (0-1) or if
+# it takes longer than PROFILE_SLOW_MS; a non-zero threshold means every request is sampled
+# and only the slow ones are kept
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_SLOW_MS = float(os.getenv("PROFILE_SLOW_MS", "0"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(_BACKEND_DIR, "data", "profiles"))
+
+# Stacks whose innermost frame is in one of these files are idle threads (event loop
+# select, thread pool workers waiting for work) and are not recorded
+_IDLE_FILES = ("selectors.py", "threading.py", "queue.py", "thread.py")
+
+
+def _collapse(frame) -> Optional[str]:
+    """Frame chain as a collapsed-stack line, outermost first, or None for idle threads"""
+    if os.path.basename(frame.f_code.co_filename) in _IDLE_FILES:
+        return None
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class _Sampler:
+    """
+    One background thread samples every thread's stack while at least one profiled
+    request is in flight. Samples are process-wide: concurrent requests see each other's
+    stacks, which is the price of catching work done in the event loop and worker threads
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._collectors = []
+        self._thread = None
+
+    def start(self, collector: Counter):
+        with self._lock:
+            self._collectors.append(collector)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+                self._thread.start()
+
+    def stop(self, collector: Counter) -> Counter:
+        """Detach a collector and return a copy of its samples; no sample is added after this"""
+        with self._lock:
+            self._collectors.remove(collector)
+            return Counter(collector)
+
+    def _run(self):
+        own_id = threading.get_ident()
+        interval = PROFILE_INTERVAL_MS / 1000
+        while True:
+            stacks = [
+                _collapse(frame)
+                for thread_id, frame in sys._current_frames().items()
+                if thread_id != own_id
+            ]
+            # Counted under the lock, so a collector is never written to once stop() returns
+            with self._lock:
+                if not self._collectors:
+                    self._thread = None
+                    return
+                for stack in stacks:
+                    if stack:
+                        for collector in self._collectors:
+                            collector[stack] += 1
+            time.sleep(interval)
+
+
+_sampler = _Sampler()
+
+
+def write_profile(request_id: str, samples: Counter, directory: str = None) -> str:
+    """Write samples in collapsed-stack format (flamegraph.pl, speedscope) and return the path"""
+    directory = directory or PROFILE_DIR
+    os.makedirs(directory, exist_ok=True)
+    safe_id = "".join(ch for ch in request_id if ch.isalnum() or ch in "-_") or "request"
+    path = os.path.join(directory, f"{safe_id}.collapsed")
+    with open(path, "w", encoding="utf-8") as profile_file:
+        for stack, count in samples.most_common():
+            profile_file.write(f"{stack} {count}\n")
+    return path
+
+
+class ProfilingMiddleware:
+    """
+    Sample the stacks of selected requests and save the profile under PROFILE_DIR named
+    by request ID. Must run inside TracingMiddleware, which assigns the request ID.
+    A profile holds every thread's stacks while the request ran, including those of
+    concurrent requests; it is process-wide, not limited to the request's own threads
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or (PROFILE_SAMPLE_RATE <= 0 and PROFILE_SLOW_MS <= 0):
+            await self.app(scope, receive, send)
+            return
+
+        sampled = random.random() < PROFILE_SAMPLE_RATE
+        samples: Counter = Counter()
+        started = time.perf_counter()
+        _sampler.start(samples)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            samples = _sampler.stop(samples)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            slow = PROFILE_SLOW_MS > 0 and elapsed_ms >= PROFILE_SLOW_MS
+            if (sampled or slow) and samples:
+                request_id = tracing.current_request_id() or f"untraced-{int(time.time() * 1000)}"
+                try:
+                    path = write_profile(request_id, samples)
+                    metrics.increment("profiler.saved")
+                    print(f"Saved profile for {scope.get('path')} ({elapsed_ms:.0f} ms): {path}")
+                except Exception as e:
+                    # A profiler fault must never fail the request it was watching
+                    print(f"Could not write profile: {str(e)}")
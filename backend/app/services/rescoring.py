@@ -0,0 +1,55 @@
+import os
+from typing import Dict, List
+
+from app.services.matcher import _extract_job_keywords
+from app.services.resume_sections import extract_skills, segment_latex_resume
+
+# "incremental" re-scores only the sections an edit touched; "full" re-runs the LLM analysis
+RESCORE_MODE = os.getenv("RESCORE_MODE", "incremental")
+
+# Points per fraction of job keywords covered, matching the local pre-score scale
+KEYWORD_COVERAGE_POINTS = 50
+
+
+def _covered(keywords: set, text: str) -> set:
+    lowered = text.lower()
+    return {keyword for keyword in keywords if keyword in lowered}
+
+
+def _job_keywords(job_text: str) -> set:
+    """Lowercased keywords and known skills of a job posting that a resume can cover"""
+    return _extract_job_keywords(job_text) | {skill.lower() for skill in extract_skills(job_text)}
+
+
+def rescore_edited_resume(original_latex: str, edited_latex: str, job_text: str, original_score: int) -> Dict:
+    """
+    Estimate the score of an edited resume from the original analysis. Sections are
+    diffed, and only changed sections are re-checked against the job's keywords; the
+    change in keyword coverage is converted into a score delta on the original score
+    """
+    original_sections = segment_latex_resume(original_latex)
+    edited_sections = segment_latex_resume(edited_latex)
+    names = list(dict.fromkeys(list(original_sections) + list(edited_sections)))
+    changed: List[str] = [name for name in names if original_sections.get(name) != edited_sections.get(name)]
+
+    if not changed:
+        return {"score": original_score, "delta": 0, "changed_sections": [], "keywords_gained": [], "keywords_lost": []}
+
+    keywords = _job_keywords(job_text)
+    unchanged_text = "\n".join(text for name, text in edited_sections.items() if name not in changed)
+    covered_elsewhere = _covered(keywords, unchanged_text)
+
+    before = covered_elsewhere | _covered(keywords, "\n".join(original_sections.get(name, "") for name in changed))
+    after = covered_elsewhere | _covered(keywords, "\n".join(edited_sections.get(name, "") for name in changed))
+
+    delta = 0
+    if keywords:
+        delta = round((len(after) - len(before)) / len(keywords) * KEYWORD_COVERAGE_POINTS)
+
+    return {
+        "score": max(0, min(100, original_score + delta)),
+        "delta": delta,
+        "changed_sections": changed,
+        "keywords_gained": sorted(after - before),
+        "keywords_lost": sorted(before - after),
+    }
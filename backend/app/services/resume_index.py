@@ -0,0 +1,136 @@
+import math
+import re
+import sqlite3
+from collections import Counter
+from typing import Dict, List
+
+from app.services.resume_sections import extract_skills
+
+# BM25 parameters, plus the extra weight given to a matched skill over a plain term
+BM25_K1 = 1.2
+BM25_B = 0.75
+SKILL_WEIGHT = 2.0
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:[./-][a-z0-9+#]+)*")
+_STOP_WORDS = {
+    "and", "or", "the", "with", "for", "to", "of", "in", "a", "an", "is", "are", "will", "be", "have", "has",
+    "on", "at", "by", "as", "we", "you", "our", "your", "this", "that", "from", "it", "its", "who", "what",
+    "can", "all", "not", "but", "they", "their", "etc", "such", "into", "also", "more", "other", "using",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased terms with stop words and single characters removed"""
+    return [token for token in _TOKEN_PATTERN.findall(text.lower()) if len(token) > 1 and token not in _STOP_WORDS]
+
+
+def ensure_schema(conn: sqlite3.Connection):
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS index_terms (
+            term TEXT NOT NULL,
+            resume_id TEXT NOT NULL,
+            tf INTEGER NOT NULL,
+            PRIMARY KEY (term, resume_id)
+        ) WITHOUT ROWID
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS index_terms_resume ON index_terms (resume_id)")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS index_docs (
+            resume_id TEXT PRIMARY KEY,
+            length INTEGER NOT NULL
+        )
+        """
+    )
+
+
+def add_resume(conn: sqlite3.Connection, resume_id: str, text: str, skills: List[str]):
+    """Index (or re-index) one resume; the caller owns the transaction"""
+    remove_resume(conn, resume_id)
+    terms = Counter(tokenize(text))
+    for skill in skills:
+        terms[_skill_term(skill)] += 1
+
+    conn.executemany(
+        "INSERT INTO index_terms (term, resume_id, tf) VALUES (?, ?, ?)",
+        [(term, resume_id, tf) for term, tf in terms.items()],
+    )
+    conn.execute(
+        "INSERT INTO index_docs (resume_id, length) VALUES (?, ?)",
+        (resume_id, sum(terms.values())),
+    )
+
+
+def remove_resume(conn: sqlite3.Connection, resume_id: str):
+    conn.execute("DELETE FROM index_terms WHERE resume_id = ?", (resume_id,))
+    conn.execute("DELETE FROM index_docs WHERE resume_id = ?", (resume_id,))
+
+
+def _skill_term(skill: str) -> str:
+    return "skill:" + skill.lower()
+
+
+def search(conn: sqlite3.Connection, job_text: str, top_k: int = 20) -> List[Dict]:
+    """
+    Rank indexed resumes against a job posting with BM25 over terms plus a boost for
+    matched skills. Only postings for the job's own terms are read, so cost grows with the
+    query size and the number of matching resumes, not the size of the pool
+    """
+    job_skills = extract_skills(job_text)
+    query = Counter(tokenize(job_text))
+    for skill in job_skills:
+        query[_skill_term(skill)] += 1
+    if not query:
+        return []
+
+    doc_count, total_length = conn.execute("SELECT COUNT(*), COALESCE(SUM(length), 0) FROM index_docs").fetchone()
+    if not doc_count:
+        return []
+    avg_length = total_length / doc_count
+
+    terms = list(query.keys())
+    postings: Dict[str, List] = {}
+    for start in range(0, len(terms), 500):
+        batch = terms[start:start + 500]
+        placeholders = ",".join("?" * len(batch))
+        for term, resume_id, tf in conn.execute(
+            f"SELECT term, resume_id, tf FROM index_terms WHERE term IN ({placeholders})", batch
+        ):
+            postings.setdefault(term, []).append((resume_id, tf))
+
+    candidate_ids = {resume_id for entries in postings.values() for resume_id, _ in entries}
+    if not candidate_ids:
+        return []
+    lengths = {}
+    candidates = list(candidate_ids)
+    for start in range(0, len(candidates), 500):
+        batch = candidates[start:start + 500]
+        for resume_id, length in conn.execute(
+            f"SELECT resume_id, length FROM index_docs WHERE resume_id IN ({','.join('?' * len(batch))})", batch
+        ):
+            lengths[resume_id] = length
+
+    scores: Dict[str, float] = {}
+    matched_skills: Dict[str, List[str]] = {}
+    skill_names = {_skill_term(skill): skill for skill in job_skills}
+    for term, entries in postings.items():
+        idf = math.log(1 + (doc_count - len(entries) + 0.5) / (len(entries) + 0.5))
+        weight = SKILL_WEIGHT if term in skill_names else 1.0
+        for resume_id, tf in entries:
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths.get(resume_id, avg_length) / avg_length)
+            scores[resume_id] = scores.get(resume_id, 0.0) + weight * idf * tf * (BM25_K1 + 1) / (tf + norm)
+            if term in skill_names:
+                matched_skills.setdefault(resume_id, []).append(skill_names[term])
+
+    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+    return [
+        {
+            "resume_id": resume_id,
+            "relevance": round(score, 3),
+            "matched_skills": matched_skills.get(resume_id, []),
+            "missing_skills": [skill for skill in job_skills if skill not in matched_skills.get(resume_id, [])],
+        }
+        for resume_id, score in ranked
+    ]
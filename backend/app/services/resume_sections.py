@@ -0,0 +1,146 @@
+import os
+import re
+from typing import Dict, List, Optional
+
+# Canonical section names and the headings that map to them
+SECTION_ALIASES = {
+    "summary": ["summary", "professional summary", "profile", "objective", "career objective", "about me", "about"],
+    "experience": [
+        "experience", "work experience", "professional experience", "employment", "employment history",
+        "work history", "relevant experience", "internships", "internship experience",
+    ],
+    "education": ["education", "academic background", "education and training", "academics"],
+    "skills": [
+        "skills", "technical skills", "core competencies", "competencies", "technologies",
+        "skills and tools", "tools and technologies", "technical proficiencies",
+    ],
+    "projects": ["projects", "personal projects", "academic projects", "selected projects", "side projects"],
+    "certifications": ["certifications", "certificates", "licenses and certifications", "courses"],
+    "awards": ["awards", "honors", "honors and awards", "achievements", "accomplishments"],
+    "publications": ["publications", "research", "papers"],
+    "leadership": ["leadership", "activities", "extracurricular activities", "volunteer", "volunteering", "volunteer experience"],
+    "languages": ["languages"],
+    "interests": ["interests", "hobbies"],
+    "references": ["references"],
+}
+
+# Sections that never help match a resume to a job (contact details, referees, hobbies);
+# left out of scoring prompts unless FILTER_PROMPT_SECTIONS=0
+PROMPT_EXCLUDED_SECTIONS = {"header", "references", "interests"}
+FILTER_PROMPT_SECTIONS = os.getenv("FILTER_PROMPT_SECTIONS", "1") == "1"
+
+_HEADING_LOOKUP = {
+    alias: canonical for canonical, aliases in SECTION_ALIASES.items() for alias in aliases
+}
+
+# Skills recognized by extract_skills; matched case-insensitively on word boundaries
+KNOWN_SKILLS = [
+    "Python", "Java", "JavaScript", "TypeScript", "C++", "C#", "Golang", "Rust", "Ruby", "PHP", "Swift",
+    "Kotlin", "Scala", "MATLAB", "SQL", "NoSQL", "Bash", "HTML", "CSS", "Sass",
+    "React", "Angular", "Vue", "Next.js", "Node.js", "Express", "Django", "Flask", "FastAPI", "Spring",
+    "Spring Boot", "Rails", ".NET", "ASP.NET", "GraphQL", "REST", "gRPC", "jQuery", "Tailwind",
+    "PostgreSQL", "MySQL", "SQLite", "MongoDB", "Redis", "Elasticsearch", "Cassandra", "DynamoDB",
+    "Kafka", "RabbitMQ", "Spark", "Hadoop", "Airflow", "Snowflake", "BigQuery", "dbt",
+    "AWS", "Azure", "GCP", "Docker", "Kubernetes", "Terraform", "Ansible", "Jenkins", "CI/CD",
+    "GitHub Actions", "Git", "Linux", "Nginx", "Microservices", "Serverless",
+    "Machine Learning", "Deep Learning", "NLP", "Computer Vision", "TensorFlow", "PyTorch",
+    "scikit-learn", "Pandas", "NumPy", "LLM", "Data Analysis", "Data Visualization", "Tableau", "Power BI",
+    "Excel", "Statistics", "A/B Testing", "ETL",
+    "Agile", "Scrum", "Jira", "Figma", "Unit Testing", "TDD", "Selenium", "Jest", "Pytest",
+    "Communication", "Leadership", "Teamwork", "Collaboration", "Problem Solving", "Mentoring",
+    "Project Management", "Stakeholder Management", "Customer Service",
+]
+
+_SKILL_PATTERNS = [
+    (skill, re.compile(r"(?<![\w+#.])" + re.escape(skill.lower()) + r"(?![\w+#]|\.\w)"))
+    for skill in KNOWN_SKILLS
+]
+
+
+def extract_skills(text: str) -> List[str]:
+    """Return the known skills mentioned in the text, in canonical spelling"""
+    lowered = text.lower()
+    return [skill for skill, pattern in _SKILL_PATTERNS if pattern.search(lowered)]
+
+
+def match_section_heading(line: str):
+    """Map a heading line such as 'WORK EXPERIENCE:' to its canonical section name"""
+    cleaned = re.sub(r"[^a-z& ]", "", line.lower().replace("&", " and ")).strip()
+    cleaned = re.sub(r"\s+", " ", cleaned)
+    if not cleaned or len(cleaned) > 40:
+        return None
+    return _HEADING_LOOKUP.get(cleaned)
+
+
+def segment_resume_text(text: str) -> Dict[str, str]:
+    """
+    Split plain resume text into canonical sections using heading lines; text before the
+    first heading (name, contact details) goes to "header"
+    """
+    sections: Dict[str, List[str]] = {"header": []}
+    current = "header"
+    for line in text.split("\n"):
+        heading = match_section_heading(line) if len(line.split()) <= 5 else None
+        if heading:
+            current = heading
+            sections.setdefault(current, [])
+            continue
+        sections[current].append(line)
+    return {name: "\n".join(lines).strip() for name, lines in sections.items() if "\n".join(lines).strip()}
+
+
+def split_latex_sections(latex_content: str) -> Dict[str, str]:
+    """Split LaTeX source on \\section commands, keyed by canonical (or raw lowercased) title"""
+    sections: Dict[str, str] = {}
+    matches = list(re.finditer(r"\\section\*?\{([^}]*)\}", latex_content))
+    preamble_end = matches[0].start() if matches else len(latex_content)
+    sections["header"] = latex_content[:preamble_end]
+
+    for index, match in enumerate(matches):
+        end = matches[index + 1].start() if index + 1 < len(matches) else len(latex_content)
+        title = match.group(1).strip()
+        name = match_section_heading(title) or title.lower()
+        body = latex_content[match.end():end]
+        sections[name] = sections[name] + body if name in sections else body
+    return sections
+
+
+def latex_to_plain_text(latex_content: str) -> str:
+    """Extract plain text from LaTeX content by removing LaTeX commands"""
+    # Remove LaTeX commands (starting with \)
+    text = re.sub(r'\\[a-zA-Z]+(\{[^}]*\})?', '', latex_content)
+
+    # Remove LaTeX environments
+    text = re.sub(r'\\begin\{[^}]*\}.*?\\end\{[^}]*\}', '', text, flags=re.DOTALL)
+
+    # Remove remaining LaTeX syntax
+    text = re.sub(r'[{}]', '', text)
+    text = re.sub(r'\\[a-zA-Z]+', '', text)
+
+    # Clean up whitespace
+    text = re.sub(r'\s+', ' ', text).strip()
+
+    return text
+
+
+def segment_latex_resume(latex_content: str) -> Dict[str, str]:
+    """Canonical sections of a LaTeX resume as plain text"""
+    sections = {}
+    for name, body in split_latex_sections(latex_content).items():
+        text = latex_to_plain_text(body)
+        if text:
+            sections[name] = text
+    return sections
+
+
+def prompt_resume_text(text: str, sections: Optional[Dict[str, str]]) -> str:
+    """
+    Resume text for scoring prompts: the relevant sections only, each under its heading.
+    The full text is used if filtering is off or no section headings were found
+    """
+    if not FILTER_PROMPT_SECTIONS or not sections:
+        return text
+    kept = [(name, body) for name, body in sections.items() if name not in PROMPT_EXCLUDED_SECTIONS]
+    if not kept:
+        return text
+    return "\n\n".join(f"{name.upper()}\n{body}" for name, body in kept)
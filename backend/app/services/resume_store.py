@@ -0,0 +1,170 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+from app.services import resume_index
+from app.services.resume_sections import extract_skills, segment_latex_resume, segment_resume_text
+
+_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+RESUME_STORE_PATH = os.getenv("RESUME_STORE_PATH", os.path.join(_BACKEND_DIR, "data", "resume_store.db"))
+
+_schema_lock = threading.Lock()
+_schema_ready = set()
+
+
+def connect(path: Optional[str] = None) -> sqlite3.Connection:
+    """Open the resume store, creating the schema on first use"""
+    path = path or RESUME_STORE_PATH
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=10)
+    conn.row_factory = sqlite3.Row
+
+    with _schema_lock:
+        if path not in _schema_ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS resumes (
+                    resume_id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    filename TEXT,
+                    content_hash TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    source TEXT,
+                    skills TEXT NOT NULL,
+                    sections TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+                """
+            )
+            resume_index.ensure_schema(conn)
+            _backfill_index(conn)
+            conn.commit()
+            _schema_ready.add(path)
+    return conn
+
+
+def _backfill_index(conn: sqlite3.Connection):
+    """Index resumes stored before the index existed"""
+    rows = conn.execute(
+        "SELECT resume_id, text, skills FROM resumes WHERE resume_id NOT IN (SELECT resume_id FROM index_docs)"
+    ).fetchall()
+    for row in rows:
+        resume_index.add_resume(conn, row["resume_id"], row["text"], json.loads(row["skills"]))
+
+
+def build_resume_profile(
+    text: str, kind: str, source: Optional[str] = None, sections: Optional[Dict[str, str]] = None
+) -> Dict:
+    """
+    Parse a resume once into the fields that every later analysis reuses. PDFs pass the
+    sections already segmented from their layout during extraction
+    """
+    if not sections and kind == "tex" and source:
+        sections = segment_latex_resume(source)
+    elif not sections:
+        sections = segment_resume_text(text)
+    return {
+        "text": text,
+        "source": source,
+        "skills": extract_skills(text),
+        "sections": sections,
+    }
+
+
+def save_resume(
+    content_hash: str,
+    kind: str,
+    text: str,
+    source: Optional[str] = None,
+    filename: str = "",
+    path: Optional[str] = None,
+    sections: Optional[Dict[str, str]] = None,
+) -> Dict:
+    """
+    Store a parsed resume and return its profile. The id is derived from the upload's
+    SHA-256, so uploading the same file again returns the same resume_id
+    """
+    profile = build_resume_profile(text, kind, source, sections)
+    resume_id = content_hash[:32]
+    created_at = time.time()
+
+    conn = connect(path)
+    try:
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO resumes
+                (resume_id, kind, filename, content_hash, text, source, skills, sections, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                resume_id, kind, filename, content_hash, text, source,
+                json.dumps(profile["skills"]), json.dumps(profile["sections"]), created_at,
+            ),
+        )
+        resume_index.add_resume(conn, resume_id, text, profile["skills"])
+        conn.commit()
+    finally:
+        conn.close()
+
+    return {
+        "resume_id": resume_id,
+        "kind": kind,
+        "filename": filename,
+        "created_at": created_at,
+        **profile,
+    }
+
+
+def get_resume(resume_id: str, path: Optional[str] = None) -> Optional[Dict]:
+    """Load a stored resume profile, or None if the id is unknown"""
+    conn = connect(path)
+    try:
+        row = conn.execute("SELECT * FROM resumes WHERE resume_id = ?", (resume_id,)).fetchone()
+    finally:
+        conn.close()
+    if row is None:
+        return None
+
+    return {
+        "resume_id": row["resume_id"],
+        "kind": row["kind"],
+        "filename": row["filename"],
+        "created_at": row["created_at"],
+        "text": row["text"],
+        "source": row["source"],
+        "skills": json.loads(row["skills"]),
+        "sections": json.loads(row["sections"]),
+    }
+
+
+def delete_resume(resume_id: str, path: Optional[str] = None) -> bool:
+    """Remove a stored resume; returns False if it did not exist"""
+    conn = connect(path)
+    try:
+        cursor = conn.execute("DELETE FROM resumes WHERE resume_id = ?", (resume_id,))
+        resume_index.remove_resume(conn, resume_id)
+        conn.commit()
+        return cursor.rowcount > 0
+    finally:
+        conn.close()
+
+
+def search_resumes(job_text: str, top_k: int = 20, path: Optional[str] = None) -> List[Dict]:
+    """Top-K stored resumes for a job posting by local relevance score, with filenames"""
+    conn = connect(path)
+    try:
+        results = resume_index.search(conn, job_text, top_k)
+        if results:
+            ids = [result["resume_id"] for result in results]
+            filenames = dict(conn.execute(
+                f"SELECT resume_id, filename FROM resumes WHERE resume_id IN ({','.join('?' * len(ids))})", ids
+            ).fetchall())
+            for result in results:
+                result["filename"] = filenames.get(result["resume_id"], "")
+        return results
+    finally:
+        conn.close()
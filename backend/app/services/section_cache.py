@@ -0,0 +1,165 @@
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from app.services import metrics
+from app.services.matcher import match_summary
+from app.services.rescoring import KEYWORD_COVERAGE_POINTS, _covered, _job_keywords
+from app.services.resume_sections import extract_skills, segment_resume_text
+
+# Jobs whose section analyses are kept (least recently used evicted); 0 disables the cache
+SECTION_CACHE_SIZE = int(os.getenv("SECTION_CACHE_SIZE", "256"))
+# LLM-scored resume versions kept per job
+SECTION_CACHE_VERSIONS = int(os.getenv("SECTION_CACHE_VERSIONS", "8"))
+# Largest share of sections that may change for a resubmission to be merged instead of re-analyzed
+SECTION_CACHE_MAX_CHANGED = float(os.getenv("SECTION_CACHE_MAX_CHANGED", "0.34"))
+
+_SPACE_PATTERN = re.compile(r"\s+")
+
+_cache_lock = threading.Lock()
+# job hash -> LLM-scored versions of resumes, newest last
+_versions: "OrderedDict[str, List[dict]]" = OrderedDict()
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(_SPACE_PATTERN.sub(" ", text).strip().encode("utf-8")).hexdigest()
+
+
+class SectionAnalysis:
+    """
+    A resume's sections hashed against one job. Findings per section (the job keywords
+    it covers and the job's skills it shows) are computed only for sections whose hash
+    has no stored findings; the LLM analysis of a version is stored alongside them
+    """
+
+    def __init__(self, resume_text: str, job_text: str):
+        self.job_hash = _digest(job_text)
+        self._job_text = job_text
+        self._keywords = None
+        self._sections = segment_resume_text(resume_text)
+        self.hashes = {name: _digest(text) for name, text in self._sections.items()}
+        self.findings: Dict[str, dict] = {}
+
+    @property
+    def keywords(self) -> set:
+        if self._keywords is None:
+            self._keywords = _job_keywords(self._job_text)
+        return self._keywords
+
+    def compute_findings(self, known: Optional[Dict[str, dict]] = None):
+        """Fill in findings, reusing those of sections found unchanged in known (keyed by hash)"""
+        known = known or {}
+        job_skills = None
+        for name, text in self._sections.items():
+            if name in self.findings:
+                continue
+            if self.hashes[name] in known:
+                self.findings[name] = known[self.hashes[name]]
+                continue
+            if job_skills is None:
+                job_skills = set(extract_skills(self._job_text))
+            self.findings[name] = {
+                "hash": self.hashes[name],
+                "covered": sorted(_covered(self.keywords, text)),
+                "skills": sorted(job_skills & set(extract_skills(text))),
+            }
+
+    def covered(self) -> set:
+        return {keyword for finding in self.findings.values() for keyword in finding["covered"]}
+
+    def skills(self) -> List[str]:
+        return sorted({skill for finding in self.findings.values() for skill in finding["skills"]})
+
+
+def _changed_sections(old: Dict[str, str], new: Dict[str, str]) -> List[str]:
+    return [name for name in dict.fromkeys(list(old) + list(new)) if old.get(name) != new.get(name)]
+
+
+def lookup(analysis: SectionAnalysis) -> Optional[dict]:
+    """
+    Merge a resubmitted resume into the closest stored version for the same job. Unchanged
+    sections keep their stored findings and only the changed ones are recomputed; their
+    change in keyword coverage moves the stored LLM score. Returns None when
+    no stored version is close enough
+    """
+    if SECTION_CACHE_SIZE <= 0:
+        return None
+    new_hashes = analysis.hashes
+    with _cache_lock:
+        versions = _versions.get(analysis.job_hash)
+        if versions:
+            _versions.move_to_end(analysis.job_hash)
+            versions = list(versions)
+    if not versions:
+        metrics.increment("section_cache.misses")
+        return None
+
+    best = min(versions, key=lambda version: len(_changed_sections(version["hashes"], new_hashes)))
+    changed = _changed_sections(best["hashes"], new_hashes)
+    if len(changed) > SECTION_CACHE_MAX_CHANGED * max(len(best["hashes"]), len(new_hashes)):
+        metrics.increment("section_cache.misses")
+        return None
+
+    analysis.compute_findings({finding["hash"]: finding for finding in best["findings"].values()})
+    before = {keyword for finding in best["findings"].values() for keyword in finding["covered"]}
+    after = analysis.covered()
+    delta = round((len(after) - len(before)) / len(analysis.keywords) * KEYWORD_COVERAGE_POINTS) if analysis.keywords else 0
+    metrics.increment("section_cache.hits" if changed else "section_cache.exact_hits")
+
+    gained, lost = sorted(after - before), sorted(before - after)
+    result = dict(best["result"])
+    result["score"] = max(0, min(100, (result.get("score") or 0) + delta))
+    _merge_gaps(result, gained, lost)
+    result["incremental"] = {
+        "changed_sections": changed,
+        "delta": delta,
+        "keywords_gained": gained,
+        "keywords_lost": lost,
+        "matched_skills": analysis.skills(),
+    }
+    return result
+
+
+def _mentions(text: str, keywords: List[str]) -> bool:
+    return any(re.search(rf"(?<![\w+#]){re.escape(keyword)}(?![\w+#])", text, re.IGNORECASE) for keyword in keywords)
+
+
+def _merge_gaps(result: dict, gained: List[str], lost: List[str]):
+    """
+    Carry the stored analysis's gaps over to the resubmission: keywords the changed
+    sections now cover are no longer missing and no longer recommended, keywords they
+    dropped become missing, and the summary is rebuilt from the merged list
+    """
+    if not gained and not lost:
+        return
+    missing = [keyword for keyword in result.get("missing_keywords") or [] if not _mentions(keyword, gained)]
+    missing += [keyword for keyword in lost if not any(keyword == existing.lower() for existing in missing)]
+    result["missing_keywords"] = missing
+    result["recommendations"] = [
+        recommendation for recommendation in result.get("recommendations") or [] if not _mentions(recommendation, gained)
+    ]
+    result["summary"] = match_summary(missing, result.get("analysis", ""))
+
+
+def store(analysis: SectionAnalysis, result: dict):
+    """Keep an LLM analysis of a resume version as a base for later resubmissions"""
+    if SECTION_CACHE_SIZE <= 0:
+        return
+    analysis.compute_findings()
+    version = {"hashes": analysis.hashes, "findings": dict(analysis.findings), "result": dict(result)}
+    with _cache_lock:
+        versions = _versions.setdefault(analysis.job_hash, [])
+        versions[:] = [existing for existing in versions if existing["hashes"] != version["hashes"]]
+        versions.append(version)
+        del versions[:-SECTION_CACHE_VERSIONS]
+        _versions.move_to_end(analysis.job_hash)
+        while len(_versions) > SECTION_CACHE_SIZE:
+            _versions.popitem(last=False)
+
+
+def clear():
+    with _cache_lock:
+        _versions.clear()
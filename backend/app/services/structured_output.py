@@ -0,0 +1,87 @@
+import json
+import os
+import re
+from typing import Dict
+
+# Ask Groq for compact JSON objects instead of the free-text formats parsed with regexes
+GROQ_JSON_MODE = os.getenv("GROQ_JSON_MODE", "1") == "1"
+
+# Compact schemas for JSON-mode responses: field -> (type, required)
+MATCH_SCHEMA = {
+    "score": (int, True),
+    "missing_keywords": (list, False),
+    "suggestions": (list, False),
+    "analysis": (str, False),
+}
+
+EDIT_SCHEMA = {
+    "skills_additions": (list, False),
+    "experience_enhancements": (list, False),
+    "keywords_to_include": (list, False),
+    "latex_modifications": (list, False),
+    "complete_latex": (str, False),
+}
+
+JOB_PROFILE_SCHEMA = {
+    "title": (str, False),
+    "seniority": (str, False),
+    "experience": (str, False),
+    "required_skills": (list, True),
+    "preferred_skills": (list, False),
+    "domain": (str, False),
+    "education": (str, False),
+    "responsibilities": (list, False),
+}
+
+_FENCE_PATTERN = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+
+def parse_json_object(content: str) -> Dict:
+    """Parse a model response that should be a single JSON object"""
+    text = _FENCE_PATTERN.sub("", content.strip())
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        # Tolerate prose around the object; still a single linear scan
+        start, end = text.find("{"), text.rfind("}")
+        if start == -1 or end <= start:
+            raise ValueError("Response does not contain a JSON object")
+        data = json.loads(text[start:end + 1])
+    if not isinstance(data, dict):
+        raise ValueError("Response JSON is not an object")
+    return data
+
+
+def validate(data: Dict, schema: Dict) -> Dict:
+    """
+    Check a parsed response against a schema, coercing near-misses (numeric strings,
+    comma-separated lists) and dropping unknown fields. Raises ValueError if a required
+    field is missing or unusable
+    """
+    result = {}
+    for field, (expected, required) in schema.items():
+        value = data.get(field)
+        if value is None:
+            if required:
+                raise ValueError(f"Missing required field: {field}")
+            result[field] = [] if expected is list else ""
+            continue
+
+        if expected is int:
+            try:
+                value = int(round(float(str(value).strip().rstrip("%"))))
+            except (ValueError, OverflowError):
+                raise ValueError(f"Field {field} is not a number: {value!r}")
+            value = max(0, min(100, value))
+        elif expected is list:
+            if isinstance(value, str):
+                value = value.split(",")
+            if not isinstance(value, list):
+                raise ValueError(f"Field {field} is not a list")
+            value = [str(item).strip() for item in value if str(item).strip()]
+        elif expected is str:
+            if not isinstance(value, str):
+                raise ValueError(f"Field {field} is not a string")
+            value = value.strip()
+        result[field] = value
+    return result
@@ -0,0 +1,137 @@
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+# Append every finished request's spans to this JSONL file when set
+TRACE_LOG_PATH = os.getenv("TRACE_LOG_PATH", "")
+
+_current_trace: ContextVar[Optional["Trace"]] = ContextVar("current_trace", default=None)
+_log_lock = threading.Lock()
+
+
+class Trace:
+    """Spans recorded for one request. Spans from worker threads land here too, since
+    asyncio.to_thread copies the request's context"""
+
+    def __init__(self, request_id: str, method: str = "", path: str = ""):
+        self.request_id = request_id
+        self.method = method
+        self.path = path
+        self.started = time.perf_counter()
+        self.started_at = time.time()
+        self.spans: List[Dict] = []
+
+    def add(self, name: str, start: float, end: float):
+        self.spans.append({
+            "name": name,
+            "start_ms": round((start - self.started) * 1000, 2),
+            "duration_ms": round((end - start) * 1000, 2),
+        })
+
+    def elapsed_ms(self) -> float:
+        return round((time.perf_counter() - self.started) * 1000, 2)
+
+    def server_timing(self) -> str:
+        """Server-Timing header value: one entry per span name (durations summed), then the total"""
+        totals: Dict[str, float] = {}
+        for span_record in list(self.spans):
+            totals[span_record["name"]] = totals.get(span_record["name"], 0.0) + span_record["duration_ms"]
+        entries = [f"{name};dur={duration:.1f}" for name, duration in totals.items()]
+        entries.append(f"total;dur={self.elapsed_ms():.1f}")
+        return ", ".join(entries)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+def current_request_id() -> Optional[str]:
+    trace = _current_trace.get()
+    return trace.request_id if trace else None
+
+
+@contextmanager
+def span(name: str):
+    """Time a block as a named span of the current request; a no-op outside a request"""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(name, start, time.perf_counter())
+
+
+def record(name: str, seconds: float):
+    """Add a span measured by the caller, for stages interleaved with others (e.g. a
+    streamed download parsed chunk by chunk); it is logged as ending now"""
+    trace = _current_trace.get()
+    if trace is not None:
+        end = time.perf_counter()
+        trace.add(name, end - seconds, end)
+
+
+def _write_trace_log(trace: Trace, status: int):
+    entry = {
+        "request_id": trace.request_id,
+        "method": trace.method,
+        "path": trace.path,
+        "status": status,
+        "started_at": trace.started_at,
+        "duration_ms": trace.elapsed_ms(),
+        "spans": trace.spans,
+    }
+    line = json.dumps(entry) + "\n"
+    with _log_lock:
+        with open(TRACE_LOG_PATH, "a", encoding="utf-8") as log_file:
+            log_file.write(line)
+
+
+class TracingMiddleware:
+    """
+    Start a trace per HTTP request, return its spans in a Server-Timing header along with
+    an X-Request-ID, and append them to TRACE_LOG_PATH once the response has been sent.
+    Streamed responses only report the spans finished before their first byte in the header
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        request_id = headers.get(b"x-request-id", b"").decode("latin-1")[:64] or uuid.uuid4().hex
+        trace = Trace(request_id, scope.get("method", ""), scope.get("path", ""))
+        token = _current_trace.set(trace)
+        status = 500
+
+        async def tracing_send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                extra = [
+                    (b"server-timing", trace.server_timing().encode("latin-1")),
+                    (b"x-request-id", request_id.encode("latin-1")),
+                ]
+                message = {**message, "headers": list(message.get("headers", [])) + extra}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, tracing_send)
+        finally:
+            _current_trace.reset(token)
+            if TRACE_LOG_PATH:
+                try:
+                    _write_trace_log(trace, status)
+                except OSError as e:
+                    print(f"Could not write trace log: {str(e)}")
@@ -0,0 +1,234 @@
+import codecs
+import hashlib
+import os
+import re
+from tempfile import SpooledTemporaryFile
+from typing import Optional
+
+from app.services import tracing
+
+# Upload limits, enforced while the upload is streamed in rather than after it is buffered
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(5 * 1024 * 1024)))
+MAX_PDF_PAGES = int(os.getenv("MAX_PDF_PAGES", "10"))
+MAX_REQUEST_BYTES = int(os.getenv("MAX_REQUEST_BYTES", str(2 * MAX_UPLOAD_BYTES + 256 * 1024)))
+
+UPLOAD_CHUNK_SIZE = 64 * 1024
+UPLOAD_SPOOL_BYTES = 1024 * 1024  # bytes kept in memory before spilling to a temp file
+
+PDF_MAGIC = b"%PDF-"
+_BINARY_MAGICS = (PDF_MAGIC, b"PK\x03\x04", b"\x89PNG", b"\xff\xd8\xff", b"GIF8")
+
+# "/Type /Page" but not "/Type /Pages"; one match per page object in uncompressed PDFs
+_PDF_PAGE_PATTERN = re.compile(rb"/Type\s*/Page(?![a-zA-Z])")
+_PAGE_SCAN_OVERLAP = 64
+
+
+class UploadRejected(ValueError):
+    """Raised when an upload fails validation; carries the HTTP status to report"""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class IngestedUpload:
+    """An upload that has been streamed to a bounded spool file, with its digest and size"""
+
+    def __init__(self, kind: str, filename: str, spool, sha256: str, size: int, pages: Optional[int]):
+        self.kind = kind
+        self.filename = filename
+        self.file = spool
+        self.sha256 = sha256
+        self.size = size
+        self.pages = pages
+
+    def read_bytes(self) -> bytes:
+        self.file.seek(0)
+        return self.file.read()
+
+    def read_text(self) -> str:
+        return self.read_bytes().decode("utf-8")
+
+    def close(self):
+        self.file.close()
+
+
+class _PageCounter:
+    """Counts page objects across chunk boundaries without holding more than one chunk"""
+
+    def __init__(self):
+        self.count = 0
+        self._tail = b""
+
+    def feed(self, chunk: bytes):
+        buffer = self._tail + chunk
+        # Only count matches ending in the new bytes, and only once a lookahead byte exists
+        for match in _PDF_PAGE_PATTERN.finditer(buffer):
+            if len(self._tail) <= match.end() < len(buffer):
+                self.count += 1
+        self._tail = buffer[-_PAGE_SCAN_OVERLAP:]
+
+    def finish(self) -> int:
+        # A page marker at the very end of the stream never got its lookahead byte
+        for match in _PDF_PAGE_PATTERN.finditer(self._tail):
+            if match.end() == len(self._tail):
+                self.count += 1
+        self._tail = b""
+        return self.count
+
+
+def _sniff(kind: str, head: bytes):
+    """Validate the leading bytes instead of trusting the client-supplied content type"""
+    if kind == "pdf":
+        # The header may be preceded by up to 1 KB of junk according to the PDF spec
+        if PDF_MAGIC not in head[:1024]:
+            raise UploadRejected("Only PDF files are accepted.")
+    elif kind == "tex":
+        if head.startswith(_BINARY_MAGICS) or b"\x00" in head:
+            raise UploadRejected("Only .tex files are accepted.")
+
+
+async def ingest_upload(
+    upload,
+    kind: str,
+    max_bytes: Optional[int] = None,
+    max_pages: Optional[int] = None,
+) -> IngestedUpload:
+    """
+    Stream an UploadFile in fixed-size chunks, hashing, sniffing and size-checking as it
+    arrives so oversized or mislabelled uploads are rejected before they are buffered
+    """
+    with tracing.span("upload_read"):
+        return await _stream_upload(upload, kind, max_bytes, max_pages)
+
+
+async def _stream_upload(upload, kind: str, max_bytes: Optional[int], max_pages: Optional[int]) -> IngestedUpload:
+    max_bytes = max_bytes or MAX_UPLOAD_BYTES
+    max_pages = max_pages or MAX_PDF_PAGES
+
+    digest = hashlib.sha256()
+    spool = SpooledTemporaryFile(max_size=UPLOAD_SPOOL_BYTES)
+    page_counter = _PageCounter() if kind == "pdf" else None
+    decoder = codecs.getincrementaldecoder("utf-8")() if kind == "tex" else None
+    size = 0
+    head = b""
+    sniffed = False
+
+    try:
+        while True:
+            chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+
+            if len(head) < 1024:
+                head += chunk[:1024 - len(head)]
+            if not sniffed and len(head) >= 1024:
+                _sniff(kind, head)
+                sniffed = True
+
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadRejected(f"File too large. Maximum size is {max_bytes // 1024} KB.", status_code=413)
+
+            if page_counter:
+                page_counter.feed(chunk)
+                if page_counter.count > max_pages:
+                    raise UploadRejected(f"PDF has too many pages. Maximum is {max_pages}.", status_code=413)
+            if decoder:
+                try:
+                    decoder.decode(chunk)
+                except UnicodeDecodeError:
+                    raise UploadRejected("LaTeX file must be UTF-8 encoded.")
+
+            digest.update(chunk)
+            spool.write(chunk)
+
+        if size == 0:
+            raise UploadRejected("Uploaded file is empty.")
+        if not sniffed:
+            _sniff(kind, head)
+
+        pages = None
+        if page_counter:
+            pages = page_counter.finish()
+            if pages > max_pages:
+                raise UploadRejected(f"PDF has too many pages. Maximum is {max_pages}.", status_code=413)
+        if decoder:
+            try:
+                decoder.decode(b"", final=True)
+            except UnicodeDecodeError:
+                raise UploadRejected("LaTeX file must be UTF-8 encoded.")
+    except Exception:
+        spool.close()
+        raise
+
+    spool.seek(0)
+    return IngestedUpload(kind, upload.filename or "", spool, digest.hexdigest(), size, pages)
+
+
+class _RequestTooLarge(Exception):
+    pass
+
+
+class RequestSizeLimitMiddleware:
+    """
+    ASGI middleware that rejects request bodies over a byte limit before the multipart
+    parser spools them, using Content-Length when present and a running count otherwise
+    """
+
+    def __init__(self, app, max_bytes: int = MAX_REQUEST_BYTES):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        content_length = headers.get(b"content-length")
+        if content_length and content_length.isdigit() and int(content_length) > self.max_bytes:
+            await self._reject(send)
+            return
+
+        received = 0
+        too_large = False
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received, too_large
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    too_large = True
+                    raise _RequestTooLarge()
+            return message
+
+        async def guarded_send(message):
+            nonlocal response_started
+            if too_large:
+                # The framework may turn the aborted body read into its own error response;
+                # replace it with a 413 so clients see the real reason
+                if message["type"] == "http.response.start" and not response_started:
+                    response_started = True
+                    await self._reject(send)
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except _RequestTooLarge:
+            if not response_started:
+                await self._reject(send)
+
+    async def _reject(self, send):
+        body = b'{"detail":"Request body too large."}'
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Score every resume in a directory against every job in a jobs file, offline, with the
+same extraction and matching code the API uses.
+
+    python batch_analyze.py --resumes applicants/ --jobs jobs.txt --output results.jsonl
+    python batch_analyze.py --resumes applicants/ --jobs jobs.jsonl --output results.csv --llm-concurrency 8
+
+Resumes are .pdf or .tex files. The jobs file is either plain text, one posting URL or
+job corpus id per line, or JSONL with an "id" and a "text" (or "url"/"job_id") per line.
+
+Resumes are parsed in a process pool. Resume/job pairs are scored in a thread pool
+sized by --llm-concurrency. Each result is appended to the output as soon as it is
+ready, so an interrupted run can be restarted with the same arguments: pairs already in
+the output without an error are skipped.
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services import job_corpus
+from app.services.cascade import SCORING_MODE, score_resume
+from app.services.job_scraper import scrape_job_description
+from app.services.pdf_extractor import extract_pdf_text
+from app.services.resume_sections import latex_to_plain_text, prompt_resume_text
+
+RESUME_EXTENSIONS = (".pdf", ".tex")
+
+OUTPUT_FIELDS = [
+    "resume_file", "resume_sha256", "job_key", "job_source", "score", "tier", "source",
+    "summary", "recommendations", "error", "elapsed_ms", "finished_at",
+]
+
+
+def extract_resume(path: str):
+    """Process-pool worker: (path, resume text for scoring, None), or (path, None, error message)"""
+    try:
+        if path.lower().endswith(".tex"):
+            with open(path, encoding="utf-8", errors="replace") as tex_file:
+                return path, latex_to_plain_text(tex_file.read()), None
+        extraction = extract_pdf_text(path)
+        return path, prompt_resume_text(extraction["text"], extraction["sections"]), None
+    except Exception as e:
+        return path, None, str(e)
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as resume_file:
+        for chunk in iter(lambda: resume_file.read(64 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _resume_files(directory: str):
+    for name in sorted(os.listdir(directory)):
+        if name.lower().endswith(RESUME_EXTENSIONS):
+            yield os.path.join(directory, name)
+
+
+def _job_text(source: str) -> str:
+    """A posting URL or job corpus id, read from the corpus when present, else scraped"""
+    if source.startswith(("http://", "https://")):
+        job = job_corpus.get_job_by_url(source)
+        return job["text"] if job else scrape_job_description(source)
+    job = job_corpus.get_job(source)
+    if job is None:
+        raise ValueError(f"unknown job_id {source}")
+    return job["text"]
+
+
+def load_jobs(path: str):
+    """Jobs as (key, source, text) plus (source, error) for jobs that could not be loaded"""
+    jobs, failures = [], []
+    with open(path, encoding="utf-8") as jobs_file:
+        lines = [line.strip() for line in jobs_file if line.strip() and not line.startswith("#")]
+
+    for line in lines:
+        try:
+            if line.startswith("{"):
+                entry = json.loads(line)
+                source = entry.get("url") or entry.get("job_id") or ""
+                text = entry.get("text") or _job_text(source)
+                key = str(entry.get("id") or entry.get("job_id") or job_corpus.job_id_for_source(source or text))
+            else:
+                source, text = line, _job_text(line)
+                key = line if not line.startswith(("http://", "https://")) else job_corpus.job_id_for_source(line)
+        except Exception as e:
+            failures.append((line[:100], str(e)))
+            continue
+        jobs.append((key, source, text))
+    return jobs, failures
+
+
+class ResultWriter:
+    """Appends results to a JSONL or CSV file, one flushed row at a time"""
+
+    def __init__(self, path: str):
+        self.csv = path.lower().endswith(".csv")
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        if not new_file:
+            with open(path, "rb") as existing:
+                existing.seek(-1, os.SEEK_END)
+                partial_line = existing.read(1) != b"\n"
+        self._file = open(path, "a", encoding="utf-8", newline="")
+        if not new_file and partial_line:
+            # Finish a row cut short by an interrupted run so the next one starts on its own line
+            self._file.write("\n")
+        if self.csv:
+            self._writer = csv.DictWriter(self._file, fieldnames=OUTPUT_FIELDS)
+            if new_file:
+                self._writer.writeheader()
+
+    def write(self, row: dict):
+        if self.csv:
+            self._writer.writerow({**row, "recommendations": " | ".join(row.get("recommendations") or [])})
+        else:
+            self._file.write(json.dumps(row) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def completed_pairs(path: str) -> set:
+    """(resume_sha256, job_key) pairs already in the output without an error"""
+    if not os.path.exists(path):
+        return set()
+    with open(path, encoding="utf-8", newline="") as output_file:
+        if path.lower().endswith(".csv"):
+            rows = list(csv.DictReader(output_file))
+        else:
+            rows = []
+            for line in output_file:
+                try:
+                    rows.append(json.loads(line))
+                except ValueError:
+                    continue  # a line cut short by an interrupted run
+    return {(row["resume_sha256"], row["job_key"]) for row in rows if not row.get("error")}
+
+
+def score_pair(resume_path: str, resume_sha: str, resume_text: str, job, mode: str) -> dict:
+    """Thread-pool worker: one output row for a resume/job pair"""
+    key, source, text = job
+    row = {"resume_file": os.path.basename(resume_path), "resume_sha256": resume_sha, "job_key": key, "job_source": source}
+    started = time.perf_counter()
+    try:
+        result = score_resume(resume_text, text, mode)
+        row.update({
+            "score": result.get("score"),
+            "tier": result.get("tier"),
+            "source": result.get("source"),
+            "summary": result.get("summary"),
+            "recommendations": result.get("recommendations", []),
+        })
+    except Exception as e:
+        row["error"] = str(e)
+    row["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    row["finished_at"] = time.time()
+    return row
+
+
+class Progress:
+    """Done/total, throughput and ETA on stderr"""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.done = 0
+        self.failed = 0
+        self.started = time.monotonic()
+
+    def update(self, row: dict):
+        self.done += 1
+        self.failed += 1 if row.get("error") else 0
+        elapsed = time.monotonic() - self.started
+        rate = self.done / elapsed if elapsed else 0.0
+        eta = (self.total - self.done) / rate if rate else 0.0
+        print(
+            f"\r[{self.done}/{self.total}] {rate:.2f} pairs/s, {self.failed} failed, ETA {eta:.0f}s",
+            end="", file=sys.stderr, flush=True,
+        )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Score a directory of resumes against a list of jobs")
+    parser.add_argument("--resumes", required=True, help="directory of .pdf and .tex resumes")
+    parser.add_argument("--jobs", required=True, help="job URLs or corpus ids, one per line, or JSONL")
+    parser.add_argument("--output", required=True, help="results file, .jsonl or .csv; appended to and resumed")
+    parser.add_argument("--llm-concurrency", type=int, default=4, help="pairs scored at once")
+    parser.add_argument("--parse-workers", type=int, default=os.cpu_count() or 2, help="resume parser processes")
+    parser.add_argument("--mode", choices=("llm", "cascade"), default=SCORING_MODE, help="scoring mode")
+    args = parser.parse_args(argv)
+
+    jobs, job_failures = load_jobs(args.jobs)
+    for source, error in job_failures:
+        print(f"FAILED job {source}: {error}", file=sys.stderr)
+    if not jobs:
+        print("No jobs to score", file=sys.stderr)
+        return 1
+
+    done = completed_pairs(args.output)
+    pending = {}
+    for path in _resume_files(args.resumes):
+        resume_sha = _file_sha256(path)
+        remaining = [job for job in jobs if (resume_sha, job[0]) not in done]
+        if remaining:
+            pending[path] = (resume_sha, remaining)
+
+    total = sum(len(remaining) for _, remaining in pending.values())
+    print(f"{total} pairs to score, {len(done)} already done", file=sys.stderr)
+    progress = Progress(total)
+    writer = ResultWriter(args.output)
+
+    try:
+        with ProcessPoolExecutor(max_workers=args.parse_workers) as parse_pool, \
+                ThreadPoolExecutor(max_workers=max(1, args.llm_concurrency)) as score_pool:
+            outstanding = {parse_pool.submit(extract_resume, path): "parse" for path in pending}
+            while outstanding:
+                finished, _ = wait(outstanding, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    if outstanding.pop(future) == "score":
+                        row = future.result()
+                        writer.write(row)
+                        progress.update(row)
+                        continue
+
+                    path, resume_text, error = future.result()
+                    resume_sha, remaining = pending[path]
+                    if resume_text is None:
+                        for key, source, _ in remaining:
+                            row = {"resume_file": os.path.basename(path), "resume_sha256": resume_sha, "job_key": key,
+                                   "job_source": source, "error": f"extraction failed: {error}", "finished_at": time.time()}
+                            writer.write(row)
+                            progress.update(row)
+                        continue
+                    for job in remaining:
+                        outstanding[score_pool.submit(score_pair, path, resume_sha, resume_text, job, args.mode)] = "score"
+    finally:
+        writer.close()
+
+    print(file=sys.stderr)
+    elapsed = time.monotonic() - progress.started
+    print(f"Scored {progress.done - progress.failed} pairs in {elapsed:.1f}s; {progress.failed} failed; results in {args.output}")
+    return 1 if progress.failed and progress.failed == progress.done else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
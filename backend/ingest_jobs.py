@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Bulk-load job postings into the local job corpus so API requests can use them by
+job_id (or by URL) without scraping on the request path.
+
+    python ingest_jobs.py --urls urls.txt
+    python ingest_jobs.py --html-dir saved_pages/
+
+URLs are fetched one at a time per host, with --host-delay seconds between requests to
+the same host; different hosts are fetched in parallel. Pages are parsed in a process
+pool with the same extraction used by scrape_job_description.
+"""
+
+import argparse
+import html
+import os
+import re
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services import job_corpus
+from app.services.job_scraper import fetch_job_page, parse_job_stream
+
+_TITLE_PATTERN = re.compile(r"<title[^>]*>(.*?)</title>", re.IGNORECASE | re.DOTALL)
+_CANONICAL_PATTERN = re.compile(r"<link[^>]+rel=[\"']canonical[\"'][^>]*href=[\"']([^\"']+)", re.IGNORECASE)
+
+
+def parse_page(source: str, page_html: str, url: str):
+    """Process-pool worker: (source, job text, title), or (source, None, error message)"""
+    try:
+        # The same parse a live scrape of the URL runs, so corpus and scraped text match
+        text = parse_job_stream([page_html.encode("utf-8")], url)
+    except Exception as e:
+        return source, None, str(e)
+    title_match = _TITLE_PATTERN.search(page_html)
+    title = html.unescape(title_match.group(1)).strip() if title_match else ""
+    return source, text, title
+
+
+def _read_url_list(path: str):
+    with open(path, encoding="utf-8") as url_file:
+        urls = [line.strip() for line in url_file if line.strip() and not line.startswith("#")]
+    return list(dict.fromkeys(urls))
+
+
+def _html_files(directory: str):
+    for name in sorted(os.listdir(directory)):
+        if name.lower().endswith((".html", ".htm")):
+            yield os.path.join(directory, name)
+
+
+def ingest_urls(urls, parse_pool, host_delay: float, fetch_workers: int):
+    """Fetch URLs host by host and submit each page to the parse pool as it arrives"""
+    by_host = defaultdict(list)
+    for url in urls:
+        by_host[urlparse(url).netloc].append(url)
+
+    parse_futures = []
+    futures_lock = threading.Lock()
+    failures = []
+
+    def fetch_host(host_urls):
+        for position, url in enumerate(host_urls):
+            if position:
+                time.sleep(host_delay)
+            try:
+                fetched_url, page_html = fetch_job_page(url)
+            except Exception as e:
+                failures.append((url, f"fetch failed: {str(e)}"))
+                continue
+            with futures_lock:
+                parse_futures.append(parse_pool.submit(parse_page, url, page_html, fetched_url))
+
+    with ThreadPoolExecutor(max_workers=fetch_workers) as fetchers:
+        list(fetchers.map(fetch_host, by_host.values()))
+    return parse_futures, failures
+
+
+def ingest_html_dir(directory: str, parse_pool):
+    """Submit every saved page in a directory; its canonical link, if any, is used as the URL"""
+    parse_futures = []
+    for path in _html_files(directory):
+        with open(path, encoding="utf-8", errors="replace") as page_file:
+            page_html = page_file.read()
+        canonical = _CANONICAL_PATTERN.search(page_html)
+        source = canonical.group(1) if canonical else os.path.abspath(path)
+        parse_futures.append(parse_pool.submit(parse_page, source, page_html, source))
+    return parse_futures
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Load job postings into the local job corpus")
+    sources = parser.add_mutually_exclusive_group(required=True)
+    sources.add_argument("--urls", help="file with one job URL per line")
+    sources.add_argument("--html-dir", help="directory of saved job posting pages")
+    parser.add_argument("--corpus", default=job_corpus.JOB_CORPUS_PATH, help="SQLite corpus path")
+    parser.add_argument("--host-delay", type=float, default=2.0, help="seconds between requests to one host")
+    parser.add_argument("--fetch-workers", type=int, default=4, help="hosts fetched in parallel")
+    parser.add_argument("--parse-workers", type=int, default=os.cpu_count() or 2, help="parser processes")
+    args = parser.parse_args(argv)
+
+    failures = []
+    stored = 0
+    with ProcessPoolExecutor(max_workers=args.parse_workers) as parse_pool:
+        if args.urls:
+            parse_futures, failures = ingest_urls(
+                _read_url_list(args.urls), parse_pool, args.host_delay, args.fetch_workers
+            )
+        else:
+            parse_futures = ingest_html_dir(args.html_dir, parse_pool)
+
+        for future in as_completed(parse_futures):
+            source, text, title_or_error = future.result()
+            if text is None:
+                failures.append((source, title_or_error))
+                continue
+            record = job_corpus.save_job(source, text, title=title_or_error, path=args.corpus)
+            stored += 1
+            print(f"{record['job_id']}  {len(record['text']):>6} chars  {source}")
+
+    for source, error in failures:
+        print(f"FAILED {source}: {error}", file=sys.stderr)
+    print(f"Stored {stored} postings in {args.corpus}; {len(failures)} failed")
+    return 1 if failures and not stored else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Report LLM token use and latency from the ledger written by the API, per endpoint and
+stage, for capacity planning and prompt sizing.
+
+    python llm_usage_report.py                     # last 24 hours
+    python llm_usage_report.py --hours 168 --bucket-minutes 1440
+    python llm_usage_report.py --json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services import llm_ledger
+
+_COLUMNS = [
+    ("window", 16), ("endpoint", 24), ("stage", 8), ("calls", 6), ("parsed", 7), ("fallbk", 7),
+    ("error", 6), ("prompt_tok", 11), ("compl_tok", 10), ("avg_ms", 8), ("p95_ms", 8), ("ms/1k_tok", 10),
+]
+
+
+def _format_row(group: dict) -> str:
+    window = group.get("window_start")
+    latency = group["latency_ms"]
+    values = [
+        datetime.fromtimestamp(window).strftime("%Y-%m-%d %H:%M") if window is not None else "all",
+        group["endpoint"] or "(no request)",
+        group["stage"],
+        group["calls"],
+        group["outcomes"]["parsed"],
+        group["outcomes"]["fallback"],
+        group["outcomes"]["error"],
+        group["prompt_tokens"],
+        group["completion_tokens"],
+        latency["avg"] if latency["avg"] is not None else "-",
+        latency["p95"] if latency["p95"] is not None else "-",
+        group["ms_per_1k_prompt_tokens"] if group["ms_per_1k_prompt_tokens"] is not None else "-",
+    ]
+    return "  ".join(str(value)[:width].ljust(width) for value, (_, width) in zip(values, _COLUMNS))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Summarize LLM calls recorded in the ledger")
+    parser.add_argument("--hours", type=float, default=24, help="how far back to report")
+    parser.add_argument("--bucket-minutes", type=int, help="split the report into windows of this size")
+    parser.add_argument("--ledger", default=llm_ledger.LLM_LEDGER_PATH, help="SQLite ledger path")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args(argv)
+
+    if not args.ledger or not os.path.exists(args.ledger):
+        print(f"No ledger at {args.ledger or '(LLM_LEDGER_PATH is empty)'}", file=sys.stderr)
+        return 1
+
+    bucket_seconds = args.bucket_minutes * 60 if args.bucket_minutes else None
+    groups = llm_ledger.summarize(time.time() - args.hours * 3600, None, bucket_seconds, path=args.ledger)
+    if args.json:
+        print(json.dumps(groups, indent=2))
+        return 0
+
+    print("  ".join(name.ljust(width) for name, width in _COLUMNS))
+    for group in groups:
+        print(_format_row(group))
+    total_tokens = sum(group["prompt_tokens"] + group["completion_tokens"] for group in groups)
+    print(f"{sum(group['calls'] for group in groups)} calls, {total_tokens} tokens in the last {args.hours:g} hours")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,39 @@
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
-from typing import Optional
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Response
+from typing import List, Optional
 from fastapi.middleware.cors import CORSMiddleware
-from tempfile import NamedTemporaryFile
-import pdfplumber
+from fastapi.responses import JSONResponse, StreamingResponse
+from collections import OrderedDict
+import asyncio
+import io
+import json
+import os
 import re
+import time
+import zipfile
 
+from app.services.job_corpus import get_job, get_job_by_url
 from app.services.job_scraper import scrape_job_description
-from app.services.matcher import analyze_resume_and_job_groq  # Assuming you have this function
+from app.services.matcher import analyze_resume_and_job_groq, fallback_analysis
 from app.services.latex_editor import LaTeXResumeEditor
+from app.services import admission, llm_ledger, metrics, model_router, tracing
+from app.services.admission import LoadSheddingMiddleware, Overloaded, admission_stats
+from app.services.cancellation import CancellationMiddleware
+from app.services.cascade import cascade_stats, score_with_llm, score_without_llm
+from app.services.compression import CompressionMiddleware
+from app.services.groq_client import circuit_stats
+from app.services.latex_diff import make_patch, source_digest, unified_diff
+from app.services.pdf_extractor import extract_pdf_text
+from app.services.profiler import ProfilingMiddleware
+from app.services.rescoring import RESCORE_MODE, rescore_edited_resume
+from app.services.resume_sections import latex_to_plain_text, prompt_resume_text
+from app.services.tracing import TracingMiddleware
+from app.services.resume_store import delete_resume, get_resume, save_resume, search_resumes
+from app.services.upload_ingest import (
+    MAX_PDF_PAGES,
+    RequestSizeLimitMiddleware,
+    UploadRejected,
+    ingest_upload,
+)
 
 app = FastAPI()
 
@@ -20,216 +46,698 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Stop a request's scraping, PDF parsing and LLM calls when its client disconnects
+app.add_middleware(CancellationMiddleware)
+
+# Reject oversized request bodies before the multipart parser spools them
+app.add_middleware(RequestSizeLimitMiddleware)
+
+# Compress large JSON bodies (edited LaTeX, job descriptions) with brotli or gzip
+app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+# Opt-in stack sampling of slow or randomly picked requests (PROFILE_SAMPLE_RATE, PROFILE_SLOW_MS)
+app.add_middleware(ProfilingMiddleware)
+
+# Shed requests to the expensive endpoints with 503 and Retry-After once too many are in flight
+app.add_middleware(LoadSheddingMiddleware)
+
+# Outermost, so the Server-Timing total covers the other middleware too
+app.add_middleware(TracingMiddleware)
+
+# LaTeX editing response modes: full documents, a line patch, or a unified diff against the upload
+LATEX_RESPONSE_MODES = ("full", "patch", "diff")
+
+# Multi-job tailoring returns a stream of variants or one zip of edited .tex files
+TAILOR_OUTPUTS = ("ndjson", "zip")
+
+@app.exception_handler(UploadRejected)
+async def upload_rejected_handler(request, exc: UploadRejected):
+    return JSONResponse(status_code=exc.status_code, content={"detail": str(exc)})
+
+@app.exception_handler(Overloaded)
+async def overloaded_handler(request, exc: Overloaded):
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": str(exc.retry_after)})
+
+# Extracted PDF text keyed by upload SHA-256, so re-uploads of the same file skip parsing
+PDF_TEXT_CACHE_SIZE = int(os.getenv("PDF_TEXT_CACHE_SIZE", "128"))
+_pdf_text_cache: "OrderedDict[str, dict]" = OrderedDict()
+
 # Initialize LaTeX editor
 latex_editor = LaTeXResumeEditor()
 
+# Concurrent LLM calls allowed per multi-job request, and jobs accepted per request
+MAX_LLM_CONCURRENCY = int(os.getenv("MAX_LLM_CONCURRENCY", "4"))
+MAX_COMPARE_JOBS = int(os.getenv("MAX_COMPARE_JOBS", "20"))
+
 @app.post("/analyze/")
 async def analyze_resume_and_job(
-    resume: UploadFile = File(...),
+    response: Response,
+    resume: Optional[UploadFile] = File(None),
+    resume_id: Optional[str] = Form(None),
     job_url: Optional[str] = Form(None),
     job_description: Optional[str] = Form(None),
+    job_id: Optional[str] = Form(None),
 ):
-    # Validate file type
-    if resume.content_type != "application/pdf":
-        raise HTTPException(status_code=400, detail="Only PDF files are accepted.")
-
-    # Save and parse PDF
-    with NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-        tmp.write(await resume.read())
-        tmp_path = tmp.name
-
-    try:
-        with pdfplumber.open(tmp_path) as pdf:
-            resume_text = "\n".join([page.extract_text() or "" for page in pdf.pages])
-    except Exception as e:
-        raise HTTPException(status_code=500, detail="Error reading PDF")
+    # Use the stored profile if given, otherwise stream in and parse the uploaded PDF
+    resume_text = await _load_resume_text(resume, resume_id, response)
 
     # If job_description provided by the client, use it. Otherwise try scraping job_url.
-    if not job_description:
-        if not job_url:
-            raise HTTPException(status_code=400, detail="Either job_url or job_description must be provided.")
-        try:
-            job_description = scrape_job_description(job_url)
-        except Exception as e:
-            # Provide a clear error so frontend can suggest fallback to paste job description
-            raise HTTPException(
-                status_code=500,
-                detail=f"Error scraping job URL: {str(e)}"
-            )
+    job_description = await _load_job_description(job_url, job_description, job_id)
 
     # Match using your logic (Groq, embedding comparison, etc.)
     try:
-        match_result = analyze_resume_and_job_groq(resume_text, job_description)
+        match_result = await _score_resume(resume_text, job_description)
+    except Overloaded:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Matching error: {str(e)}")
+    response.headers["X-Scoring-Tier"] = match_result["tier"]
 
-    return {
+    result = {
         "summary": match_result["summary"],
         "score": match_result.get("score"),
         "recommendations": match_result.get("recommendations", [])
     }
+    # Local fallback scores explain themselves with per-dimension sub-scores
+    if "dimensions" in match_result:
+        result["dimensions"] = match_result["dimensions"]
+    # Resubmissions merged from the section cache say which sections were re-checked
+    if "incremental" in match_result:
+        result["incremental"] = match_result["incremental"]
+    return result
 
 @app.post("/edit-latex-resume/")
 async def edit_latex_resume(
-    latex_file: UploadFile = File(...),
+    latex_file: Optional[UploadFile] = File(None),
+    resume_id: Optional[str] = Form(None),
     job_url: Optional[str] = Form(None),
     job_description: Optional[str] = Form(None),
+    job_id: Optional[str] = Form(None),
+    response_mode: str = Form("full"),
 ):
     """
     Edit LaTeX resume to better match job description
-    Accepts .tex files and returns improved version
+    Accepts .tex files (or the resume_id of a stored one) and returns improved version.
+    With response_mode "patch" or "diff" only the changes against the uploaded source
+    are returned, without echoing the original document or the job description
     """
-    # Validate file type
-    if not latex_file.filename.endswith('.tex'):
-        raise HTTPException(status_code=400, detail="Only .tex files are accepted.")
-    
-    # Read LaTeX content
-    try:
-        latex_content = (await latex_file.read()).decode('utf-8')
-    except Exception as e:
-        raise HTTPException(status_code=500, detail="Error reading LaTeX file")
+    _check_response_mode(response_mode)
+    latex_content, resume_text = await _load_latex_resume(latex_file, resume_id)
     
     # Get job description
-    if not job_description:
-        if not job_url:
-            raise HTTPException(status_code=400, detail="Either job_url or job_description must be provided.")
-        try:
-            job_description = scrape_job_description(job_url)
-        except Exception as e:
-            raise HTTPException(
-                status_code=500,
-                detail=f"Error scraping job URL: {str(e)}"
-            )
+    job_description = await _load_job_description(job_url, job_description, job_id)
     
-    # Extract plain text from LaTeX for context (remove LaTeX commands)
-    resume_text = _extract_plain_text_from_latex(latex_content)
-    
-    # First, analyze the original resume to get the current score
     try:
-        original_analysis = analyze_resume_and_job_groq(resume_text, job_description)
-        original_score = original_analysis.get("score", 0)
-    except Exception as e:
-        original_score = 0
-    
-    # Edit the LaTeX resume
-    try:
-        edit_result = latex_editor.edit_resume_for_job(latex_content, job_description, resume_text)
-        
-        if "error" in edit_result:
-            raise HTTPException(status_code=500, detail=edit_result["error"])
-        
-        # Analyze the edited resume to get the new score
-        edited_text = _extract_plain_text_from_latex(edit_result["edited_latex"])
-        try:
-            new_analysis = analyze_resume_and_job_groq(edited_text, job_description)
-            new_score = new_analysis.get("score", 0)
-        except Exception as e:
-            new_score = original_score
-        
-        return {
-            "original_latex": edit_result["original_latex"],
-            "edited_latex": edit_result["edited_latex"],
-            "suggestions": edit_result["suggestions"],
-            "changes_made": edit_result["changes_made"],
-            "job_description": job_description,
-            "original_score": original_score,
-            "new_score": new_score,
-            "score_improvement": new_score - original_score
-        }
-        
+        async with admission.admit("llm"):
+            tailored = await asyncio.to_thread(_tailor_latex, latex_content, resume_text, job_description)
+    except Overloaded:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error editing LaTeX resume: {str(e)}")
 
+    result = _tailored_payload(tailored, response_mode)
+    if response_mode == "full":
+        result["job_description"] = job_description
+    return result
+
 @app.post("/analyze-and-edit/")
 async def analyze_and_edit_resume(
-    resume: UploadFile = File(...),
+    response: Response,
+    resume: Optional[UploadFile] = File(None),
+    resume_id: Optional[str] = Form(None),
     latex_file: Optional[UploadFile] = File(None),
     job_url: Optional[str] = Form(None),
     job_description: Optional[str] = Form(None),
+    job_id: Optional[str] = Form(None),
+    response_mode: str = Form("full"),
 ):
     """
     Combined endpoint: analyze PDF resume and optionally edit LaTeX version
     Returns both analysis results and edited LaTeX if provided
     """
-    # Validate PDF file
-    if resume.content_type != "application/pdf":
-        raise HTTPException(status_code=400, detail="Only PDF files are accepted for resume analysis.")
-    
-    # Save and parse PDF
-    with NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-        tmp.write(await resume.read())
-        tmp_path = tmp.name
+    _check_response_mode(response_mode)
 
-    try:
-        with pdfplumber.open(tmp_path) as pdf:
-            resume_text = "\n".join([page.extract_text() or "" for page in pdf.pages])
-    except Exception as e:
-        raise HTTPException(status_code=500, detail="Error reading PDF")
+    # Use the stored profile if given, otherwise stream in and parse the uploaded PDF
+    resume_text = await _load_resume_text(resume, resume_id, response)
 
     # Get job description
-    if not job_description:
-        if not job_url:
-            raise HTTPException(status_code=400, detail="Either job_url or job_description must be provided.")
-        try:
-            job_description = scrape_job_description(job_url)
-        except Exception as e:
-            raise HTTPException(
-                status_code=500,
-                detail=f"Error scraping job URL: {str(e)}"
-            )
+    job_description = await _load_job_description(job_url, job_description, job_id)
 
     # Analyze resume
     try:
-        match_result = analyze_resume_and_job_groq(resume_text, job_description)
+        match_result = await _score_resume(resume_text, job_description)
+    except Overloaded:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Matching error: {str(e)}")
+    response.headers["X-Scoring-Tier"] = match_result["tier"]
 
     # Prepare response
-    response = {
+    result = {
         "analysis": {
             "summary": match_result["summary"],
             "score": match_result.get("score"),
             "recommendations": match_result.get("recommendations", [])
         },
-        "job_description": job_description
     }
+    if response_mode == "full":
+        result["job_description"] = job_description
 
     # If LaTeX file provided, also edit it
     if latex_file and latex_file.filename.endswith('.tex'):
         try:
-            latex_content = (await latex_file.read()).decode('utf-8')
-            latex_text = _extract_plain_text_from_latex(latex_content)
+            latex_upload = await ingest_upload(latex_file, "tex")
+            latex_content = latex_upload.read_text()
+            latex_upload.close()
+            latex_text = latex_to_plain_text(latex_content)
             
-            edit_result = latex_editor.edit_resume_for_job(latex_content, job_description, latex_text)
+            with tracing.span("latex_edit"):
+                async with admission.admit("llm"):
+                    edit_result = await asyncio.to_thread(
+                        latex_editor.edit_resume_for_job, latex_content, job_description, latex_text
+                    )
             
             if "error" not in edit_result:
-                response["latex_editing"] = {
-                    "original_latex": edit_result["original_latex"],
-                    "edited_latex": edit_result["edited_latex"],
+                result["latex_editing"] = {
+                    **_latex_edit_payload(edit_result["original_latex"], edit_result["edited_latex"], response_mode),
                     "suggestions": edit_result["suggestions"],
                     "changes_made": edit_result["changes_made"]
                 }
             else:
-                response["latex_editing"] = {"error": edit_result["error"]}
+                result["latex_editing"] = {"error": edit_result["error"]}
                 
         except Exception as e:
-            response["latex_editing"] = {"error": f"Error editing LaTeX: {str(e)}"}
+            result["latex_editing"] = {"error": f"Error editing LaTeX: {str(e)}"}
 
-    return response
+    return result
 
-def _extract_plain_text_from_latex(latex_content: str) -> str:
-    """Extract plain text from LaTeX content by removing LaTeX commands"""
-    # Remove LaTeX commands (starting with \)
-    text = re.sub(r'\\[a-zA-Z]+(\{[^}]*\})?', '', latex_content)
-    
-    # Remove LaTeX environments
-    text = re.sub(r'\\begin\{[^}]*\}.*?\\end\{[^}]*\}', '', text, flags=re.DOTALL)
-    
-    # Remove remaining LaTeX syntax
-    text = re.sub(r'[{}]', '', text)
-    text = re.sub(r'\\[a-zA-Z]+', '', text)
-    
-    # Clean up whitespace
-    text = re.sub(r'\s+', ' ', text).strip()
-    
-    return text
\ No newline at end of file
+@app.post("/compare-jobs/")
+async def compare_jobs(
+    response: Response,
+    resume: Optional[UploadFile] = File(None),
+    resume_id: Optional[str] = Form(None),
+    job_urls: Optional[List[str]] = Form(None),
+    job_descriptions: Optional[List[str]] = Form(None),
+    job_ids: Optional[List[str]] = Form(None),
+):
+    """
+    Compare one resume (PDF, .tex or resume_id) against many job postings.
+    The resume is parsed once, job URLs are scraped concurrently and analyses run under
+    a concurrency cap. Results stream back as NDJSON lines as each job finishes, followed
+    by a final line ranking all jobs by score
+    """
+    resume_text = await _load_resume_text(resume, resume_id, response, allow_tex=True)
+
+    jobs = _collect_jobs(job_urls, job_descriptions, job_ids)
+    semaphore = asyncio.Semaphore(MAX_LLM_CONCURRENCY)
+
+    async def run_job(index: int, job: dict) -> dict:
+        entry = {"index": index, "job_url": job.get("job_url")}
+        try:
+            job_text = await _job_text(job)
+        except Exception as e:
+            return {**entry, "error": f"Error scraping job URL: {str(e)}"}
+        entry["job_preview"] = _job_preview(job_text)
+
+        # The resume text is identical in every prompt and precedes the job posting,
+        # so provider-side prompt caching can reuse the shared prefix
+        async with semaphore:
+            try:
+                match_result = await _score_resume(resume_text, job_text)
+            except Exception as e:
+                return {**entry, "error": f"Matching error: {str(e)}"}
+        return {
+            **entry,
+            "score": match_result.get("score"),
+            "summary": match_result["summary"],
+            "recommendations": match_result.get("recommendations", []),
+        }
+
+    async def stream_results():
+        tasks = [asyncio.create_task(run_job(index, job)) for index, job in enumerate(jobs)]
+        results = []
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                item = await next_result
+                results.append(item)
+                yield json.dumps({"type": "result", **item}) + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        yield json.dumps({"type": "ranking", "ranking": _rank_jobs(results, "score")}) + "\n"
+
+    headers = {key: value for key, value in response.headers.items() if key.lower().startswith("x-")}
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson", headers=headers)
+
+@app.post("/tailor-latex-resume/")
+async def tailor_latex_resume(
+    latex_file: Optional[UploadFile] = File(None),
+    resume_id: Optional[str] = Form(None),
+    job_urls: Optional[List[str]] = Form(None),
+    job_descriptions: Optional[List[str]] = Form(None),
+    job_ids: Optional[List[str]] = Form(None),
+    response_mode: str = Form("full"),
+    output: str = Form("ndjson"),
+):
+    """
+    Tailor one LaTeX resume (upload or stored resume_id) to many jobs. The .tex is read
+    and converted to text once; per-job scoring and editing run concurrently under the
+    LLM concurrency cap. Returns NDJSON lines as variants finish, followed by a ranking
+    by new score, or with output "zip" an archive of the edited .tex files and a summary
+    """
+    _check_response_mode(response_mode)
+    if output not in TAILOR_OUTPUTS:
+        raise HTTPException(status_code=400, detail=f"output must be one of: {', '.join(TAILOR_OUTPUTS)}")
+
+    latex_content, resume_text = await _load_latex_resume(latex_file, resume_id)
+    jobs = _collect_jobs(job_urls, job_descriptions, job_ids)
+    semaphore = asyncio.Semaphore(MAX_LLM_CONCURRENCY)
+
+    async def run_job(index: int, job: dict) -> dict:
+        entry = {"index": index, "job_url": job.get("job_url")}
+        try:
+            job_text = await _job_text(job)
+        except Exception as e:
+            return {**entry, "error": f"Error scraping job URL: {str(e)}"}
+        entry["job_preview"] = _job_preview(job_text)
+
+        async with semaphore:
+            try:
+                async with admission.admit("llm"):
+                    tailored = await asyncio.to_thread(_tailor_latex, latex_content, resume_text, job_text)
+            except Exception as e:
+                return {**entry, "error": f"Error editing LaTeX resume: {str(e)}"}
+        return {**entry, "tailored": tailored, "new_score": tailored["new_score"]}
+
+    tasks = [asyncio.create_task(run_job(index, job)) for index, job in enumerate(jobs)]
+
+    if output == "zip":
+        try:
+            results = await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+        return Response(
+            content=_tailored_zip(results),
+            media_type="application/zip",
+            headers={"Content-Disposition": 'attachment; filename="tailored_resumes.zip"'},
+        )
+
+    async def stream_results():
+        results = []
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                item = await next_result
+                results.append(item)
+                line = {key: value for key, value in item.items() if key not in ("tailored", "new_score")}
+                if "tailored" in item:
+                    line.update(_tailored_payload(item["tailored"], response_mode))
+                yield json.dumps({"type": "result", **line}) + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        yield json.dumps({"type": "ranking", "ranking": _rank_jobs(results, "new_score")}) + "\n"
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+@app.post("/resumes/")
+async def store_resume(
+    response: Response,
+    resume: UploadFile = File(...),
+):
+    """
+    Upload a PDF or .tex resume once and get a resume_id that /analyze/,
+    /edit-latex-resume/ and /analyze-and-edit/ accept in place of the file
+    """
+    filename = resume.filename or ""
+    if filename.endswith('.tex'):
+        latex_upload = await ingest_upload(resume, "tex")
+        content_hash = latex_upload.sha256
+        try:
+            source = latex_upload.read_text()
+        finally:
+            latex_upload.close()
+        profile = save_resume(content_hash, "tex", latex_to_plain_text(source), source=source, filename=filename)
+    else:
+        pdf_upload = await ingest_upload(resume, "pdf")
+        content_hash = pdf_upload.sha256
+        extraction = await _read_pdf(pdf_upload, response)
+        profile = save_resume(content_hash, "pdf", extraction["text"], filename=filename, sections=extraction["sections"])
+
+    return {
+        "resume_id": profile["resume_id"],
+        "kind": profile["kind"],
+        "skills": profile["skills"],
+        "sections": list(profile["sections"].keys()),
+    }
+
+@app.get("/resumes/{resume_id}")
+async def read_resume(resume_id: str):
+    """Return the stored profile of a resume: extracted skills and section segmentation"""
+    profile = _get_stored_resume(resume_id)
+    return {
+        "resume_id": profile["resume_id"],
+        "kind": profile["kind"],
+        "filename": profile["filename"],
+        "created_at": profile["created_at"],
+        "skills": profile["skills"],
+        "sections": profile["sections"],
+    }
+
+@app.delete("/resumes/{resume_id}")
+async def remove_resume(resume_id: str):
+    if not delete_resume(resume_id):
+        raise HTTPException(status_code=404, detail="Unknown resume_id.")
+    return {"deleted": resume_id}
+
+@app.post("/resumes/search/")
+async def search_stored_resumes(
+    job_url: Optional[str] = Form(None),
+    job_description: Optional[str] = Form(None),
+    job_id: Optional[str] = Form(None),
+    top_k: int = Form(20),
+    analyze_top: int = Form(0),
+):
+    """
+    Rank the stored resume pool against a job with the local inverted index, and
+    optionally run the full LLM analysis on the first analyze_top candidates only
+    """
+    job_description = await _load_job_description(job_url, job_description, job_id)
+    top_k = max(1, min(top_k, 200))
+    candidates = search_resumes(job_description, top_k)
+
+    for candidate in candidates[:max(0, analyze_top)]:
+        profile = get_resume(candidate["resume_id"])
+        if profile is None:
+            continue
+        try:
+            async with admission.admit("llm"):
+                analysis = await asyncio.to_thread(analyze_resume_and_job_groq, _profile_prompt_text(profile), job_description)
+        except Exception as e:
+            candidate["analysis"] = {"error": f"Matching error: {str(e)}"}
+            continue
+        candidate["analysis"] = {
+            "summary": analysis["summary"],
+            "score": analysis.get("score"),
+            "recommendations": analysis.get("recommendations", []),
+        }
+
+    return {"candidates": candidates}
+
+@app.get("/jobs/{job_id}")
+async def read_job(job_id: str):
+    """A posting loaded into the job corpus by ingest_jobs.py"""
+    return _get_corpus_job(job_id)
+
+@app.get("/metrics")
+async def read_metrics():
+    """Process-wide counters, the cascade scorer's escalation rate, the Groq circuit state,
+    the model router's routes and per-model latency, and in-flight and queued work per stage"""
+    return {
+        "counters": metrics.snapshot(),
+        "cascade": cascade_stats(),
+        "groq_circuit": circuit_stats(),
+        "model_router": model_router.router.stats(),
+        "admission": admission_stats(),
+    }
+
+@app.get("/llm-usage")
+async def read_llm_usage(hours: float = 24, bucket_minutes: Optional[int] = None):
+    """LLM calls of the last `hours` from the ledger, aggregated by endpoint and stage,
+    optionally split into windows of bucket_minutes"""
+    if hours <= 0 or (bucket_minutes is not None and bucket_minutes <= 0):
+        raise HTTPException(status_code=400, detail="hours and bucket_minutes must be positive.")
+    since = time.time() - hours * 3600
+    bucket_seconds = bucket_minutes * 60 if bucket_minutes else None
+    groups = await asyncio.to_thread(llm_ledger.summarize, since, None, bucket_seconds)
+    return {"since": since, "groups": groups}
+
+async def _load_latex_resume(latex_file: Optional[UploadFile], resume_id: Optional[str]):
+    """LaTeX source and its plain text, from a stored .tex profile or an uploaded .tex file"""
+    if resume_id:
+        profile = _get_stored_resume(resume_id)
+        if profile["kind"] != "tex":
+            raise HTTPException(status_code=400, detail="resume_id does not refer to a LaTeX resume.")
+        return profile["source"], profile["text"]
+
+    # Validate file type
+    if latex_file is None or not latex_file.filename.endswith('.tex'):
+        raise HTTPException(status_code=400, detail="Only .tex files are accepted.")
+
+    # Read LaTeX content
+    latex_upload = await ingest_upload(latex_file, "tex")
+    try:
+        latex_content = latex_upload.read_text()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Error reading LaTeX file")
+    finally:
+        latex_upload.close()
+
+    # Extract plain text from LaTeX for context (remove LaTeX commands)
+    return latex_content, latex_to_plain_text(latex_content)
+
+def _tailor_latex(latex_content: str, resume_text: str, job_description: str) -> dict:
+    """
+    Score the original resume, edit it for the job and score the edited version.
+    Blocking; runs inline for one job or in a worker thread per job when tailoring to many
+    """
+    # First, analyze the original resume to get the current score
+    try:
+        original_analysis = analyze_resume_and_job_groq(resume_text, job_description)
+        original_score = original_analysis.get("score", 0)
+    except Exception as e:
+        original_score = 0
+
+    # Edit the LaTeX resume
+    with tracing.span("latex_edit"):
+        edit_result = latex_editor.edit_resume_for_job(latex_content, job_description, resume_text)
+    if "error" in edit_result:
+        raise RuntimeError(edit_result["error"])
+
+    # Score the edited resume: by default only the changed sections are re-evaluated
+    # against the original analysis instead of running a second full LLM analysis
+    rescoring = None
+    if RESCORE_MODE == "incremental":
+        with tracing.span("rescore"):
+            rescoring = rescore_edited_resume(latex_content, edit_result["edited_latex"], job_description, original_score)
+        new_score = rescoring["score"]
+    else:
+        edited_text = latex_to_plain_text(edit_result["edited_latex"])
+        try:
+            with tracing.span("rescore"):
+                new_analysis = analyze_resume_and_job_groq(edited_text, job_description, stage="rescore")
+            new_score = new_analysis.get("score", 0)
+        except Exception as e:
+            new_score = original_score
+
+    return {**edit_result, "original_score": original_score, "new_score": new_score, "rescoring": rescoring}
+
+def _tailored_payload(tailored: dict, response_mode: str) -> dict:
+    """Response fields for one tailored resume, with the document in the requested form"""
+    result = {
+        **_latex_edit_payload(tailored["original_latex"], tailored["edited_latex"], response_mode),
+        "suggestions": tailored["suggestions"],
+        "changes_made": tailored["changes_made"],
+        "original_score": tailored["original_score"],
+        "new_score": tailored["new_score"],
+        "score_improvement": tailored["new_score"] - tailored["original_score"]
+    }
+    rescoring = tailored["rescoring"]
+    if rescoring:
+        result["rescoring"] = {
+            "changed_sections": rescoring["changed_sections"],
+            "keywords_gained": rescoring["keywords_gained"],
+            "keywords_lost": rescoring["keywords_lost"],
+        }
+    return result
+
+def _check_response_mode(response_mode: str):
+    if response_mode not in LATEX_RESPONSE_MODES:
+        raise HTTPException(status_code=400, detail=f"response_mode must be one of: {', '.join(LATEX_RESPONSE_MODES)}")
+
+def _latex_edit_payload(original_latex: str, edited_latex: str, response_mode: str) -> dict:
+    """The edited document in the requested form: full text, line patch or unified diff"""
+    if response_mode == "patch":
+        return {"source_sha256": source_digest(original_latex), "patch": make_patch(original_latex, edited_latex)}
+    if response_mode == "diff":
+        return {"source_sha256": source_digest(original_latex), "diff": unified_diff(original_latex, edited_latex)}
+    return {"original_latex": original_latex, "edited_latex": edited_latex}
+
+def _get_stored_resume(resume_id: str) -> dict:
+    profile = get_resume(resume_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Unknown resume_id.")
+    return profile
+
+async def _load_resume_text(
+    resume: Optional[UploadFile],
+    resume_id: Optional[str],
+    response: Response,
+    allow_tex: bool = False,
+) -> str:
+    """
+    Resume text for scoring, from a stored profile or a freshly uploaded PDF (or .tex if
+    allowed). PDF resumes are reduced to the sections that matter for matching
+    """
+    if resume_id:
+        return _profile_prompt_text(_get_stored_resume(resume_id))
+    if resume is None:
+        raise HTTPException(status_code=400, detail="Either resume or resume_id must be provided.")
+
+    if allow_tex and (resume.filename or "").endswith('.tex'):
+        latex_upload = await ingest_upload(resume, "tex")
+        try:
+            return latex_to_plain_text(latex_upload.read_text())
+        finally:
+            latex_upload.close()
+
+    # Stream the upload in; type is checked from its magic bytes, size and pages as it arrives
+    pdf_upload = await ingest_upload(resume, "pdf")
+    extraction = await _read_pdf(pdf_upload, response)
+    return prompt_resume_text(extraction["text"], extraction["sections"])
+
+def _profile_prompt_text(profile: dict) -> str:
+    if profile["kind"] == "pdf":
+        return prompt_resume_text(profile["text"], profile["sections"])
+    return profile["text"]
+
+def _collect_jobs(
+    job_urls: Optional[List[str]], job_descriptions: Optional[List[str]], job_ids: Optional[List[str]]
+) -> List[dict]:
+    """Jobs named by a multi-job request, as URLs or job texts, capped at MAX_COMPARE_JOBS"""
+    jobs = [{"job_url": url.strip()} for url in job_urls or [] if url.strip()]
+    jobs += [{"job_description": text} for text in job_descriptions or [] if text.strip()]
+    jobs += [{"job_description": _get_corpus_job(job_id)["text"]} for job_id in job_ids or [] if job_id.strip()]
+    if not jobs:
+        raise HTTPException(status_code=400, detail="Provide at least one job_urls, job_descriptions or job_ids entry.")
+    if len(jobs) > MAX_COMPARE_JOBS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_COMPARE_JOBS} jobs can be compared per request.")
+    return jobs
+
+async def _job_text(job: dict) -> str:
+    """Text of a collected job, fetching URLs in a worker thread"""
+    if job.get("job_description"):
+        return job["job_description"]
+    async with admission.admit("scrape"):
+        return await asyncio.to_thread(_fetch_job_text, job["job_url"])
+
+def _job_preview(job_text: str) -> str:
+    return job_text.strip().split("\n")[0][:100]
+
+def _rank_jobs(results: List[dict], score_field: str) -> List[dict]:
+    """Final ranking line of a multi-job stream; failed jobs are left out"""
+    ranked = sorted((item for item in results if "error" not in item), key=lambda item: item[score_field] or 0, reverse=True)
+    return [
+        {"rank": rank, "index": item["index"], "job_url": item["job_url"], "job_preview": item["job_preview"], score_field: item[score_field]}
+        for rank, item in enumerate(ranked, start=1)
+    ]
+
+def _tailored_zip(results: List[dict]) -> bytes:
+    """Zip of one edited .tex per job plus summary.json with scores, changes and errors"""
+    buffer = io.BytesIO()
+    summary = []
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for item in sorted(results, key=lambda item: item["index"]):
+            record = {key: value for key, value in item.items() if key not in ("tailored", "new_score")}
+            if "tailored" in item:
+                tailored = item["tailored"]
+                slug = re.sub(r"[^a-z0-9]+", "-", item["job_preview"].lower()).strip("-")[:40] or "job"
+                record["file"] = f"{item['index'] + 1:02d}-{slug}.tex"
+                archive.writestr(record["file"], tailored["edited_latex"])
+                payload = _tailored_payload(tailored, "patch")
+                record.update({key: value for key, value in payload.items() if key not in ("patch", "source_sha256")})
+            summary.append(record)
+        archive.writestr("summary.json", json.dumps(summary, indent=2))
+    return buffer.getvalue()
+
+def _get_corpus_job(job_id: str) -> dict:
+    job = get_job(job_id.strip())
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job_id.")
+    return job
+
+def _fetch_job_text(job_url: str) -> str:
+    """Text of a posting URL: from the job corpus if it was bulk-ingested, else scraped now"""
+    job = get_job_by_url(job_url)
+    if job is not None:
+        metrics.increment("job_corpus.url_hits")
+        return job["text"]
+    return scrape_job_description(job_url)
+
+async def _load_job_description(job_url: Optional[str], job_description: Optional[str], job_id: Optional[str]) -> str:
+    """_get_job_description in a worker thread, holding a scrape slot when the job must be fetched"""
+    if job_description or job_id or not job_url:
+        return await asyncio.to_thread(_get_job_description, job_url, job_description, job_id)
+    async with admission.admit("scrape"):
+        return await asyncio.to_thread(_get_job_description, job_url, job_description, job_id)
+
+async def _score_resume(resume_text: str, job_text: str) -> dict:
+    """
+    score_resume in worker threads. Results served from the caches or the local pre-score
+    are returned without an LLM slot; only the escalation to the LLM holds one. When the
+    LLM stage is full and ADMISSION_DEGRADE is set, the local fallback scorer answers
+    instead of a 503
+    """
+    result = await asyncio.to_thread(score_without_llm, resume_text, job_text)
+    if result is not None:
+        return result
+    try:
+        async with admission.admit("llm"):
+            return await asyncio.to_thread(score_with_llm, resume_text, job_text)
+    except Overloaded:
+        if not admission.ADMISSION_DEGRADE:
+            raise
+        metrics.increment("admission.degraded")
+        degraded = await asyncio.to_thread(fallback_analysis, resume_text, job_text)
+        return {**degraded, "tier": "degraded"}
+
+def _get_job_description(job_url: Optional[str], job_description: Optional[str], job_id: Optional[str] = None) -> str:
+    """Use the job description provided by the client, then a stored job_id, otherwise job_url"""
+    if job_description:
+        return job_description
+    if job_id:
+        return _get_corpus_job(job_id)["text"]
+    if not job_url:
+        raise HTTPException(status_code=400, detail="Either job_url, job_description or job_id must be provided.")
+    try:
+        return _fetch_job_text(job_url)
+    except Exception as e:
+        # Provide a clear error so frontend can suggest fallback to paste job description
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error scraping job URL: {str(e)}"
+        )
+
+async def _read_pdf(pdf_upload, response: Response) -> dict:
+    """Extract text and layout sections from an ingested PDF and report which extraction backend ran"""
+    extraction = _pdf_text_cache.get(pdf_upload.sha256)
+    if extraction is not None:
+        _pdf_text_cache.move_to_end(pdf_upload.sha256)
+        pdf_upload.close()
+        response.headers["X-PDF-Extractor"] = f"{extraction['backend']}; cached"
+        return extraction
+
+    try:
+        with tracing.span("pdf_extract"):
+            async with admission.admit("pdf"):
+                extraction = await asyncio.to_thread(extract_pdf_text, pdf_upload.file)
+    except Overloaded:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Error reading PDF")
+    finally:
+        pdf_upload.close()
+
+    if extraction["pages"] > MAX_PDF_PAGES:
+        raise HTTPException(status_code=413, detail=f"PDF has too many pages. Maximum is {MAX_PDF_PAGES}.")
+
+    _pdf_text_cache[pdf_upload.sha256] = extraction
+    if len(_pdf_text_cache) > PDF_TEXT_CACHE_SIZE:
+        _pdf_text_cache.popitem(last=False)
+
+    response.headers["X-PDF-Extractor"] = extraction["backend"]
+    if len(extraction["attempts"]) > 1:
+        print(f"PDF extraction fell back to {extraction['backend']}: {extraction['attempts']}")
+    return extraction
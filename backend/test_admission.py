@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Test script for admission control and load shedding
+"""
+
+import asyncio
+import json
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services import admission, metrics
+from app.services.admission import LoadSheddingMiddleware, Overloaded, StageLimiter
+from test_rescoring import ORIGINAL
+
+JOB = "Backend Engineer\nPython Django developer with PostgreSQL and AWS experience."
+
+
+def test_limiter_queues_then_rejects():
+    """Work beyond the concurrency waits in a bounded queue; beyond the queue it is rejected"""
+    limiter = StageLimiter("test", concurrency=1, max_queue=1, max_wait=1)
+    order = []
+
+    async def work(name, hold):
+        await limiter.acquire()
+        try:
+            order.append(name)
+            await asyncio.sleep(hold)
+        finally:
+            limiter.observe(hold)
+            limiter.release()
+
+    async def run():
+        first = asyncio.create_task(work("first", 0.05))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(work("second", 0))
+        await asyncio.sleep(0)
+        try:
+            await limiter.acquire()
+            raise AssertionError("expected Overloaded")
+        except Overloaded as e:
+            assert e.stage == "test" and e.retry_after >= 1
+        await asyncio.gather(first, second)
+
+    metrics.reset()
+    asyncio.run(run())
+    assert order == ["first", "second"]
+    assert limiter.in_flight == 0 and limiter.queued() == 0
+    assert metrics.get("admission.test.queued") == 1
+    assert metrics.get("admission.test.rejected") == 1
+    print("✓ Excess work queues up to the limit and is rejected beyond it")
+
+
+def test_queued_work_times_out():
+    limiter = StageLimiter("test", concurrency=1, max_queue=4, max_wait=0.05)
+
+    async def run():
+        await limiter.acquire()
+        try:
+            await limiter.acquire()
+            raise AssertionError("expected Overloaded")
+        except Overloaded:
+            pass
+        limiter.release()
+
+    metrics.reset()
+    asyncio.run(run())
+    assert limiter.in_flight == 0 and limiter.queued() == 0
+    assert metrics.get("admission.test.timed_out") == 1
+    print("✓ Work that waits too long for a slot is rejected")
+
+
+def _with_full_llm_stage(check, degrade=False):
+    """Run check() with the LLM stage saturated and no queue"""
+    original_limiter, original_degrade = admission.limiters["llm"], admission.ADMISSION_DEGRADE
+    full = StageLimiter("llm", concurrency=1, max_queue=0)
+    full.in_flight = 1
+    admission.limiters["llm"], admission.ADMISSION_DEGRADE = full, degrade
+    metrics.reset()
+    try:
+        check()
+    finally:
+        admission.limiters["llm"], admission.ADMISSION_DEGRADE = original_limiter, original_degrade
+
+
+def _client():
+    from fastapi.testclient import TestClient
+    from main import app
+    return TestClient(app)
+
+
+def test_overloaded_request_gets_503_with_retry_after():
+    def check():
+        response = _client().post(
+            "/edit-latex-resume/",
+            files={"latex_file": ("resume.tex", ORIGINAL.encode(), "text/plain")},
+            data={"job_description": JOB},
+        )
+        assert response.status_code == 503, response.text
+        assert int(response.headers["retry-after"]) >= 1
+        assert metrics.get("admission.llm.rejected") == 1
+
+    _with_full_llm_stage(check)
+    print("✓ Requests that find the LLM stage full get 503 with Retry-After")
+
+
+def test_degrades_to_local_scorer():
+    def check():
+        response = _client().post(
+            "/compare-jobs/",
+            files={"resume": ("resume.tex", ORIGINAL.encode(), "text/plain")},
+            data={"job_descriptions": [JOB]},
+        )
+        assert response.status_code == 200, response.text
+        result = json.loads(response.text.splitlines()[0])
+        assert result["type"] == "result" and "error" not in result
+        assert isinstance(result["score"], int)
+        assert metrics.get("admission.degraded") == 1
+
+    _with_full_llm_stage(check, degrade=True)
+    print("✓ With ADMISSION_DEGRADE the local scorer answers instead of a 503")
+
+
+def test_local_tiers_need_no_llm_slot():
+    """Answers from the caches or the local pre-score are served even when the LLM stage is full"""
+    from app.services import cascade
+    from test_cascade import JOB as CASCADE_JOB
+
+    original_mode = cascade.SCORING_MODE
+    cascade.SCORING_MODE = "cascade"
+
+    def check():
+        response = _client().post(
+            "/compare-jobs/",
+            files={"resume": ("resume.tex", b"Pastry chef with ten years of experience in French bakeries.", "text/plain")},
+            data={"job_descriptions": [CASCADE_JOB]},
+        )
+        assert response.status_code == 200, response.text
+        result = json.loads(response.text.splitlines()[0])
+        assert "error" not in result and isinstance(result["score"], int)
+        assert metrics.get("cascade.local") == 1
+        assert metrics.get("admission.llm.rejected") == 0
+
+    try:
+        _with_full_llm_stage(check)
+    finally:
+        cascade.SCORING_MODE = original_mode
+    print("✓ Local and cached scores do not take an LLM slot")
+
+
+def test_middleware_sheds_before_reading_body():
+    sent = []
+
+    async def app(scope, receive, send):
+        raise AssertionError("shed requests must not reach the app")
+
+    async def receive():
+        raise AssertionError("shed requests must not read the body")
+
+    async def send(message):
+        sent.append(message)
+
+    middleware = LoadSheddingMiddleware(app, max_requests=0)
+    metrics.reset()
+    asyncio.run(middleware({"type": "http", "method": "POST", "path": "/analyze/"}, receive, send))
+    assert sent[0]["status"] == 503
+    assert (b"retry-after", str(admission.limiters["llm"].retry_after()).encode()) in sent[0]["headers"]
+    assert metrics.get("admission.shed") == 1
+    print("✓ Requests beyond ADMISSION_MAX_REQUESTS are shed before their upload is read")
+
+
+if __name__ == "__main__":
+    test_limiter_queues_then_rejects()
+    test_queued_work_times_out()
+    test_overloaded_request_gets_503_with_retry_after()
+    test_degrades_to_local_scorer()
+    test_local_tiers_need_no_llm_slot()
+    test_middleware_sheds_before_reading_body()
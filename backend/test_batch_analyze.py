@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test script for the offline batch analysis CLI
+"""
+
+import csv
+import json
+import os
+import sys
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import batch_analyze
+from test_pdf_extractor import SAMPLE_LINES, build_sample_pdf
+from test_rescoring import ORIGINAL
+
+JOBS = [
+    {"id": "backend", "text": "Backend Engineer. Python, Django, PostgreSQL, Docker and AWS experience."},
+    {"id": "frontend", "text": "Frontend Engineer. React, TypeScript, CSS and design systems."},
+]
+
+
+def _workspace(directory: str):
+    resumes = os.path.join(directory, "resumes")
+    os.makedirs(resumes)
+    with open(os.path.join(resumes, "jane.pdf"), "wb") as pdf_file:
+        pdf_file.write(build_sample_pdf(SAMPLE_LINES))
+    with open(os.path.join(resumes, "john.tex"), "w", encoding="utf-8") as tex_file:
+        tex_file.write(ORIGINAL)
+    with open(os.path.join(resumes, "notes.txt"), "w", encoding="utf-8") as other_file:
+        other_file.write("not a resume")
+    jobs = os.path.join(directory, "jobs.jsonl")
+    with open(jobs, "w", encoding="utf-8") as jobs_file:
+        jobs_file.write("\n".join(json.dumps(job) for job in JOBS) + "\n")
+    return resumes, jobs
+
+
+def test_batch_scores_every_pair_and_resumes():
+    """Every resume/job pair is written once; a rerun skips the finished pairs"""
+    with tempfile.TemporaryDirectory() as directory:
+        resumes, jobs = _workspace(directory)
+        output = os.path.join(directory, "results.jsonl")
+        args = ["--resumes", resumes, "--jobs", jobs, "--output", output, "--parse-workers", "2", "--mode", "llm"]
+
+        assert batch_analyze.main(args) == 0
+        with open(output, encoding="utf-8") as output_file:
+            rows = [json.loads(line) for line in output_file]
+        assert len(rows) == 4
+        assert {(row["resume_file"], row["job_key"]) for row in rows} == {
+            (name, job["id"]) for name in ("jane.pdf", "john.tex") for job in JOBS
+        }
+        assert all(isinstance(row["score"], int) and not row.get("error") for row in rows)
+
+        # Drop one finished pair as if the run had been interrupted before it
+        with open(output, "w", encoding="utf-8") as output_file:
+            output_file.write("".join(json.dumps(row) + "\n" for row in rows[:3]))
+        assert batch_analyze.main(args) == 0
+        with open(output, encoding="utf-8") as output_file:
+            assert len(output_file.readlines()) == 4
+    print("✓ Batch run scores every pair and resumes where it stopped")
+
+
+def test_csv_output():
+    with tempfile.TemporaryDirectory() as directory:
+        resumes, jobs = _workspace(directory)
+        output = os.path.join(directory, "results.csv")
+        assert batch_analyze.main(["--resumes", resumes, "--jobs", jobs, "--output", output, "--parse-workers", "1"]) == 0
+        with open(output, encoding="utf-8", newline="") as output_file:
+            rows = list(csv.DictReader(output_file))
+        assert len(rows) == 4 and rows[0]["resume_sha256"]
+        assert batch_analyze.completed_pairs(output) == {(row["resume_sha256"], row["job_key"]) for row in rows}
+    print("✓ CSV output has a header and is read back for resuming")
+
+
+if __name__ == "__main__":
+    test_batch_scores_every_pair_and_resumes()
+    test_csv_output()
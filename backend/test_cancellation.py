@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Test script for cancelling request work when the client disconnects
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services import cancellation, groq_client, metrics
+from app.services.cancellation import CancellationMiddleware, RequestCancelled
+
+SCOPE = {"type": "http", "method": "POST", "path": "/analyze/", "headers": []}
+
+
+def _run(app, disconnect_after: float):
+    """Drive app through CancellationMiddleware with a client that leaves after disconnect_after seconds"""
+    sent = []
+
+    async def drive():
+        messages = [{"type": "http.request", "body": b"payload", "more_body": False}]
+
+        async def receive():
+            if messages:
+                return messages.pop(0)
+            await asyncio.sleep(disconnect_after)
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            sent.append(message)
+
+        await CancellationMiddleware(app)(SCOPE, receive, send)
+
+    asyncio.run(drive())
+    return sent
+
+
+def test_disconnect_stops_worker_thread():
+    """A client leaving mid-request cancels the handler and the worker thread's next checkpoint"""
+    stopped = threading.Event()
+
+    def blocking_work():
+        try:
+            for _ in range(100):
+                cancellation.sleep(0.05, "test")
+        except RequestCancelled:
+            stopped.set()
+            raise
+
+    async def app(scope, receive, send):
+        await receive()
+        await asyncio.to_thread(blocking_work)
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"done"})
+
+    metrics.reset()
+    started = time.perf_counter()
+    sent = _run(app, disconnect_after=0.1)
+
+    assert time.perf_counter() - started < 2
+    assert sent == []
+    assert stopped.wait(1)
+    assert metrics.get("requests.cancelled") == 1
+    assert metrics.get("cancelled.test") == 1
+    print("✓ Disconnects cancel the handler and stop blocking work")
+
+
+def test_completed_response_is_not_cancelled():
+    async def app(scope, receive, send):
+        await receive()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"done"})
+
+    metrics.reset()
+    sent = _run(app, disconnect_after=0)
+    assert sent[-1]["body"] == b"done"
+    assert metrics.get("requests.cancelled") == 0
+    print("✓ Clients leaving after the response are not counted")
+
+
+def test_llm_call_skipped_after_disconnect():
+    """No Groq call is made for a request whose client has gone"""
+    calls = []
+    original_post = groq_client._post
+    groq_client._post = lambda api_key, body, timeout: calls.append(body)
+    token = threading.Event()
+    token.set()
+    context_token = cancellation._current_token.set(token)
+    metrics.reset()
+    try:
+        try:
+            groq_client.chat_completion("key", {"messages": []}, stage="match")
+            raise AssertionError("expected RequestCancelled")
+        except RequestCancelled:
+            pass
+    finally:
+        cancellation._current_token.reset(context_token)
+        groq_client._post = original_post
+    assert calls == []
+    assert metrics.get("cancelled.llm_call") == 1
+    print("✓ LLM calls are skipped once the client has disconnected")
+
+
+if __name__ == "__main__":
+    test_disconnect_stops_worker_thread()
+    test_completed_response_is_not_cancelled()
+    test_llm_call_skipped_after_disconnect()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Test script for cascade scoring
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services import cascade, metrics, section_cache
+
+JOB = """
+Senior Backend Engineer. Requirements: Python, Django, PostgreSQL, AWS, Docker,
+Kubernetes, REST API design, CI/CD pipelines and SQL performance tuning.
+"""
+
+
+def test_clear_mismatch_answered_locally():
+    """An unrelated resume never reaches the LLM"""
+    metrics.reset()
+    resume = "Pastry chef with ten years of experience in French bakeries and cake decoration."
+    result = cascade.score_resume(resume, JOB, mode="cascade")
+
+    assert result["tier"] == "local"
+    assert result["score"] < cascade.CASCADE_REJECT_BELOW
+    assert cascade.cascade_stats()["escalation_rate"] == 0.0
+    print(f"✓ Mismatch scored locally at {result['score']}")
+
+
+def test_plausible_match_escalates():
+    """A resume covering the requirements escalates (to the fallback without an API key)"""
+    metrics.reset()
+    resume = "Backend engineer: Python, Django, PostgreSQL, AWS, Docker, Kubernetes, REST API, CI/CD, SQL."
+    result = cascade.score_resume(resume, JOB, mode="cascade")
+
+    assert result["tier"] == "llm"
+    stats = cascade.cascade_stats()
+    assert stats["escalated"] == 1 and stats["escalation_rate"] == 1.0
+    print("✓ Plausible match escalated to the LLM tier")
+
+
+def test_section_cache_hits_are_counted():
+    metrics.reset()
+    original_lookup = section_cache.lookup
+    section_cache.lookup = lambda analysis: {"score": 72}
+    try:
+        result = cascade.score_resume("Backend engineer: Python, Django.", JOB, mode="cascade")
+    finally:
+        section_cache.lookup = original_lookup
+
+    assert result["tier"] == "section_cache"
+    stats = cascade.cascade_stats()
+    assert stats["requests"] == 1 and stats["section_cache_hits"] == 1 and stats["escalated"] == 0
+    print("✓ Section cache hits are counted among the cascade tiers")
+
+
+if __name__ == "__main__":
+    test_clear_mismatch_answered_locally()
+    test_plausible_match_escalates()
+    test_section_cache_hits_are_counted()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test script for comparing one resume against several jobs in one request
+"""
+
+import json
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from test_rescoring import ORIGINAL
+
+JOBS = [
+    "Backend Engineer\nPython Django developer with PostgreSQL and AWS experience.",
+    "Pastry Chef\nFrench pastry, cake decoration and bakery management.",
+]
+
+
+def _post(data):
+    from fastapi.testclient import TestClient
+    from main import app
+
+    client = TestClient(app)
+    files = {"resume": ("resume.tex", ORIGINAL.encode(), "text/plain")}
+    return client.post("/compare-jobs/", files=files, data=data)
+
+
+def test_result_per_job_then_ranking():
+    response = _post({"job_descriptions": JOBS})
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+
+    results = [line for line in lines if line["type"] == "result"]
+    assert sorted(line["index"] for line in results) == [0, 1]
+    assert all(isinstance(line["score"], int) and line["job_preview"] for line in results)
+    assert lines[-1]["type"] == "ranking" and len(lines) == len(JOBS) + 1
+    ranking = lines[-1]["ranking"]
+    assert sorted(item["index"] for item in ranking) == [0, 1]
+    assert [item["score"] for item in ranking] == sorted((item["score"] for item in ranking), reverse=True)
+    print("✓ One NDJSON line per job, then a ranking by score")
+
+
+def test_rejects_empty_and_oversized_job_lists():
+    import main
+
+    assert _post({"job_descriptions": ["  "]}).status_code == 400
+
+    original_max = main.MAX_COMPARE_JOBS
+    main.MAX_COMPARE_JOBS = 1
+    try:
+        response = _post({"job_descriptions": JOBS})
+    finally:
+        main.MAX_COMPARE_JOBS = original_max
+    assert response.status_code == 400 and "At most 1" in response.json()["detail"]
+    print("✓ Empty and oversized job lists are rejected with 400")
+
+
+def test_scrape_error_does_not_abort_stream():
+    import main
+
+    def failing_fetch(job_url):
+        raise RuntimeError("connection refused")
+
+    original_fetch = main._fetch_job_text
+    main._fetch_job_text = failing_fetch
+    try:
+        response = _post({"job_urls": ["https://jobs.example.com/1"], "job_descriptions": JOBS[:1]})
+    finally:
+        main._fetch_job_text = original_fetch
+
+    assert response.status_code == 200, response.text
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    failed = [line for line in lines if line["type"] == "result" and "error" in line]
+    scored = [line for line in lines if line["type"] == "result" and "score" in line]
+    assert len(failed) == 1 and "connection refused" in failed[0]["error"]
+    assert failed[0]["job_url"] == "https://jobs.example.com/1"
+    assert len(scored) == 1
+    assert lines[-1]["type"] == "ranking"
+    print("✓ A job that fails to scrape reports an error while the others are scored")
+
+
+if __name__ == "__main__":
+    test_result_per_job_then_ranking()
+    test_rejects_empty_and_oversized_job_lists()
+    test_scrape_error_does_not_abort_stream()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Test script for the Groq circuit breaker
+"""
+
+import os
+import sys
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import requests
+
+from app.services import groq_client, llm_ledger, matcher, metrics, model_router
+from app.services.latex_editor import LaTeXResumeEditor
+
+RESUME = "Backend engineer: Python, Django, PostgreSQL, AWS, Docker."
+JOB = "Senior Backend Engineer. Requirements: Python, Django, PostgreSQL, AWS, Kubernetes."
+
+
+class _FakeResponse:
+    def __init__(self, status_code=200, content='{"score": 81}'):
+        self.status_code = status_code
+        self.ok = status_code < 400
+        self.text = content
+
+    def json(self):
+        return {"choices": [{"message": {"content": self.text}}]}
+
+
+def _with_fake_groq(post, check):
+    """Run check() with Groq calls answered by post() and a fresh, fast-resetting breaker.
+    Model failover is off, so each analysis makes exactly one call. The fake calls are
+    recorded in a temporary LLM ledger, not the developer's"""
+    original_post, original_breaker = groq_client._post, groq_client.breaker
+    original_key = os.environ.get("GROQ_API_KEY")
+    original_attempts = model_router.ROUTER_MAX_ATTEMPTS
+    original_ledger = llm_ledger.LLM_LEDGER_PATH
+    ledger_dir = tempfile.TemporaryDirectory()
+    groq_client._post = post
+    groq_client.breaker = groq_client.CircuitBreaker(failure_threshold=3, reset_seconds=0.2)
+    model_router.ROUTER_MAX_ATTEMPTS = 1
+    model_router.router.reset()
+    llm_ledger.LLM_LEDGER_PATH = os.path.join(ledger_dir.name, "llm_ledger.db")
+    os.environ["GROQ_API_KEY"] = "test-key"
+    metrics.reset()
+    try:
+        check()
+    finally:
+        groq_client._post, groq_client.breaker = original_post, original_breaker
+        model_router.ROUTER_MAX_ATTEMPTS = original_attempts
+        model_router.router.reset()
+        llm_ledger.LLM_LEDGER_PATH = original_ledger
+        ledger_dir.cleanup()
+        if original_key is None:
+            os.environ.pop("GROQ_API_KEY", None)
+        else:
+            os.environ["GROQ_API_KEY"] = original_key
+
+
+def test_circuit_opens_and_serves_fallback():
+    """After the threshold, calls are answered by the fallback without touching Groq"""
+    calls = []
+
+    def timing_out(api_key, body, timeout):
+        calls.append(timeout)
+        raise requests.Timeout("read timed out")
+
+    def check():
+        for _ in range(3):
+            assert matcher.analyze_resume_and_job_groq(RESUME, JOB)["source"] == "fallback"
+        assert groq_client.breaker.state == "open"
+
+        started = time.perf_counter()
+        result = matcher.analyze_resume_and_job_groq(RESUME, JOB)
+        assert result["source"] == "fallback"
+        assert time.perf_counter() - started < 0.1
+        assert len(calls) == 3 and metrics.get("groq.short_circuited") == 1
+
+        edit = LaTeXResumeEditor().edit_resume_for_job("\\section{Skills}\\begin{itemize}\\item Go\\end{itemize}", JOB, RESUME)
+        assert "error" not in edit and len(calls) == 3
+
+    _with_fake_groq(timing_out, check)
+    print("✓ Open circuit serves the fallback without calling Groq")
+
+
+def test_editor_falls_back_on_api_errors():
+    """A 429 or 5xx from Groq gets the local edit, as the matcher gets its local score"""
+    statuses = [429, 503]
+
+    def failing(api_key, body, timeout):
+        return _FakeResponse(status_code=statuses.pop(0), content="busy")
+
+    def check():
+        for _ in range(2):
+            edit = LaTeXResumeEditor().edit_resume_for_job("\\section{Skills}\\begin{itemize}\\item Go\\end{itemize}", JOB, RESUME)
+            assert "error" not in edit and "edited_latex" in edit
+        assert groq_client.breaker.state == "closed"
+
+    _with_fake_groq(failing, check)
+    print("✓ Groq API errors get the local edit instead of an error")
+
+
+def test_single_probe_closes_circuit():
+    """After the reset interval one probe goes through and its success closes the circuit"""
+    responses = [requests.ConnectionError("refused")] * 3
+
+    def flaky(api_key, body, timeout):
+        if responses:
+            raise responses.pop()
+        return _FakeResponse()
+
+    def check():
+        for _ in range(3):
+            matcher.analyze_resume_and_job_groq(RESUME, JOB)
+        assert groq_client.breaker.state == "open"
+        assert not groq_client.breaker.allow_request()
+
+        time.sleep(0.25)
+        assert groq_client.breaker.allow_request()
+        # Only the probe is let through while half-open
+        assert not groq_client.breaker.allow_request()
+        groq_client.breaker.record_success()
+
+        result = matcher.analyze_resume_and_job_groq(RESUME, JOB)
+        assert result["source"] == "llm" and result["score"] == 81
+        assert groq_client.breaker.state == "closed"
+
+    _with_fake_groq(flaky, check)
+    print("✓ Probe success closes the circuit")
+
+
+if __name__ == "__main__":
+    test_circuit_opens_and_serves_fallback()
+    test_editor_falls_back_on_api_errors()
+    test_single_probe_closes_circuit()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test script for the section-aware heuristic scorer
+"""
+
+import datetime
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.heuristic_scorer import DIMENSION_WEIGHTS, _degree_levels, heuristic_score
+from app.services.matcher import fallback_analysis
+
+RESUME = """Jane Doe
+EXPERIENCE
+Backend Engineer, PayFast (fintech payments), Jan 2019 - Present
+Built Python and Django services on AWS; mentored two engineers and collaborated with product
+Software Developer, ShopCo, 2016 - 2019
+SKILLS
+Python, Django, PostgreSQL, Docker, AWS
+EDUCATION
+Bachelor of Science (BSc) in Computer Science, 2012 - 2016
+"""
+
+JOB = """Senior Backend Engineer at a fintech payments company.
+5+ years of experience with Python, Django, PostgreSQL, AWS and Kubernetes.
+Bachelor's or Master's degree in Computer Science. Strong communication and collaboration skills."""
+
+TODAY = datetime.date(2025, 6, 1)
+
+
+def test_dimensions_follow_prompt_weights():
+    """Each dimension is scored on its own and combined with the prompt's weights"""
+    result = heuristic_score(RESUME, JOB, today=TODAY)
+    dimensions = result["dimensions"]
+
+    assert set(dimensions) == set(DIMENSION_WEIGHTS)
+    assert dimensions["technical_skills"]["detail"]["missing"] == ["Kubernetes"]
+    assert dimensions["experience"]["detail"]["resume_years"] == 9
+    assert dimensions["experience"]["score"] == 100
+    assert dimensions["education"]["score"] == 100
+    assert dimensions["domain"]["score"] == 100
+    assert dimensions["soft_skills"]["detail"]["matched"] == ["collaboration"]
+
+    weighted = sum(info["score"] * info["weight"] for info in dimensions.values())
+    assert abs(result["score"] - weighted) <= 1
+    print(f"✓ Weighted score {result['score']} from {({k: v['score'] for k, v in dimensions.items()})}")
+
+
+def test_degrees_need_more_than_bare_abbreviations():
+    assert _degree_levels("Expert in MS Office and MS SQL Server; worked with the BA team") == []
+    assert _degree_levels("M.S. in Computer Science") == [3]
+    assert _degree_levels("MS in Data Science") == [3]
+    assert _degree_levels("MSc Physics") == [3]
+    assert _degree_levels("B.A. Economics") == [2]
+    assert _degree_levels("BA in History") == [2]
+    print("✓ MS Office and BA teams earn no degree credit; dotted and \"in\" forms do")
+
+
+def test_fallback_is_deterministic_under_threads():
+    """No shared random state: concurrent calls give identical results"""
+    unrelated = "Pastry chef with ten years in French bakeries and cake decoration."
+    expected = [fallback_analysis(RESUME, JOB), fallback_analysis(unrelated, JOB)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda i: fallback_analysis(RESUME if i % 2 == 0 else unrelated, JOB), range(40)))
+
+    assert all(result == expected[i % 2] for i, result in enumerate(results))
+    assert expected[0]["score"] > expected[1]["score"] + 30
+    assert expected[0]["source"] == "fallback" and "dimensions" in expected[0]
+    print(f"✓ Fallback scores {expected[0]['score']} vs {expected[1]['score']}, stable across threads")
+
+
+if __name__ == "__main__":
+    test_dimensions_follow_prompt_weights()
+    test_degrees_need_more_than_bare_abbreviations()
+    test_fallback_is_deterministic_under_threads()
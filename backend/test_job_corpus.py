@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Test script for bulk job ingestion into the local job corpus
+"""
+
+import os
+import sys
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import ingest_jobs
+from app.services import job_corpus
+from app.services.job_scraper import parse_job_stream
+from test_pdf_extractor import SAMPLE_LINES, build_sample_pdf
+
+PAGE = """<html><head><title>Backend Engineer &amp; API Lead</title>
+<link rel="canonical" href="https://jobs.example.com/postings/42">
+<script>var tracking = "not part of the posting";</script></head>
+<body><div class="job-description"><ul>{items}</ul></div></body></html>"""
+ITEMS = "".join(f"<li>Build and operate Python, Django and PostgreSQL services, item {i}</li>" for i in range(5))
+
+
+def test_ingest_saved_pages_and_use_by_id():
+    """Saved pages are parsed into the corpus, and the API reads them by job_id or URL"""
+    original_path = job_corpus.JOB_CORPUS_PATH
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pages = os.path.join(tmp_dir, "pages")
+        os.makedirs(pages)
+        with open(os.path.join(pages, "posting.html"), "w") as page_file:
+            page_file.write(PAGE.format(items=ITEMS))
+
+        job_corpus.JOB_CORPUS_PATH = os.path.join(tmp_dir, "jobs.db")
+        try:
+            assert ingest_jobs.main(["--html-dir", pages, "--corpus", job_corpus.JOB_CORPUS_PATH, "--parse-workers", "2"]) == 0
+            _exercise_corpus_endpoints()
+        finally:
+            job_corpus.JOB_CORPUS_PATH = original_path
+    print("✓ Ingested postings are served by job_id without scraping")
+
+
+def _exercise_corpus_endpoints():
+    from fastapi.testclient import TestClient
+    from main import app
+
+    job_id = job_corpus.job_id_for_source("https://jobs.example.com/postings/42")
+    job = job_corpus.get_job(job_id)
+    assert job["title"] == "Backend Engineer & API Lead" and job["host"] == "jobs.example.com"
+    assert "tracking" not in job["text"] and job["text"].count("\n") == 4
+    # Identical to what a live scrape of the page yields
+    page = PAGE.format(items=ITEMS).encode("utf-8")
+    assert job["text"] == parse_job_stream([page], "https://jobs.example.com/postings/42")
+
+    client = TestClient(app)
+    assert client.get(f"/jobs/{job_id}").json()["text"] == job["text"]
+    assert client.get("/jobs/unknown").status_code == 404
+
+    resume = {"resume": ("resume.pdf", build_sample_pdf(SAMPLE_LINES, 1), "application/pdf")}
+    by_id = client.post("/analyze/", files=resume, data={"job_id": job_id})
+    assert by_id.status_code == 200, by_id.text
+    # The ingested URL is answered from the corpus instead of being scraped
+    by_url = client.post("/analyze/", files=resume, data={"job_url": "https://jobs.example.com/postings/42"})
+    assert by_url.status_code == 200 and by_url.json()["score"] == by_id.json()["score"]
+
+
+if __name__ == "__main__":
+    test_ingest_saved_pages_and_use_by_id()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Test script for job requirement profiles extracted once per posting
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services import job_corpus, job_profiles, matcher, metrics
+from test_groq_client import _FakeResponse, _with_fake_groq
+
+PROFILE = {
+    "title": "Senior Backend Engineer",
+    "seniority": "senior",
+    "experience": "5+ years building web services",
+    "required_skills": ["Python", "Django", "PostgreSQL", "AWS"],
+    "preferred_skills": ["Kubernetes"],
+    "domain": "fintech",
+    "education": "BS in Computer Science",
+    "responsibilities": ["Design payment APIs", "Mentor engineers"],
+}
+MATCH = '{"score": 77, "missing_keywords": ["Kubernetes"], "strengths": ["Python"], "suggestions": ["a", "b", "c"], "analysis": "Solid."}'
+
+JOB = "\n".join(
+    ["Senior Backend Engineer at a fintech company. We are a fast-growing team of friendly people."]
+    + [f"Paragraph {i}: about our culture, benefits, offices, values and hiring process, none of which is scored." for i in range(15)]
+    + ["Requirements: 5+ years with Python, Django, PostgreSQL and AWS. Kubernetes is a plus. BS in Computer Science."]
+)
+RESUMES = [
+    "Backend engineer: Python, Django, PostgreSQL, AWS, Docker.",
+    "Data engineer: Python, Spark, Airflow, AWS.",
+    "Frontend engineer: React, TypeScript, CSS.",
+]
+
+
+def _fake_post(prompts):
+    def post(api_key, body, timeout):
+        prompt = body["messages"][0]["content"]
+        prompts.append(prompt)
+        if prompt.startswith("Extract the hiring requirements"):
+            return _FakeResponse(content=json.dumps(PROFILE))
+        return _FakeResponse(content=MATCH)
+    return post
+
+
+def _with_temp_corpus(check):
+    original_path = job_corpus.JOB_CORPUS_PATH
+    with tempfile.TemporaryDirectory() as tmp:
+        job_corpus.JOB_CORPUS_PATH = os.path.join(tmp, "job_corpus.db")
+        job_profiles.clear()
+        try:
+            check()
+        finally:
+            job_corpus.JOB_CORPUS_PATH = original_path
+            job_profiles.clear()
+
+
+def test_profile_extracted_once_and_sent_instead_of_posting():
+    prompts = []
+
+    def check():
+        results = [matcher.analyze_resume_and_job_groq(resume, JOB) for resume in RESUMES]
+        assert all(result["score"] == 77 for result in results)
+
+        profile_prompts = [p for p in prompts if p.startswith("Extract the hiring requirements")]
+        match_prompts = [p for p in prompts if p not in profile_prompts]
+        assert len(profile_prompts) == 1
+        assert len(match_prompts) == len(RESUMES)
+        for prompt in match_prompts:
+            assert "Required skills: Python, Django, PostgreSQL, AWS" in prompt
+            assert "Paragraph 7" not in prompt
+        assert metrics.get("job_profiles.extracted") == 1
+        assert metrics.get("job_profiles.hits") == len(RESUMES) - 1
+
+    _with_temp_corpus(lambda: _with_fake_groq(_fake_post(prompts), check))
+    print("✓ One profile extraction serves every resume analyzed against a posting")
+
+
+def test_profile_persists_across_restarts():
+    prompts = []
+
+    def check():
+        matcher.analyze_resume_and_job_groq(RESUMES[0], JOB)
+        job_profiles.clear()  # a restarted process keeps only the database
+        matcher.analyze_resume_and_job_groq(RESUMES[1], JOB)
+        assert sum(p.startswith("Extract the hiring requirements") for p in prompts) == 1
+        assert job_corpus.get_job_profile(job_corpus.content_hash(JOB)) == PROFILE
+        # Whitespace differences do not change the posting's hash
+        assert job_corpus.content_hash(JOB.replace("\n", "\n\n  ")) == job_corpus.content_hash(JOB)
+
+    _with_temp_corpus(lambda: _with_fake_groq(_fake_post(prompts), check))
+    print("✓ Profiles are stored by job hash and reused after a restart")
+
+
+def test_short_posting_and_failed_extraction_use_raw_text():
+    prompts = []
+
+    def post(api_key, body, timeout):
+        prompt = body["messages"][0]["content"]
+        prompts.append(prompt)
+        if prompt.startswith("Extract the hiring requirements"):
+            return _FakeResponse(content='{"title": "no skills listed", "required_skills": []}')
+        return _FakeResponse(content=MATCH)
+
+    def check():
+        short_job = "Backend Engineer. Requirements: Python, Django."
+        matcher.analyze_resume_and_job_groq(RESUMES[0], short_job)
+        assert short_job in prompts[-1]
+
+        result = matcher.analyze_resume_and_job_groq(RESUMES[0], JOB)
+        assert result["score"] == 77
+        assert "Paragraph 7" in prompts[-1]
+        assert metrics.get("job_profiles.failed") == 1
+
+        # The failure is remembered: later analyses send the raw posting without retrying
+        for resume in RESUMES[1:]:
+            matcher.analyze_resume_and_job_groq(resume, JOB)
+        assert sum(p.startswith("Extract the hiring requirements") for p in prompts) == 1
+        assert metrics.get("job_profiles.negative_hits") == len(RESUMES) - 1
+
+        # Once the retry window has passed the extraction is attempted again
+        job_profiles._failed_until[job_corpus.content_hash(JOB)] = time.monotonic()
+        matcher.analyze_resume_and_job_groq(RESUMES[0], JOB)
+        assert sum(p.startswith("Extract the hiring requirements") for p in prompts) == 2
+
+    _with_temp_corpus(lambda: _with_fake_groq(post, check))
+    print("✓ Short postings and failed extractions fall back to the raw posting; failures are not retried")
+
+
+def test_render_profile_skips_empty_fields():
+    text = job_profiles.render_profile({"title": "Engineer", "required_skills": ["Go"], "preferred_skills": [], "domain": ""})
+    assert text.splitlines()[1:] == ["Title: Engineer", "Required skills: Go"]
+    print("✓ Rendered profiles list only the fields the posting has")
+
+
+if __name__ == "__main__":
+    test_profile_extracted_once_and_sent_instead_of_posting()
+    test_profile_persists_across_restarts()
+    test_short_posting_and_failed_extraction_use_raw_text()
+    test_render_profile_skips_empty_fields()
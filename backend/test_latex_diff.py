@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test script for compact LaTeX editing responses and response compression
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.latex_diff import apply_patch, make_patch, unified_diff
+from test_rescoring import ORIGINAL
+
+
+def test_patch_round_trip():
+    """Applying the patch to the uploaded source reproduces the edited document"""
+    edited = ORIGINAL.replace("JavaScript, HTML, CSS", "JavaScript, HTML, CSS, Python") + "% tailored\n"
+    patch = make_patch(ORIGINAL, edited)
+
+    assert apply_patch(ORIGINAL, patch) == edited
+    assert len(patch) == 2
+    assert "+    \\item Programming: JavaScript, HTML, CSS, Python" in unified_diff(ORIGINAL, edited)
+    print("✓ Patch reproduces the edited LaTeX")
+
+
+def test_unified_diff_applies_without_trailing_newline():
+    """patch accepts the diff when the changed last line has no newline on either side"""
+    original = ORIGINAL.rstrip("\n")
+    edited = original + "\n% tailored"
+    for old, new in ((original, edited), (original + "\n", edited), (original, edited + "\n")):
+        diff = unified_diff(old, new)
+        assert "\\ No newline at end of file\n" in diff
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "resume.tex")
+            with open(path, "w") as f:
+                f.write(old)
+            subprocess.run(["patch", "-s", path], input=diff, text=True, check=True)
+            with open(path) as f:
+                assert f.read() == new
+    print("✓ Unified diffs mark a missing final newline and apply with patch")
+
+
+def test_compact_edit_response_is_compressed():
+    """Patch mode omits the echoed documents and large bodies are gzip-encoded"""
+    from fastapi.testclient import TestClient
+    from main import app
+
+    client = TestClient(app)
+    data = {"job_description": "Python Django developer. " * 60}
+    files = {"latex_file": ("resume.tex", ORIGINAL.encode(), "text/plain")}
+
+    compact = client.post("/edit-latex-resume/", files=files, data={**data, "response_mode": "patch"})
+    assert compact.status_code == 200, compact.text
+    body = compact.json()
+    assert "patch" in body and "original_latex" not in body and "job_description" not in body
+    assert apply_patch(ORIGINAL, body["patch"]).startswith("\n\\documentclass")
+
+    full = client.post("/edit-latex-resume/", files=files, data=data, headers={"Accept-Encoding": "gzip"})
+    assert full.headers.get("content-encoding") == "gzip"
+    assert full.json()["edited_latex"]
+    print("✓ Compact responses omit echoed text; full responses are compressed")
+
+
+if __name__ == "__main__":
+    test_patch_round_trip()
+    test_unified_diff_applies_without_trailing_newline()
+    test_compact_edit_response_is_compressed()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Test script for LLM token and latency accounting
+"""
+
+import os
+import sys
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import requests
+
+from app.services import llm_ledger, matcher
+from test_groq_client import JOB, RESUME, _with_fake_groq
+
+USAGE = {"prompt_tokens": 412, "completion_tokens": 96, "total_tokens": 508}
+
+
+class _UsageResponse:
+    status_code = 200
+    ok = True
+    text = '{"score": 77, "missing_keywords": ["Kubernetes"], "suggestions": [], "analysis": "Good"}'
+
+    def json(self):
+        return {"choices": [{"message": {"content": self.text}}], "usage": USAGE}
+
+
+def _with_ledger(check):
+    original_path = llm_ledger.LLM_LEDGER_PATH
+    with tempfile.TemporaryDirectory() as directory:
+        llm_ledger.LLM_LEDGER_PATH = os.path.join(directory, "ledger.db")
+        try:
+            check()
+        finally:
+            llm_ledger.LLM_LEDGER_PATH = original_path
+
+
+def _rows():
+    conn = llm_ledger.connect()
+    try:
+        return [dict(row) for row in conn.execute("SELECT * FROM llm_calls ORDER BY id")]
+    finally:
+        conn.close()
+
+
+def test_calls_are_recorded_with_usage_and_outcome():
+    """Answered calls carry usage and latency; failed ones are recorded as errors"""
+    responses = [_UsageResponse(), requests.Timeout("read timed out")]
+
+    def post(api_key, body, timeout):
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    def check():
+        assert matcher.analyze_resume_and_job_groq(RESUME, JOB)["source"] == "llm"
+        assert matcher.analyze_resume_and_job_groq(RESUME, JOB)["source"] == "fallback"
+
+        parsed, failed = _rows()
+        assert parsed["stage"] == "match" and parsed["outcome"] == "parsed"
+        assert (parsed["prompt_tokens"], parsed["completion_tokens"]) == (412, 96)
+        assert parsed["model"] and parsed["prompt_chars"] > len(RESUME) and parsed["latency_ms"] >= 0
+        assert failed["outcome"] == "error" and "Timeout" in failed["error"]
+        assert failed["prompt_tokens"] is None
+
+    _with_ledger(lambda: _with_fake_groq(post, check))
+    print("✓ LLM calls are recorded with tokens, latency and outcome")
+
+
+def test_summary_groups_by_endpoint_and_stage():
+    """The summary aggregates tokens and outcomes per endpoint, stage and window"""
+    def check():
+        for endpoint, stage, outcome, tokens, latency in [
+            ("/analyze/", "match", "parsed", 400, 800.0),
+            ("/analyze/", "match", "parsed", 600, 1200.0),
+            ("/analyze/", "match", "fallback", None, None),
+            ("/edit-latex-resume/", "edit", "parsed", 2000, 5000.0),
+        ]:
+            entry = llm_ledger.LedgerEntry(stage, {"model": "m", "messages": [{"content": "x" * 10}]})
+            entry.endpoint = endpoint
+            entry.latency_ms = latency
+            entry.usage = {"prompt_tokens": tokens, "completion_tokens": 50} if tokens else {}
+            entry.finish(outcome)
+
+        groups = {(group["endpoint"], group["stage"]): group for group in llm_ledger.summarize()}
+        analyze = groups[("/analyze/", "match")]
+        assert analyze["calls"] == 3
+        assert analyze["outcomes"] == {"parsed": 2, "fallback": 1, "error": 0}
+        assert analyze["prompt_tokens"] == 1000 and analyze["avg_prompt_tokens"] == 500
+        assert analyze["latency_ms"]["max"] == 1200.0
+        assert analyze["ms_per_1k_prompt_tokens"] == 2000.0
+        assert groups[("/edit-latex-resume/", "edit")]["completion_tokens"] == 50
+
+        windows = llm_ledger.summarize(bucket_seconds=3600)
+        assert all("window_start" in group for group in windows)
+
+    _with_ledger(check)
+    print("✓ Ledger summary aggregates by endpoint and stage")
+
+
+def test_usage_endpoint():
+    from fastapi.testclient import TestClient
+    from main import app
+
+    def check():
+        entry = llm_ledger.LedgerEntry("match", {"model": "m", "messages": []})
+        entry.endpoint = "/analyze/"
+        entry.finish("error", "HTTP 503")
+        response = TestClient(app).get("/llm-usage", params={"hours": 1})
+        assert response.status_code == 200
+        assert response.json()["groups"][0]["outcomes"]["error"] == 1
+
+    _with_ledger(check)
+    print("✓ /llm-usage reports the ledger summary")
+
+
+if __name__ == "__main__":
+    test_calls_are_recorded_with_usage_and_outcome()
+    test_summary_groups_by_endpoint_and_stage()
+    test_usage_endpoint()
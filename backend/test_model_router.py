@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Test script for per-stage model routing
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services import groq_client, metrics, model_router
+from test_groq_client import _FakeResponse, _with_fake_groq
+
+
+def test_slow_primary_loses_traffic_until_probed():
+    """A model over the stage's latency SLO is demoted, then probed after a quiet period"""
+    router = model_router.ModelRouter()
+    primary, fallback = model_router.DEFAULT_STAGE_MODELS["match"]
+    assert router.route("match")[0] == primary
+
+    for _ in range(model_router.ROUTER_MIN_SAMPLES):
+        router.observe(primary, 20000, ok=True)
+    assert router.route("match") == [fallback, primary]
+
+    original_probe = model_router.ROUTER_PROBE_SECONDS
+    model_router.ROUTER_PROBE_SECONDS = 0
+    try:
+        assert router.route("match")[0] == primary
+    finally:
+        model_router.ROUTER_PROBE_SECONDS = original_probe
+    print("✓ Slow models are routed around and probed again later")
+
+
+def test_demoted_fallback_is_not_probed_ahead_of_primary():
+    router = model_router.ModelRouter()
+    primary, fallback = model_router.DEFAULT_STAGE_MODELS["match"]
+    for _ in range(model_router.ROUTER_MIN_SAMPLES):
+        router.observe(fallback, 20000, ok=True)
+
+    original_probe = model_router.ROUTER_PROBE_SECONDS
+    model_router.ROUTER_PROBE_SECONDS = 0
+    try:
+        assert router.route("match") == [primary, fallback]
+    finally:
+        model_router.ROUTER_PROBE_SECONDS = original_probe
+    print("✓ A demoted model is only probed when it outranks the healthy ones")
+
+
+def test_error_prone_model_is_demoted():
+    router = model_router.ModelRouter()
+    primary, fallback = model_router.DEFAULT_STAGE_MODELS["edit"]
+    for _ in range(model_router.ROUTER_MIN_SAMPLES):
+        router.observe(primary, 500, ok=False)
+    assert router.route("edit")[0] == fallback
+    print("✓ Models with a high error rate are demoted")
+
+
+def test_stage_models_and_failover():
+    """Each stage calls its own primary model, and a 5xx fails over to the next model"""
+    calls = []
+
+    def post(api_key, body, timeout):
+        calls.append(body["model"])
+        if body["model"] == "llama-3.1-8b-instant":
+            return _FakeResponse(503, "over capacity")
+        return _FakeResponse(200, '{"score": 70}')
+
+    def check():
+        model_router.ROUTER_MAX_ATTEMPTS = 2
+        groq_client.chat_completion("key", {"messages": []}, stage="edit")
+        assert calls == [model_router.DEFAULT_STAGE_MODELS["edit"][0]]
+
+        calls.clear()
+        content = groq_client.chat_completion("key", {"messages": []}, stage="rescore")
+        assert content == '{"score": 70}'
+        assert calls == model_router.DEFAULT_STAGE_MODELS["rescore"]
+        assert metrics.get("groq.model_failover") == 1
+
+        stats = model_router.router.stats()
+        assert stats["models"]["llama-3.1-8b-instant"]["error_rate"] == 1.0
+        assert stats["stages"]["rescore"]["latency_slo_ms"] > 0
+
+    _with_fake_groq(post, check)
+    print("✓ Stages use their own models and fail over on errors")
+
+
+def test_stage_models_are_configurable():
+    os.environ["GROQ_MODELS_MATCH"] = "model-a, model-b"
+    try:
+        assert model_router.ModelRouter().route("match") == ["model-a", "model-b"]
+    finally:
+        os.environ.pop("GROQ_MODELS_MATCH")
+    print("✓ Stage models can be configured per stage")
+
+
+if __name__ == "__main__":
+    test_slow_primary_loses_traffic_until_probed()
+    test_demoted_fallback_is_not_probed_ahead_of_primary()
+    test_error_prone_model_is_demoted()
+    test_stage_models_and_failover()
+    test_stage_models_are_configurable()
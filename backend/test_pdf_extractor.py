@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Test script for the PDF text extraction backends
+"""
+
+import io
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services import pdf_extractor
+from app.services.pdf_extractor import assess_text_quality, extract_pdf_text
+from app.services.resume_sections import prompt_resume_text
+
+
+def build_sample_pdf(lines, page_count=1):
+    """Build a minimal valid PDF; lines is a list of (text, font_size, bold) tuples"""
+    ops = ["BT"]
+    y = 760
+    for text, size, bold in lines:
+        font = "/F2" if bold else "/F1"
+        escaped = text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+        ops.append(f"{font} {size} Tf 1 0 0 1 50 {y} Tm ({escaped}) Tj")
+        y -= size + 6
+    ops.append("ET")
+    stream = "\n".join(ops).encode("latin-1")
+
+    content_id = 3 + page_count
+    fonts = f"<< /F1 {content_id + 1} 0 R /F2 {content_id + 2} 0 R >>"
+    kids = " ".join(f"{3 + i} 0 R" for i in range(page_count))
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{kids}] /Count {page_count} >>".encode(),
+    ]
+    for _ in range(page_count):
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {content_id} 0 R "
+            f"/Resources << /Font {fonts} >> >>".encode()
+        )
+    objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold >>")
+
+    pdf = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref_offset = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        pdf += b"%010d 00000 n \n" % offset
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+    return bytes(pdf)
+
+
+SAMPLE_LINES = [
+    ("Jane Doe", 20, True),
+    ("EXPERIENCE", 14, True),
+    ("Software Engineer at Example Corp, 2021 - Present", 10, False),
+    ("Built REST APIs with Python and Django serving two million requests a day", 10, False),
+    ("Migrated batch jobs to Docker containers running on AWS", 10, False),
+    ("SKILLS", 14, True),
+    ("Python, SQL, Docker, Kubernetes, React", 10, False),
+]
+
+
+def test_fast_backend_used_for_clean_pdf():
+    """A plain text PDF should never touch the pdfplumber path"""
+    result = extract_pdf_text(io.BytesIO(build_sample_pdf(SAMPLE_LINES)))
+
+    assert result["backend"] == "pypdf2"
+    assert len(result["attempts"]) == 1
+    assert "Django" in result["text"]
+    print(f"✓ Extracted {result['quality']['chars']} characters with {result['backend']}")
+
+
+def test_fallback_when_fast_output_is_poor():
+    """Too little text on the fast path should fall back to pdfplumber"""
+    result = extract_pdf_text(io.BytesIO(build_sample_pdf([("Hi", 10, False)])))
+
+    assert result["backend"] == "pdfplumber"
+    assert [attempt["backend"] for attempt in result["attempts"]] == ["pypdf2", "pdfplumber"]
+    print("✓ Fell back to pdfplumber for low-quality output")
+
+
+def test_quality_checks():
+    """Garbled glyphs and missing word spacing fail the quality check"""
+    words = "Experienced engineer building data pipelines and web services. " * 5
+    assert assess_text_quality(words, 1)["ok"]
+    assert assess_text_quality("(cid:12)(cid:40)(cid:3) " * 40, 1)["reason"] == "garbled glyphs"
+    assert assess_text_quality("Experiencedengineerbuildingdatapipelines " * 10, 1)["reason"] == "missing word spacing"
+    print("✓ Quality checks flag garbled and unspaced text")
+
+
+
+def test_layout_segmentation():
+    """Both backends split sections on enlarged bold headings; prompts drop contact and references"""
+    lines = SAMPLE_LINES + [
+        ("Senior Developer", 10, True),  # a bold job title, not a section heading
+        ("Led the payments team", 10, False),
+        ("REFERENCES", 14, True),
+        ("Available on request", 10, False),
+    ]
+    original_backends = pdf_extractor.PDF_EXTRACTORS
+    try:
+        for backend in ("pypdf2", "pdfplumber"):
+            pdf_extractor.PDF_EXTRACTORS = [backend]
+            result = extract_pdf_text(io.BytesIO(build_sample_pdf(lines)))
+            sections = result["sections"]
+            assert result["segmentation"] == "layout", backend
+            assert list(sections) == ["header", "experience", "skills", "references"], (backend, sections)
+            assert sections["skills"].endswith("Senior Developer\nLed the payments team")
+    finally:
+        pdf_extractor.PDF_EXTRACTORS = original_backends
+
+    prompt = prompt_resume_text(result["text"], sections)
+    assert prompt.startswith("EXPERIENCE\n") and "Jane Doe" not in prompt and "Available on request" not in prompt
+    print(f"✓ Layout sections {list(sections)}; prompt text {len(prompt)} of {len(result['text'])} chars")
+
+
+if __name__ == "__main__":
+    test_fast_backend_used_for_clean_pdf()
+    test_fallback_when_fast_output_is_poor()
+    test_quality_checks()
+    test_layout_segmentation()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test script for the opt-in request profiler
+"""
+
+import os
+import sys
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services import profiler
+from test_pdf_extractor import SAMPLE_LINES, build_sample_pdf
+
+
+def test_slow_request_profile_saved():
+    """A request over the latency threshold leaves a collapsed-stack profile named by request ID"""
+    from fastapi.testclient import TestClient
+    import main
+
+    def slow_scorer(resume_text, job_text):
+        # Scoring blocks for a fixed time so the sampler sees it whatever earlier tests cached
+        time.sleep(0.1)
+        return {"summary": "Slow", "score": 50, "recommendations": [], "tier": "local"}
+
+    client = TestClient(main.app)
+    saved = (profiler.PROFILE_SLOW_MS, profiler.PROFILE_DIR, profiler.PROFILE_INTERVAL_MS)
+    original_scorer = main.score_without_llm
+    main._pdf_text_cache.clear()
+    with tempfile.TemporaryDirectory() as tmp:
+        profiler.PROFILE_SLOW_MS, profiler.PROFILE_DIR, profiler.PROFILE_INTERVAL_MS = 0.001, tmp, 1
+        main.score_without_llm = slow_scorer
+        try:
+            response = client.post(
+                "/analyze/",
+                files={"resume": ("resume.pdf", build_sample_pdf(SAMPLE_LINES, 3), "application/pdf")},
+                data={"job_description": "Python Django developer with AWS experience. " * 5},
+                headers={"X-Request-ID": "profile-test-1"},
+            )
+        finally:
+            profiler.PROFILE_SLOW_MS, profiler.PROFILE_DIR, profiler.PROFILE_INTERVAL_MS = saved
+            main.score_without_llm = original_scorer
+
+        assert response.status_code == 200, response.text
+        path = os.path.join(tmp, "profile-test-1.collapsed")
+        assert os.path.exists(path)
+        with open(path) as profile_file:
+            lines = profile_file.read().splitlines()
+    assert lines and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert any("slow_scorer (test_profiler.py" in line for line in lines)
+    print(f"✓ Profile saved with {len(lines)} distinct stacks")
+
+
+def test_profile_write_failure_does_not_fail_request():
+    """Samples are handed over as a snapshot, and any fault writing them is only logged"""
+    import asyncio
+    sent, writes = [], []
+
+    async def app(scope, receive, send):
+        time.sleep(0.05)  # blocking work the sampler is sure to see
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    async def send(message):
+        sent.append(message)
+
+    def broken_write(request_id, samples, directory=None):
+        writes.append(request_id)
+        samples["late"] += 1  # a snapshot: mutating it cannot disturb the sampler
+        raise RuntimeError("dictionary changed size during iteration")
+
+    saved = (profiler.PROFILE_SLOW_MS, profiler.PROFILE_INTERVAL_MS, profiler.write_profile)
+    profiler.PROFILE_SLOW_MS, profiler.PROFILE_INTERVAL_MS, profiler.write_profile = 0.001, 1, broken_write
+    try:
+        asyncio.run(profiler.ProfilingMiddleware(app)({"type": "http", "path": "/x"}, None, send))
+    finally:
+        profiler.PROFILE_SLOW_MS, profiler.PROFILE_INTERVAL_MS, profiler.write_profile = saved
+    assert writes and sent[-1]["body"] == b"ok"
+    print("✓ Profiler faults are logged without failing the request")
+
+
+def test_disabled_by_default():
+    assert profiler.PROFILE_SAMPLE_RATE == 0 and profiler.PROFILE_SLOW_MS == 0
+    print("✓ Profiler is off unless configured")
+
+
+if __name__ == "__main__":
+    test_slow_request_profile_saved()
+    test_profile_write_failure_does_not_fail_request()
+    test_disabled_by_default()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Test script for incremental re-scoring of edited LaTeX resumes
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.rescoring import rescore_edited_resume
+
+ORIGINAL = r"""
+\documentclass{article}
+\begin{document}
+\section{Skills}
+\begin{itemize}
+    \item Programming: JavaScript, HTML, CSS
+\end{itemize}
+\section{Experience}
+\begin{itemize}
+    \item Developed web applications using React and Node.js
+\end{itemize}
+\end{document}
+"""
+
+JOB = "Full Stack Developer: Python, Django, SQL, React, Node.js, AWS, Docker"
+
+
+def test_only_changed_sections_move_the_score():
+    """Adding job keywords to the skills section raises the score by the coverage gained"""
+    edited = ORIGINAL.replace("JavaScript, HTML, CSS", "JavaScript, HTML, CSS, Python, Django")
+    result = rescore_edited_resume(ORIGINAL, edited, JOB, original_score=60)
+
+    assert result["changed_sections"] == ["skills"]
+    assert {"python", "django"} <= set(result["keywords_gained"])
+    assert result["score"] == 60 + result["delta"] and result["delta"] > 0
+    print(f"✓ Score moved by {result['delta']} from the skills section alone")
+
+
+def test_unchanged_resume_keeps_original_score():
+    result = rescore_edited_resume(ORIGINAL, ORIGINAL, JOB, original_score=72)
+    assert result["score"] == 72 and result["changed_sections"] == []
+    print("✓ Unchanged resume keeps its original score")
+
+
+if __name__ == "__main__":
+    test_only_changed_sections_move_the_score()
+    test_unchanged_resume_keeps_original_score()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Test script for stored resume profiles
+"""
+
+import os
+import sys
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services import resume_store
+from test_pdf_extractor import SAMPLE_LINES, build_sample_pdf
+
+SAMPLE_LATEX = r"""
+\documentclass{article}
+\begin{document}
+\section{Skills}
+\begin{itemize}
+    \item Programming: Python, JavaScript, SQL
+\end{itemize}
+\section{Experience}
+\begin{itemize}
+    \item Developed web applications using React and Node.js
+\end{itemize}
+\end{document}
+"""
+
+
+def test_store_and_reuse_resume():
+    """Upload once, then analyze and edit by resume_id without re-uploading"""
+    original_path = resume_store.RESUME_STORE_PATH
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        resume_store.RESUME_STORE_PATH = os.path.join(tmp_dir, "resumes.db")
+        try:
+            _exercise_resume_endpoints()
+        finally:
+            resume_store.RESUME_STORE_PATH = original_path
+    print("✓ Stored resumes can be analyzed and edited by resume_id")
+
+
+def _exercise_resume_endpoints():
+    from fastapi.testclient import TestClient
+    from main import app
+
+    client = TestClient(app)
+
+    stored = client.post("/resumes/", files={"resume": ("resume.pdf", build_sample_pdf(SAMPLE_LINES), "application/pdf")})
+    assert stored.status_code == 200, stored.text
+    pdf_id = stored.json()["resume_id"]
+    assert "Django" in stored.json()["skills"]
+    assert {"experience", "skills"} <= set(stored.json()["sections"])
+
+    profile = client.get(f"/resumes/{pdf_id}").json()
+    assert "Python" in profile["sections"]["skills"]
+
+    analysis = client.post("/analyze/", data={"resume_id": pdf_id, "job_description": "Python developer with AWS"})
+    assert analysis.status_code == 200 and "score" in analysis.json()
+
+    tex_id = client.post("/resumes/", files={"resume": ("resume.tex", SAMPLE_LATEX.encode(), "text/plain")}).json()["resume_id"]
+    edited = client.post("/edit-latex-resume/", data={"resume_id": tex_id, "job_description": "Python Django developer"})
+    assert edited.status_code == 200 and "edited_latex" in edited.json()
+
+    # A PDF profile has no LaTeX source to edit
+    assert client.post("/edit-latex-resume/", data={"resume_id": pdf_id, "job_description": "x"}).status_code == 400
+
+    assert client.delete(f"/resumes/{pdf_id}").status_code == 200
+    assert client.get(f"/resumes/{pdf_id}").status_code == 404
+
+
+def test_index_ranks_stored_resumes():
+    """The inverted index ranks the pool against a job and follows adds and removes"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "resumes.db")
+        resume_store.save_resume("a" * 64, "pdf", "Backend engineer. Python, Django, PostgreSQL, AWS, Docker.", path=path)
+        resume_store.save_resume("b" * 64, "pdf", "Frontend developer. React, TypeScript, CSS, Figma.", path=path)
+        resume_store.save_resume("c" * 64, "pdf", "Accountant. Excel, bookkeeping, payroll.", path=path)
+
+        job = "Senior backend engineer: Python and Django, PostgreSQL on AWS. Docker a plus."
+        ranked = resume_store.search_resumes(job, top_k=2, path=path)
+        assert [result["resume_id"] for result in ranked][:1] == ["a" * 32]
+        assert "Django" in ranked[0]["matched_skills"]
+        assert len(ranked) <= 2
+
+        resume_store.delete_resume("a" * 32, path=path)
+        ranked = resume_store.search_resumes(job, path=path)
+        assert "a" * 32 not in [result["resume_id"] for result in ranked]
+    print("✓ Inverted index ranks resumes and tracks removals")
+
+
+if __name__ == "__main__":
+    test_store_and_reuse_resume()
+    test_index_ranks_stored_resumes()
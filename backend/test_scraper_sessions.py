@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test script for pooled scraper sessions (runs against a local HTTP server)
+"""
+import os
+import sys
+import threading
+import types
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services import job_scraper
+
+PAGE = (
+    "<html><body><div class=\"job-description\">"
+    + "Backend engineer building Python services with Django and PostgreSQL. " * 5
+    + "</div></body></html>"
+).encode("utf-8")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    paths = []
+    connections = set()
+
+    def do_GET(self):
+        _Handler.paths.append(self.path)
+        _Handler.connections.add(self.client_address)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(PAGE)))
+        self.end_headers()
+        self.wfile.write(PAGE)
+
+    def log_message(self, *args):
+        pass
+
+
+def _with_server(check):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    original_random = job_scraper.random
+    job_scraper.random = types.SimpleNamespace(uniform=lambda low, high: 0)
+    _Handler.paths, _Handler.connections = [], set()
+    job_scraper.close_sessions()
+    try:
+        check(f"http://127.0.0.1:{server.server_address[1]}")
+    finally:
+        job_scraper.random = original_random
+        job_scraper.close_sessions()
+        server.shutdown()
+        server.server_close()
+
+
+def test_root_visited_once_and_connection_reused():
+    """Repeated scrapes of one site share a session: one home page visit, one connection"""
+    def check(base):
+        for job in range(3):
+            text = job_scraper.scrape_job_description(f"{base}/jobs/{job}")
+            assert text.startswith("Backend engineer")
+        assert _Handler.paths == ["/", "/jobs/0", "/jobs/1", "/jobs/2"]
+        assert len(_Handler.connections) == 1
+
+    _with_server(check)
+    print("✓ One root visit and one connection for three scrapes")
+
+
+def test_session_expires_after_ttl():
+    """A new session window starts with a fresh session and a new root visit"""
+    def check(base):
+        original_ttl = job_scraper.SESSION_TTL_SECONDS
+        job_scraper.SESSION_TTL_SECONDS = 0
+        try:
+            job_scraper.scrape_job_description(f"{base}/jobs/0")
+            job_scraper.scrape_job_description(f"{base}/jobs/1")
+        finally:
+            job_scraper.SESSION_TTL_SECONDS = original_ttl
+        assert _Handler.paths == ["/", "/jobs/0", "/", "/jobs/1"]
+
+    _with_server(check)
+    print("✓ Sessions are replaced once their window passes")
+
+
+if __name__ == "__main__":
+    test_root_visited_once_and_connection_reused()
+    test_session_expires_after_ttl()
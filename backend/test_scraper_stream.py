@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Test script for the streaming job page parser (no network access needed)
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.job_scraper import parse_job_stream
+
+DESCRIPTION = "".join(f"<li>Requirement {i}: Python, Django and PostgreSQL experience in production systems</li>" for i in range(6))
+
+
+def _chunks(page: str, size: int = 1024):
+    """Yield the page in fixed-size byte chunks, recording how many were consumed"""
+    data = page.encode("utf-8")
+    for start in range(0, len(data), size):
+        _chunks.consumed += 1
+        yield data[start:start + size]
+
+
+def test_stops_after_description_container():
+    """A heavy inline bundle after the description container is never downloaded"""
+    page = (
+        "<html><head><script>var bundle = '" + "x" * 5000 + "';</script></head><body>"
+        f"<div id=\"jobDescriptionText\" class=\"jobsearch-jobDescriptionText\"><ul>{DESCRIPTION}</ul></div>"
+        "<script>" + "y" * 500_000 + "</script></body></html>"
+    )
+    _chunks.consumed = 0
+    text = parse_job_stream(_chunks(page), "https://ca.indeed.com/viewjob?jk=1")
+
+    assert text.startswith("Requirement 0: Python") and "bundle" not in text
+    assert _chunks.consumed < 20
+    print(f"✓ Stopped after {_chunks.consumed} of {len(page) // 1024} chunks")
+
+
+def test_falls_back_to_full_strategies():
+    """Without a known container the cleaned page goes through extract_job_text, minus scripts"""
+    page = (
+        "<html><body><script>document.write('Ignore this script text entirely please');</script>"
+        f"<section class=\"posting-details\"><ul>{DESCRIPTION}</ul></section></body></html>"
+    )
+    _chunks.consumed = 0
+    text = parse_job_stream(_chunks(page, size=64), "https://example.com/jobs/1")
+
+    assert "Requirement 5" in text and "document.write" not in text
+    print("✓ Pages without a description container use the full extraction")
+
+
+def test_byte_cap():
+    """Reading stops at max_bytes even if no container was found"""
+    page = "<html><body>" + f"<p>{DESCRIPTION}</p>" + "<div>" + "z" * 100_000 + "</div></body></html>"
+    _chunks.consumed = 0
+    parse_job_stream(_chunks(page), "https://example.com/jobs/2", max_bytes=8 * 1024)
+
+    assert _chunks.consumed == 8
+    print("✓ Download capped at max_bytes")
+
+
+if __name__ == "__main__":
+    test_stops_after_description_container()
+    test_falls_back_to_full_strategies()
+    test_byte_cap()
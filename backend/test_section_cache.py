@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test script for the section-level analysis cache
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services import section_cache
+from app.services.cascade import score_resume
+from test_groq_client import _FakeResponse, _with_fake_groq
+
+JOB = "Backend Engineer. Requirements: Python, Django, PostgreSQL, Kubernetes, AWS, Redis."
+RESUME = """Jane Doe
+jane@example.com
+
+Summary
+Backend engineer focused on reliable web services.
+
+Experience
+- Built REST APIs in Python and Django
+- Ran PostgreSQL on AWS
+
+Education
+B.Sc. Computer Science
+
+Projects
+- Chat bot in JavaScript
+"""
+
+
+def test_resubmission_merges_changed_sections():
+    """A tweaked bullet reuses the stored analysis; a rewrite goes back to the LLM"""
+    calls = []
+
+    def post(api_key, body, timeout):
+        calls.append(body)
+        return _FakeResponse(200, '{"score": 70, "missing_keywords": ["Kubernetes", "Redis", "Terraform"], "strengths": [], '
+                                  '"suggestions": ["Add Kubernetes experience", "Quantify API impact"], "analysis": "Solid"}')
+
+    def check():
+        section_cache.clear()
+        first = score_resume(RESUME, JOB, mode="llm")
+        assert first["tier"] == "llm" and len(calls) == 1
+
+        again = score_resume(RESUME.replace("\n\n", "\n \n"), JOB, mode="llm")
+        assert again["tier"] == "section_cache" and again["score"] == first["score"]
+        assert again["incremental"]["changed_sections"] == []
+
+        tweaked = RESUME.replace("Ran PostgreSQL on AWS", "Ran PostgreSQL and Redis on AWS with Kubernetes")
+        merged = score_resume(tweaked, JOB, mode="llm")
+        assert len(calls) == 1
+        assert merged["tier"] == "section_cache"
+        assert merged["incremental"]["changed_sections"] == ["experience"]
+        assert merged["incremental"]["keywords_gained"] == ["kubernetes", "redis"]
+        assert merged["score"] == first["score"] + merged["incremental"]["delta"] > first["score"]
+        # Gaps the edit closed are dropped from the merged analysis
+        assert merged["missing_keywords"] == ["Terraform"]
+        assert merged["summary"] == "Missing: Terraform. Solid"
+        assert merged["recommendations"] == ["Quantify API impact"]
+
+        rewritten = "Data Analyst\n\nSkills\nExcel, Tableau\n\nExperience\n- Dashboards\n\nEducation\nB.A. Economics\n"
+        assert score_resume(rewritten, JOB, mode="llm")["tier"] == "llm"
+        assert len(calls) == 2
+
+    _with_fake_groq(post, check)
+    section_cache.clear()
+    print("✓ Small edits are merged into the cached analysis; rewrites are re-analyzed")
+
+
+def test_fallback_results_are_not_stored():
+    section_cache.clear()
+    original_key = os.environ.pop("GROQ_API_KEY", None)
+    try:
+        assert score_resume(RESUME, JOB, mode="llm")["source"] == "fallback"
+        assert score_resume(RESUME, JOB, mode="llm")["tier"] == "llm"
+    finally:
+        if original_key is not None:
+            os.environ["GROQ_API_KEY"] = original_key
+    print("✓ Only LLM analyses become merge bases")
+
+
+if __name__ == "__main__":
+    test_resubmission_merges_changed_sections()
+    test_fallback_results_are_not_stored()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Test script for JSON-mode Groq response parsing
+"""
+
+import json
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.latex_editor import LaTeXResumeEditor
+from app.services.matcher import _parse_model_content
+from app.services.structured_output import MATCH_SCHEMA, parse_json_object, validate
+
+
+def test_match_response_parsed_from_json():
+    """A JSON match response is parsed directly, tolerating code fences and numeric strings"""
+    content = "```json\n" + json.dumps({
+        "score": "78",
+        "missing_keywords": ["Kubernetes", "Terraform"],
+        "suggestions": ["Quantify API latency improvements"],
+        "analysis": "Strong backend match.",
+    }) + "\n```"
+    result = _parse_model_content(content)
+
+    assert result["score"] == 78
+    assert result["summary"] == "Missing: Kubernetes, Terraform. Strong backend match."
+    assert result["recommendations"] == ["Quantify API latency improvements"]
+    print("✓ JSON match response parsed")
+
+
+def test_invalid_json_falls_back_to_text_parser():
+    result = _parse_model_content("Match Score: 71\n\nDetailed Analysis:\nDecent fit.")
+    assert result["score"] == 71
+    print("✓ Text-format response still parsed")
+
+
+def test_schema_validation():
+    try:
+        validate(parse_json_object('{"missing_keywords": []}'), MATCH_SCHEMA)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("A response without a score must fail validation")
+    assert validate({"score": 140, "missing_keywords": "SQL, AWS"}, MATCH_SCHEMA)["missing_keywords"] == ["SQL", "AWS"]
+    # Infinite scores are invalid like any other non-number, and fall back to the text parser
+    for score in ('"inf"', "1e999"):
+        try:
+            validate(parse_json_object('{"score": %s}' % score), MATCH_SCHEMA)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"score {score} must fail validation")
+    assert _parse_model_content('{"score": 1e999, "analysis": "Match Score: 64"}')["score"] == 64
+    print("✓ Schema validation rejects and coerces as expected")
+
+
+def test_edit_suggestions_parsed_from_json():
+    editor = LaTeXResumeEditor()
+    content = json.dumps({
+        "skills_additions": ["Django", "SQL"],
+        "keywords_to_include": ["REST APIs"],
+        "complete_latex": "\\documentclass{article}\\begin{document}Hi\\end{document}",
+    })
+    suggestions = editor._parse_json_suggestions(content)
+
+    assert suggestions["skills_additions"] == ["Django", "SQL"]
+    assert suggestions["complete_latex"].startswith("\\documentclass")
+    print("✓ JSON edit suggestions parsed")
+
+
+if __name__ == "__main__":
+    test_match_response_parsed_from_json()
+    test_invalid_json_falls_back_to_text_parser()
+    test_schema_validation()
+    test_edit_suggestions_parsed_from_json()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test script for tailoring one LaTeX resume to several jobs in one request
+"""
+
+import io
+import json
+import os
+import sys
+import zipfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from test_rescoring import ORIGINAL
+
+JOBS = [
+    "Backend Engineer\nPython Django developer with PostgreSQL and AWS experience.",
+    "Frontend Engineer\nReact and TypeScript developer building design systems.",
+]
+
+
+def _post(data):
+    from fastapi.testclient import TestClient
+    from main import app
+
+    client = TestClient(app)
+    files = {"latex_file": ("resume.tex", ORIGINAL.encode(), "text/plain")}
+    return client.post("/tailor-latex-resume/", files=files, data={"job_descriptions": JOBS, **data})
+
+
+def test_ndjson_variants_and_ranking():
+    """One result line per job, then a ranking over the new scores"""
+    response = _post({"response_mode": "patch"})
+    assert response.status_code == 200, response.text
+    lines = [json.loads(line) for line in response.text.splitlines()]
+
+    results = [line for line in lines if line["type"] == "result"]
+    assert sorted(line["index"] for line in results) == [0, 1]
+    assert all("patch" in line and "edited_latex" not in line for line in results)
+    ranking = lines[-1]["ranking"]
+    assert lines[-1]["type"] == "ranking" and len(ranking) == 2
+    assert ranking[0]["new_score"] >= ranking[1]["new_score"]
+    print("✓ Variants stream as NDJSON followed by a ranking")
+
+
+def test_zip_output():
+    """The zip holds one .tex per job and a summary with scores"""
+    response = _post({"output": "zip"})
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"] == "application/zip"
+
+    archive = zipfile.ZipFile(io.BytesIO(response.content))
+    summary = json.loads(archive.read("summary.json"))
+    assert [item["file"] for item in summary] == ["01-backend-engineer.tex", "02-frontend-engineer.tex"]
+    assert "\\documentclass" in archive.read(summary[0]["file"]).decode()
+    assert all("new_score" in item and "changes_made" in item for item in summary)
+    print("✓ Zip output contains each variant and a summary")
+
+
+def test_rejects_unknown_output():
+    response = _post({"output": "tar"})
+    assert response.status_code == 400
+    print("✓ Unknown output formats are rejected")
+
+
+if __name__ == "__main__":
+    test_ndjson_variants_and_ranking()
+    test_zip_output()
+    test_rejects_unknown_output()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Test script for request tracing
+"""
+
+import json
+import os
+import sys
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services import tracing
+from test_rescoring import ORIGINAL
+
+
+def test_edit_request_reports_spans():
+    """Server-Timing lists each stage, and the span log gets one line per request"""
+    from fastapi.testclient import TestClient
+    from main import app
+
+    client = TestClient(app)
+    original_path = tracing.TRACE_LOG_PATH
+    with tempfile.TemporaryDirectory() as tmp:
+        tracing.TRACE_LOG_PATH = os.path.join(tmp, "spans.jsonl")
+        try:
+            response = client.post(
+                "/edit-latex-resume/",
+                files={"latex_file": ("resume.tex", ORIGINAL.encode(), "text/plain")},
+                data={"job_description": "Python Django developer with AWS experience. " * 5},
+                headers={"X-Request-ID": "trace-test-1"},
+            )
+        finally:
+            tracing.TRACE_LOG_PATH = original_path
+
+        assert response.status_code == 200, response.text
+        assert response.headers["x-request-id"] == "trace-test-1"
+        timing = response.headers["server-timing"]
+        for name in ("upload_read", "latex_edit", "rescore", "total"):
+            assert f"{name};dur=" in timing, timing
+
+        with open(os.path.join(tmp, "spans.jsonl")) as log_file:
+            records = [json.loads(line) for line in log_file]
+    assert len(records) == 1 and records[0]["request_id"] == "trace-test-1"
+    assert records[0]["status"] == 200 and records[0]["path"] == "/edit-latex-resume/"
+    print(f"✓ Server-Timing: {timing}")
+
+
+def test_span_outside_request_is_noop():
+    with tracing.span("pdf_extract"):
+        pass
+    assert tracing.current_trace() is None
+    print("✓ Spans outside a request are ignored")
+
+
+if __name__ == "__main__":
+    test_edit_request_reports_spans()
+    test_span_outside_request_is_noop()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test script for streaming upload ingestion
+"""
+
+import asyncio
+import hashlib
+import io
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from starlette.datastructures import UploadFile
+
+from app.services.upload_ingest import UploadRejected, ingest_upload
+from test_pdf_extractor import SAMPLE_LINES, build_sample_pdf
+
+
+def _ingest(data: bytes, kind: str, **limits):
+    upload = UploadFile(io.BytesIO(data), filename=f"resume.{kind}")
+    return asyncio.run(ingest_upload(upload, kind, **limits))
+
+
+def test_pdf_is_hashed_and_page_counted():
+    """Digest and page count are computed while streaming"""
+    pdf_bytes = build_sample_pdf(SAMPLE_LINES, page_count=3)
+    ingested = _ingest(pdf_bytes, "pdf")
+
+    assert ingested.sha256 == hashlib.sha256(pdf_bytes).hexdigest()
+    assert ingested.size == len(pdf_bytes)
+    assert ingested.pages == 3
+    assert ingested.read_bytes() == pdf_bytes
+    ingested.close()
+    print("✓ PDF ingested with digest and page count")
+
+
+def test_rejects_bad_uploads():
+    """Wrong magic bytes, oversized files and too many pages are rejected"""
+    rejections = [
+        (b"not really a pdf" * 100, "pdf", {}, 400),
+        (build_sample_pdf(SAMPLE_LINES) + b"%" * 200_000, "pdf", {"max_bytes": 100_000}, 413),
+        (build_sample_pdf(SAMPLE_LINES, page_count=4), "pdf", {"max_pages": 2}, 413),
+        (b"%PDF-1.4 binary", "tex", {}, 400),
+        (b"\\section{Skills} \xff\xfe", "tex", {}, 400),
+    ]
+    for data, kind, limits, status in rejections:
+        try:
+            _ingest(data, kind, **limits)
+        except UploadRejected as e:
+            assert e.status_code == status, (str(e), e.status_code)
+        else:
+            raise AssertionError(f"{kind} upload should have been rejected")
+    print("✓ Invalid uploads rejected early")
+
+
+def test_oversized_request_rejected_by_middleware():
+    """Request bodies over the limit get a 413 before reaching the endpoint"""
+    from fastapi.testclient import TestClient
+    from main import app
+    from app.services.upload_ingest import MAX_REQUEST_BYTES
+
+    client = TestClient(app)
+    files = {"resume": ("resume.pdf", b"%PDF-" + b"0" * (MAX_REQUEST_BYTES + 1), "application/pdf")}
+    response = client.post("/analyze/", files=files, data={"job_description": "Python developer"})
+
+    assert response.status_code == 413
+    print("✓ Oversized request rejected with 413")
+
+
+if __name__ == "__main__":
+    test_pdf_is_hashed_and_page_counted()
+    test_rejects_bad_uploads()
+    test_oversized_request_rejected_by_middleware()